@@ -1,85 +1,204 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from typing import AsyncIterator
 
-from app.models.entities import ExecutionConfigUpdate, StrategyConfig
-from app.services.bot_engine import engine
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.models.entities import AccountConfig, ExecutionConfigUpdate, ProfileRequest, ShadowStrategyConfig, StrategyConfig
+from app.services import exporter
+from app.services.engine_gateway import EngineCommandError, LocalEngineGateway, RemoteEngineGateway
 
 router = APIRouter(prefix="/api")
 
+Gateway = LocalEngineGateway | RemoteEngineGateway
+
+
+def get_engine(request: Request) -> Gateway:
+    return request.app.state.engine
+
+
+async def _call(gateway: Gateway, command: str, **args) -> dict:
+    try:
+        return await gateway.call(command, **args)
+    except EngineCommandError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    except (ConnectionError, OSError) as exc:
+        raise HTTPException(status_code=503, detail=f"engine indisponível: {exc.__class__.__name__}") from exc
+
 
 @router.get("/health")
-async def health() -> dict:
-    return {
-        "status": "ok",
-        "running": engine.running,
-        "last_tick_at": engine.last_tick_at,
-        "tick_count": engine.tick_count,
-    }
+async def health(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "health")
 
 
 @router.post("/bot/start")
-async def start_bot() -> dict:
-    await engine.start()
-    return {"status": "started"}
+async def start_bot(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "start")
 
 
 @router.post("/bot/stop")
-async def stop_bot() -> dict:
-    await engine.stop()
-    return {"status": "stopped"}
+async def stop_bot(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "stop")
 
 
 @router.post("/bot/tick")
-async def manual_tick() -> dict:
-    await engine.tick()
-    return {"status": "tick_complete", "tick_count": engine.tick_count}
+async def manual_tick(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "tick")
 
 
 @router.get("/config")
-async def get_config() -> dict:
-    return {"config": engine.strategy_config.model_dump()}
+async def get_config(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "get_config")
 
 
 @router.post("/config")
-async def update_config(config: StrategyConfig) -> dict:
-    try:
-        updated = engine.update_strategy_config(config)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return {"status": "updated", "config": updated.model_dump()}
+async def update_config(config: StrategyConfig, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "update_config", config=config.model_dump(mode="json"))
+
+
+@router.get("/markets/registry")
+async def get_market_registry(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "registry")
 
 
 @router.get("/execution-config")
-async def get_execution_config() -> dict:
-    return {"execution_config": engine.get_execution_config().model_dump()}
+async def get_execution_config(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "get_execution_config")
 
 
 @router.post("/execution-config")
-async def update_execution_config(config: ExecutionConfigUpdate) -> dict:
-    updated = engine.update_execution_config(config)
-    return {"status": "updated", "execution_config": updated.model_dump()}
+async def update_execution_config(config: ExecutionConfigUpdate, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "update_execution_config", config=config.model_dump(mode="json"))
 
 
 @router.get("/state")
-async def state() -> dict:
-    stats = engine.trade_executor.stats
-    return {
-        "stats": {
-            "balance": stats.balance,
-            "today_pnl": stats.today_pnl,
-            "all_time_pnl": stats.all_time_pnl,
-            "trades": stats.trades,
-            "win_rate": stats.win_rate,
-            "avg_pnl": stats.avg_pnl,
-        },
-        "config": engine.strategy_config.model_dump(),
-        "execution_config": engine.get_execution_config().model_dump(),
-        "running": engine.running,
-        "tick_count": engine.tick_count,
-        "last_tick_at": engine.last_tick_at,
-        "last_decision_by_asset": engine.last_decision_by_asset,
-        "markets": {k: v.model_dump() for k, v in engine.latest_snapshots.items()},
-        "open_trades": [t.model_dump() for t in engine.trade_executor.open_trades.values()],
-        "history": [t.model_dump() for t in engine.trade_executor.closed_trades],
-    }
+async def state(gateway: Gateway = Depends(get_engine)) -> dict:
+    try:
+        return await gateway.state()
+    except (ConnectionError, OSError) as exc:
+        raise HTTPException(status_code=503, detail=f"engine indisponível: {exc.__class__.__name__}") from exc
+
+
+@router.get("/analytics")
+async def analytics(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "analytics")
+
+
+@router.get("/windows/{asset}")
+async def windows(asset: str, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "window_series", asset=asset)
+
+
+@router.get("/windows/{asset}/{window_ts}")
+async def window_series(asset: str, window_ts: int, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "window_series", asset=asset, window_ts=window_ts)
+
+
+@router.get("/shadow")
+async def shadow_strategies(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "shadow")
+
+
+@router.post("/shadow")
+async def update_shadow_strategies(strategies: list[ShadowStrategyConfig], gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "update_shadow", strategies=[s.model_dump(mode="json") for s in strategies])
+
+
+@router.get("/accounts")
+async def accounts(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "accounts")
+
+
+@router.post("/accounts")
+async def update_accounts(accounts: list[AccountConfig], gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "update_accounts", accounts=[a.model_dump(mode="json") for a in accounts])
+
+
+@router.get("/decisions")
+async def decisions(
+    asset: str | None = None,
+    window_ts: int | None = None,
+    outcome: str | None = None,
+    limit: int = 100,
+    include_spilled: bool = False,
+    gateway: Gateway = Depends(get_engine),
+) -> dict:
+    return await _call(
+        gateway, "decisions", asset=asset, window_ts=window_ts, outcome=outcome, limit=limit, include_spilled=include_spilled
+    )
+
+
+@router.get("/bars/{asset}")
+async def bars(asset: str, timeframe: str = "1m", limit: int = 100, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "bars", asset=asset, timeframe=timeframe, limit=limit)
+
+
+@router.get("/debug/ticks")
+async def debug_ticks(limit: int | None = None, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "debug_ticks", limit=limit)
+
+
+@router.get("/debug/ticks/{tick}")
+async def debug_tick(tick: int, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "debug_tick", tick=tick)
+
+
+@router.get("/debug/rate-limits")
+async def debug_rate_limits(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "rate_limits")
+
+
+@router.get("/debug/orders")
+async def debug_orders(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "orders")
+
+
+@router.get("/orders")
+async def order_queue(
+    state: str | None = None, asset: str | None = None, limit: int = 100, gateway: Gateway = Depends(get_engine)
+) -> dict:
+    return await _call(gateway, "order_queue", state=state, asset=asset, limit=limit)
+
+
+@router.get("/export/{kind}")
+async def export(
+    kind: str,
+    format: str = "ndjson",
+    asset: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    gateway: Gateway = Depends(get_engine),
+) -> StreamingResponse:
+    if format not in exporter.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format deve ser um de {', '.join(exporter.EXPORT_FORMATS)}")
+    pages = exporter.iter_pages(gateway, kind, asset=asset, since=since, until=until)
+    # a primeira página sai antes da resposta: kind/ativo inválidos ainda viram 400/404
+    try:
+        first = await anext(pages)
+    except EngineCommandError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    except (ConnectionError, OSError) as exc:
+        raise HTTPException(status_code=503, detail=f"engine indisponível: {exc.__class__.__name__}") from exc
+
+    async def replay() -> AsyncIterator[list[dict]]:
+        yield first
+        async for rows in pages:
+            yield rows
+
+    body = exporter.csv_chunks(replay(), exporter.CSV_COLUMNS[kind]) if format == "csv" else exporter.ndjson_chunks(replay())
+    return StreamingResponse(
+        body,
+        media_type=exporter.EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
+
+
+@router.get("/debug/snapshot")
+async def debug_snapshot(gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "snapshot")
+
+
+@router.post("/debug/profile")
+async def debug_profile(payload: ProfileRequest, gateway: Gateway = Depends(get_engine)) -> dict:
+    return await _call(gateway, "profile", mode=payload.mode, tick=payload.tick)
@@ -0,0 +1,118 @@
+"""Relógio de parede do engine, trocável por um relógio virtual na simulação.
+
+Tudo que depende do horário de mercado (janela atual, tempo restante, liquidação, idade do
+spot, dia do PnL) lê daqui em vez de `time.time()`/`datetime.utcnow()`; `monotonic` daqui só
+marca a cadência do loop. Prazos de tick, rate limiting e medições de latência continuam no
+`time.monotonic()` real: medem trabalho, não mercado.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+
+class Clock:
+    """Relógio do sistema."""
+
+    def time(self) -> float:
+        return time.time()
+
+    def utcnow(self) -> datetime:
+        return datetime.utcnow()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+    async def idle(self, seconds: float) -> None:
+        """Espera entre ticks do loop do engine."""
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Tempo que só anda quando o loop do engine fica ocioso.
+
+    `idle` (a espera entre ticks) avança o relógio na hora, sem esperar de verdade, e acorda
+    quem estiver em `sleep` com prazo vencido. Um tick custa zero tempo virtual, então um dia
+    inteiro de janelas roda na velocidade do código. `sleep` nunca avança o relógio sozinho:
+    tasks em background (refresh de mercados) acompanham o loop em vez de puxar o tempo.
+    """
+
+    def __init__(self, start: float) -> None:
+        self._now = float(start)
+        self._sleepers: list[tuple[float, asyncio.Future]] = []
+
+    def time(self) -> float:
+        return self._now
+
+    def utcnow(self) -> datetime:
+        return datetime.utcfromtimestamp(self._now)
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        self._now += max(0.0, seconds)
+        waiting = []
+        for wake_at, future in self._sleepers:
+            if wake_at <= self._now:
+                if not future.done():
+                    future.set_result(None)
+            else:
+                waiting.append((wake_at, future))
+        self._sleepers = waiting
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((self._now + seconds, future))
+        await future
+
+    async def idle(self, seconds: float) -> None:
+        self.advance(seconds)
+        # deixa as tasks acordadas rodarem antes do próximo tick
+        await asyncio.sleep(0)
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    global _clock
+    previous, _clock = _clock, clock
+    try:
+        yield clock
+    finally:
+        _clock = previous
+
+
+def now() -> float:
+    return _clock.time()
+
+
+def utcnow() -> datetime:
+    return _clock.utcnow()
+
+
+def monotonic() -> float:
+    return _clock.monotonic()
+
+
+async def sleep(seconds: float) -> None:
+    await _clock.sleep(seconds)
+
+
+async def idle(seconds: float) -> None:
+    await _clock.idle(seconds)
@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,16 +9,84 @@ class Settings(BaseSettings):
     confidence_threshold: float = 0.85
     trade_duration_seconds: int = 900
     switch_to_gamma_seconds: int = 60
-    markets_btc: str = "btc-updown-15m"
-    markets_eth: str = "eth-updown-15m"
-    markets_sol: str = "sol-updown-15m"
+    # registry de mercados: arquivo JSON ou lista JSON inline (MARKETS=[{...}]); vazio usa BTC/ETH/SOL 15m
+    markets_file: str = ""
+    markets: list[dict] = Field(default_factory=list)
     market_resolution_ttl_seconds: int = 30
     backtest_mode: bool = True
     entry_probability_threshold: float = 0.85
     late_entry_seconds: int = 180
     stop_loss_pct: float = 0.2
+    trace_buffer_size: int = 50
+    # candles de 1m carregados no start para aquecer MACD/TREND (0 desliga) e cache local em disco
+    indicator_bootstrap_candles: int = 300
+    # auto: MACD/TREND de todos os ativos em lote com NumPy quando instalado; python: caminho escalar
+    indicator_backend: str = "auto"
+    # RSI_HTF/TREND_HTF: quantos pontos do timeframe base formam uma barra do timeframe maior
+    indicator_htf_factor: int = 5
+    # barras OHLCV montadas a partir dos spots (cada timeframe divide 15 min); os indicadores consomem as
+    # barras fechadas de `indicator_timeframe`, então o período independe de POLL_INTERVAL_SECONDS
+    bar_timeframes: list[str] = Field(default_factory=lambda: ["15s", "1m", "5m"])
+    indicator_timeframe: str = "1m"
+    bar_history_size: int = 500
+    candle_cache_dir: str = "backend/data/candles"
+    # snapshot binário do estado do engine para restart rápido (0 desliga)
+    state_snapshot_path: str = "backend/data/engine_state.bin"
+    state_snapshot_interval_seconds: float = 15
+    # local: engine no processo da API; remote: API stateless falando com `python -m app.engine_worker`
+    engine_mode: str = "local"
+    engine_socket_path: str = "backend/data/engine.sock"
+    engine_autostart: bool = False
+    # >1: o engine_worker vira coordenador e particiona os ativos entre esse número de processos
+    engine_shards: int = 1
+    # orçamento de cada tick (preço, Gamma, liquidação); o que passar usa dados last-known marcados como stale
+    tick_deadline_seconds: float = 2.5
+    # /api/analytics: dias mantidos no breakdown diário e pontos da curva de equity
+    analytics_day_retention: int = 90
+    analytics_equity_points: int = 1000
+    # /api/decisions: eventos por ativo em memória; com diretório, o que sai do ring vai para disco
+    decision_buffer_size: int = 512
+    decision_spill_dir: str = ""
+    # histórico completo das trades liquidadas (NDJSON) para /api/export/trades; vazio desliga
+    trade_store_path: str = ""
+    # linhas por página do /api/export (a memória do export fica na ordem de uma página)
+    export_page_size: int = 1000
+    # trajetória de odds/spot por janela (/api/windows): janelas em memória por ativo e diretório dos blocos fechados
+    window_series_retention: int = 96
+    window_series_dir: str = ""
+    # estratégias sombra (paper) avaliadas a cada tick: [{"name": ..., "enabled_indicators": [...], ...}]
+    shadow_strategies: list[dict] = Field(default_factory=list)
+    # contas que replicam as entradas: [{"name": ..., "mode": "TEST"|"REAL", "wallet_secret": ..., "amount_usd": ..., "starting_balance": ...}]
+    accounts: list[dict] = Field(default_factory=list)
+    # tamanho (USD) das ordens REAL da conta principal; cada conta de ACCOUNTS tem o seu
+    order_amount_usd: float = 20.0
+    # ordens REAL: timeout por tentativa, retries (só erro de transporte, 429 e 5xx) e reaquecimento da conexão dedicada
+    order_timeout_seconds: float = 2.0
+    order_max_retries: int = 1
+    order_retry_backoff_seconds: float = 0.1
+    order_warm_interval_seconds: float = 20.0
+    # ordens em voo ao mesmo tempo: no total e por mercado
+    order_max_in_flight: int = 16
+    order_per_market_limit: int = 1
+    gamma_base_url: str = "https://gamma-api.polymarket.com"
+    clob_base_url: str = "https://clob.polymarket.com"
+    coingecko_base_url: str = "https://api.coingecko.com"
+    binance_base_url: str = "https://api.binance.com"
+    coinbase_base_url: str = "https://api.exchange.coinbase.com"
+    # token bucket por host: {host: [requests/segundo, burst]}; hosts fora do mapa não são limitados
+    rate_limits: dict[str, list[float]] = Field(
+        default_factory=lambda: {
+            "gamma-api.polymarket.com": [10, 20],
+            "clob.polymarket.com": [5, 10],
+            "api.coingecko.com": [0.5, 5],
+            "api.binance.com": [10, 20],
+            "api.exchange.coinbase.com": [5, 10],
+        }
+    )
+    # espera máxima na fila do rate limiter por prioridade (ORDER, ENTRY, MARKET_DATA, SETTLEMENT, SEARCH)
+    rate_limit_max_wait_seconds: dict[str, float] = Field(default_factory=dict)
 
-    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 
 settings = Settings()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """O orçamento de tempo do tick acabou antes da chamada upstream."""
+
+    def __init__(self, message: str = "DEADLINE_EXCEEDED") -> None:
+        super().__init__(message)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[float | None]:
+    """Define um prazo (monotonic) para o contexto; prazos aninhados nunca estendem o externo.
+
+    `seconds=None` remove o prazo (ex.: envio de ordem, que tem timeout próprio).
+    """
+    if seconds is None:
+        absolute = None
+    else:
+        absolute = time.monotonic() + seconds
+        outer = _deadline.get()
+        if outer is not None:
+            absolute = min(absolute, outer)
+    token = _deadline.set(absolute)
+    try:
+        yield absolute
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    absolute = _deadline.get()
+    if absolute is None:
+        return None
+    return absolute - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float) -> float:
+    """Timeout efetivo para uma chamada upstream: o menor entre `default` e o que resta do prazo."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+async def within(awaitable: Awaitable[T]) -> T:
+    """Aguarda `awaitable` até o prazo do contexto; o que não terminar é cancelado (`asyncio.TimeoutError`)."""
+    left = remaining()
+    return await asyncio.wait_for(awaitable, timeout=None if left is None else max(0.0, left))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from app.core.config import Settings, settings
+
+WINDOW_LENGTHS = {"5m": 300, "15m": 900, "1h": 3600}
+
+DEFAULT_SLUG_TEMPLATE = "{asset}-updown-{window}-{window_ts}"
+
+DEFAULT_MARKETS = [
+    {"symbol": "BTC", "coingecko_id": "bitcoin", "binance_symbol": "BTCUSDT", "coinbase_product": "BTC-USD"},
+    {"symbol": "ETH", "coingecko_id": "ethereum", "binance_symbol": "ETHUSDT", "coinbase_product": "ETH-USD"},
+    {"symbol": "SOL", "coingecko_id": "solana", "binance_symbol": "SOLUSDT", "coinbase_product": "SOL-USD"},
+]
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    symbol: str
+    coingecko_id: str
+    binance_symbol: str
+    coinbase_product: str
+    window: str = "15m"
+    slug_template: str = DEFAULT_SLUG_TEMPLATE
+
+    @property
+    def window_seconds(self) -> int:
+        return WINDOW_LENGTHS[self.window]
+
+    def window_ts(self, now_ts: int) -> int:
+        return (now_ts // self.window_seconds) * self.window_seconds
+
+    def slug(self, window_ts: int) -> str:
+        return self.slug_template.format(asset=self.symbol.lower(), window=self.window, window_ts=window_ts)
+
+    def search_query(self, window_ts: int) -> str:
+        return f"{self.symbol.lower()} up or down {self.window} {window_ts}"
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "MarketSpec":
+        symbol = str(payload.get("symbol", "")).strip().upper()
+        if not symbol:
+            raise ValueError("mercado sem symbol no registry")
+        window = str(payload.get("window", "15m"))
+        if window not in WINDOW_LENGTHS:
+            raise ValueError(f"window inválida para {symbol}: {window} (use {', '.join(WINDOW_LENGTHS)})")
+        return cls(
+            symbol=symbol,
+            coingecko_id=str(payload.get("coingecko_id") or symbol.lower()),
+            binance_symbol=str(payload.get("binance_symbol") or f"{symbol}USDT"),
+            coinbase_product=str(payload.get("coinbase_product") or f"{symbol}-USD"),
+            window=window,
+            slug_template=str(payload.get("slug_template") or DEFAULT_SLUG_TEMPLATE),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "coingecko_id": self.coingecko_id,
+            "binance_symbol": self.binance_symbol,
+            "coinbase_product": self.coinbase_product,
+            "window": self.window,
+            "window_seconds": self.window_seconds,
+            "slug_template": self.slug_template,
+        }
+
+
+class MarketRegistry:
+    """Registry de mercados (ativo + fontes de preço + slug Gamma + janela) carregado da config."""
+
+    def __init__(self, specs: list[MarketSpec]) -> None:
+        if not specs:
+            raise ValueError("registry de mercados vazio")
+        self._specs: dict[str, MarketSpec] = {}
+        for spec in specs:
+            if spec.symbol in self._specs:
+                raise ValueError(f"mercado duplicado no registry: {spec.symbol}")
+            self._specs[spec.symbol] = spec
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "MarketRegistry":
+        entries: list[dict] = list(DEFAULT_MARKETS)
+        if config.markets_file:
+            entries = json.loads(Path(config.markets_file).read_text())
+        elif config.markets:
+            entries = config.markets
+        return cls([MarketSpec.from_dict(entry) for entry in entries])
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._specs)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._specs
+
+    def __iter__(self) -> Iterator[MarketSpec]:
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get(self, symbol: str) -> MarketSpec:
+        try:
+            return self._specs[symbol]
+        except KeyError:
+            raise KeyError(f"ativo fora do registry: {symbol}") from None
+
+    def group_by_window(self, symbols: list[str]) -> dict[int, list[MarketSpec]]:
+        groups: dict[int, list[MarketSpec]] = {}
+        for symbol in symbols:
+            spec = self.get(symbol)
+            groups.setdefault(spec.window_seconds, []).append(spec)
+        return groups
+
+
+market_registry = MarketRegistry.from_settings(settings)
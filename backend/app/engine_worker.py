@@ -0,0 +1,137 @@
+"""Processo do engine de trading.
+
+Roda o `BotEngine` (tick loop, resolver, snapshots) e atende comandos da API pelo socket
+Unix `ENGINE_SOCKET_PATH`. Os workers de API sobem com `ENGINE_MODE=remote`:
+
+    python -m app.engine_worker
+    ENGINE_MODE=remote uvicorn app.main:app --workers 4
+
+Com `ENGINE_SHARDS=N` (N > 1) este processo vira o coordenador: sobe N shards
+(`python -m app.engine_worker --shard i`), cada um com uma fatia dos ativos, e atende a API
+no mesmo socket mesclando o estado deles.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.markets import market_registry
+from app.services.bot_engine import BotEngine
+from app.services.engine_gateway import EngineCommands, RemoteEngineGateway, serve
+from app.services.shard_coordinator import ShardCoordinator, effective_shard_count, shard_registry
+
+SHARD_READY_TIMEOUT_SECONDS = 30
+
+
+def _with_suffix(path: str, suffix: str) -> Path:
+    p = Path(path)
+    return p.with_name(f"{p.stem}-{suffix}{p.suffix}")
+
+
+async def _wait_for_signal() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+
+async def run_engine(shard: int | None = None, shards: int = 1) -> None:
+    registry = market_registry if shard is None else shard_registry(market_registry, shard, shards)
+    engine = BotEngine(registry=registry)
+    engine.restore_snapshot()
+    socket_path = Path(settings.engine_socket_path)
+    server = await serve(EngineCommands(engine), socket_path)
+    if settings.engine_autostart:
+        await engine.start()
+    try:
+        await _wait_for_signal()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await engine.shutdown()
+        socket_path.unlink(missing_ok=True)
+
+
+def _spawn_shard(index: int, count: int) -> tuple[subprocess.Popen, Path]:
+    socket_path = _with_suffix(settings.engine_socket_path, f"shard{index}")
+    # cada shard tem seu próprio rate limiter: divide o orçamento por host entre eles
+    rate_limits = {host: [rate / count, max(1.0, burst / count)] for host, (rate, burst) in settings.rate_limits.items()}
+    env = {
+        **os.environ,
+        "ENGINE_SOCKET_PATH": str(socket_path),
+        "STATE_SNAPSHOT_PATH": str(_with_suffix(settings.state_snapshot_path, f"shard{index}")),
+        "RATE_LIMITS": json.dumps(rate_limits),
+        "ENGINE_AUTOSTART": "false",
+    }
+    if settings.trade_store_path:
+        env["TRADE_STORE_PATH"] = str(_with_suffix(settings.trade_store_path, f"shard{index}"))
+    proc = subprocess.Popen([sys.executable, "-m", "app.engine_worker", "--shard", str(index), "--shards", str(count)], env=env)
+    return proc, socket_path
+
+
+async def _wait_for_socket(path: Path, proc: subprocess.Popen) -> None:
+    deadline = asyncio.get_running_loop().time() + SHARD_READY_TIMEOUT_SECONDS
+    while not path.exists():
+        if proc.poll() is not None:
+            raise RuntimeError(f"shard saiu com código {proc.returncode} antes de abrir {path}")
+        if asyncio.get_running_loop().time() > deadline:
+            raise RuntimeError(f"shard não abriu {path} em {SHARD_READY_TIMEOUT_SECONDS}s")
+        await asyncio.sleep(0.1)
+
+
+async def run_coordinator(count: int) -> None:
+    spawned = [_spawn_shard(i, count) for i in range(count)]
+    gateways: list[RemoteEngineGateway] = []
+    server = None
+    socket_path = Path(settings.engine_socket_path)
+    try:
+        for proc, path in spawned:
+            await _wait_for_socket(path, proc)
+            gateways.append(RemoteEngineGateway(path))
+        coordinator = ShardCoordinator(market_registry, gateways)
+        server = await serve(coordinator, socket_path)
+        if settings.engine_autostart:
+            await coordinator.dispatch("start", {})
+        await _wait_for_signal()
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            socket_path.unlink(missing_ok=True)
+        for gateway in gateways:
+            await gateway.shutdown()
+        for proc, _path in spawned:
+            proc.terminate()
+        for proc, _path in spawned:
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shard", type=int, help="índice do shard (uso interno do coordenador)")
+    parser.add_argument("--shards", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.shard is not None:
+        asyncio.run(run_engine(args.shard, args.shards))
+        return
+    count = effective_shard_count(market_registry, settings.engine_shards)
+    if count > 1:
+        asyncio.run(run_coordinator(count))
+    else:
+        asyncio.run(run_engine())
+
+
+if __name__ == "__main__":
+    main()
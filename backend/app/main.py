@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI
 
 from app.api.routes import router
-from app.services.bot_engine import engine
+from app.core.config import settings
+from app.services.engine_gateway import LocalEngineGateway, RemoteEngineGateway
+
+
+def build_gateway() -> LocalEngineGateway | RemoteEngineGateway:
+    if settings.engine_mode == "remote":
+        return RemoteEngineGateway(Path(settings.engine_socket_path))
+    if settings.engine_mode != "local":
+        raise ValueError(f"ENGINE_MODE inválido: {settings.engine_mode} (use local ou remote)")
+    from app.services.bot_engine import BotEngine
+
+    return LocalEngineGateway(BotEngine())
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
+    gateway = build_gateway()
+    app.state.engine = gateway
+    await gateway.startup()
     yield
-    await engine.shutdown()
+    await gateway.shutdown()
 
 
 app = FastAPI(title="Polymarket Sniper Backend", version="1.0.0", lifespan=lifespan)
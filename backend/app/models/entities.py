@@ -6,8 +6,13 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.core import clock
+from app.core.markets import market_registry
+
 
 class Asset(str, Enum):
+    """Símbolos do registry padrão; ativos são strings do `market_registry`."""
+
     BTC = "BTC"
     ETH = "ETH"
     SOL = "SOL"
@@ -27,10 +32,17 @@ class Indicator(str, Enum):
     MACD = "MACD"
     TREND = "TREND"
     POLY_PRICE = "POLY_PRICE"
+    # streaming (O(1) por preço), ver app/services/streaming_indicators.py
+    RSI = "RSI"
+    BOLLINGER = "BOLLINGER"
+    ATR = "ATR"
+    VWAP = "VWAP"
+    RSI_HTF = "RSI_HTF"
+    TREND_HTF = "TREND_HTF"
 
 
 class MarketSnapshot(BaseModel):
-    asset: Asset
+    asset: str
     spot_price: float
     change_24h: float = 0.0
     yes_odds: float = 0.5
@@ -45,26 +57,27 @@ class MarketSnapshot(BaseModel):
     market_end_ts: int | None = None
     price_to_beat: float | None = None
     final_price: float | None = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    stale: bool = False
+    timestamp: datetime = Field(default_factory=clock.utcnow)
 
 
 class Signal(BaseModel):
-    asset: Asset
+    asset: str
     direction: Direction
     confidence: float
     reason: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=clock.utcnow)
 
 
 class Trade(BaseModel):
     id: str
-    asset: Asset
+    asset: str
     direction: Direction
     entry_price: float
     exit_price: Optional[float] = None
     confidence: float
     api_mode: ApiMode
-    opened_at: datetime = Field(default_factory=datetime.utcnow)
+    opened_at: datetime = Field(default_factory=clock.utcnow)
     closes_at: datetime
     closed_at: Optional[datetime] = None
     pnl: float = 0.0
@@ -74,6 +87,7 @@ class Trade(BaseModel):
     window_ts: int | None = None
     market_end_ts: int | None = None
     price_to_beat: float | None = None
+    amount_usd: float = 0.0
 
 
 class BotStats(BaseModel):
@@ -108,10 +122,37 @@ class ExecutionConfigView(BaseModel):
     wallet_masked: str = ""
 
 
+class AccountConfig(BaseModel):
+    """Conta que replica as entradas da estratégia principal com tamanho, saldo e modo próprios."""
+
+    name: str
+    mode: ExecutionMode = ExecutionMode.TEST
+    wallet_secret: str = ""
+    amount_usd: float = 20.0
+    starting_balance: float = 0.0
+    enabled: bool = True
+
+
+class ProfileRequest(BaseModel):
+    mode: str = "cprofile"
+    tick: int | None = None
+
+
 class StrategyConfig(BaseModel):
-    enabled_assets: list[Asset] = Field(default_factory=lambda: [Asset.BTC, Asset.ETH, Asset.SOL])
+    enabled_assets: list[str] = Field(default_factory=lambda: market_registry.symbols)
     enabled_indicators: list[Indicator] = Field(default_factory=lambda: [Indicator.MACD, Indicator.TREND, Indicator.POLY_PRICE])
     confidence_threshold: float = 0.9
     entry_probability_threshold: float = 0.85
     late_entry_seconds: int = 180
     stop_loss_pct: float = 0.2
+
+
+class ShadowStrategyConfig(BaseModel):
+    """Estratégia avaliada em paralelo à principal, só em paper, sobre os mesmos dados do tick."""
+
+    name: str
+    enabled_indicators: list[Indicator] = Field(default_factory=list)
+    confidence_threshold: float = 0.9
+    entry_probability_threshold: float = 0.85
+    late_entry_seconds: int = 180
+    stop_loss_pct: float = 0.2
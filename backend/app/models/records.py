@@ -0,0 +1,120 @@
+"""Tipos internos do caminho quente (tick, decisão, liquidação).
+
+Dataclasses com `__slots__`, sem validação nem default factories caras: o engine cria e
+muta estes objetos a cada tick. Os modelos pydantic de `entities` ficam só na fronteira
+HTTP; a conversão é direta (`as_dict` / `to_model` com `model_construct`, sem revalidar).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+
+from app.core import clock
+from app.models.entities import ApiMode, Direction, MarketSnapshot, Signal, Trade
+
+
+def _parse_datetime(value: datetime | str | None) -> datetime | None:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+@dataclass(slots=True)
+class SnapshotRecord:
+    asset: str
+    spot_price: float
+    change_24h: float = 0.0
+    yes_odds: float = 0.5
+    no_odds: float = 0.5
+    odds_source: str = "UNKNOWN"
+    odds_live: bool = False
+    price_source: str = "UNKNOWN"
+    price_age_seconds: int | None = None
+    market_id: str = ""
+    market_slug: str = ""
+    window_ts: int | None = None
+    market_end_ts: int | None = None
+    price_to_beat: float | None = None
+    final_price: float | None = None
+    stale: bool = False
+    # epoch em segundos; vira datetime só na fronteira
+    timestamp: float = field(default_factory=clock.now)
+
+    def as_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in _SNAPSHOT_FIELDS}
+        data["timestamp"] = datetime.utcfromtimestamp(self.timestamp)
+        return data
+
+    def to_model(self) -> MarketSnapshot:
+        return MarketSnapshot.model_construct(**self.as_dict())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SnapshotRecord":
+        data = dict(data)
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, (str, datetime)):
+            data["timestamp"] = (_parse_datetime(timestamp) - datetime(1970, 1, 1)).total_seconds()
+        return cls(**{k: v for k, v in data.items() if k in _SNAPSHOT_FIELDS_SET})
+
+
+@dataclass(slots=True)
+class SignalRecord:
+    asset: str
+    direction: Direction
+    confidence: float
+    reason: str
+    timestamp: float = field(default_factory=clock.now)
+
+    def to_model(self) -> Signal:
+        return Signal.model_construct(
+            asset=self.asset,
+            direction=self.direction,
+            confidence=self.confidence,
+            reason=self.reason,
+            timestamp=datetime.utcfromtimestamp(self.timestamp),
+        )
+
+
+@dataclass(slots=True)
+class TradeRecord:
+    id: str
+    asset: str
+    direction: Direction
+    entry_price: float
+    confidence: float
+    api_mode: ApiMode
+    closes_at: datetime
+    opened_at: datetime = field(default_factory=clock.utcnow)
+    exit_price: float | None = None
+    closed_at: datetime | None = None
+    pnl: float = 0.0
+    status: str = "OPEN"
+    stop_loss_pct: float = 0.2
+    market_id: str = ""
+    window_ts: int | None = None
+    market_end_ts: int | None = None
+    price_to_beat: float | None = None
+    # stake em USD; 0 = PnL por unidade do ativo (book principal)
+    amount_usd: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _TRADE_FIELDS}
+
+    def to_model(self) -> Trade:
+        return Trade.model_construct(**self.as_dict())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TradeRecord":
+        data = {k: v for k, v in data.items() if k in _TRADE_FIELDS_SET}
+        data["direction"] = Direction(data["direction"])
+        data["api_mode"] = ApiMode(data["api_mode"])
+        for key in ("closes_at", "opened_at", "closed_at"):
+            if key in data:
+                data[key] = _parse_datetime(data[key])
+        return cls(**data)
+
+
+_SNAPSHOT_FIELDS = tuple(f.name for f in fields(SnapshotRecord))
+_SNAPSHOT_FIELDS_SET = frozenset(_SNAPSHOT_FIELDS)
+_TRADE_FIELDS = tuple(f.name for f in fields(TradeRecord))
+_TRADE_FIELDS_SET = frozenset(_TRADE_FIELDS)
@@ -0,0 +1,177 @@
+"""Contas que replicam as entradas da estratégia principal (`ACCOUNTS` / `POST /api/accounts`).
+
+O sinal é calculado uma vez por ativo pelo engine; quando a estratégia principal entra numa
+janela, `AccountRegistry.dispatch` abre a mesma entrada em cada conta habilitada. Cada conta
+tem o próprio book (`TradeExecutor`, com saldo inicial próprio), o próprio tamanho de ordem e
+o próprio modo: contas TEST entram em paper na hora, contas REAL vão para a fila de ordens
+compartilhada (`OrderManager`), com `client_order_id` próprio e limite por mercado por conta,
+então as ordens de todas as contas saem em paralelo. Liquidação reaproveita os resultados que
+o engine já buscou por mercado: nenhuma conta faz request upstream de dados de mercado.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from app.models.entities import AccountConfig, ApiMode, ExecutionMode
+from app.models.records import SignalRecord, SnapshotRecord
+from app.services.order_manager import OrderManager, OrderRecord, OrderState
+from app.services.polymarket_service import MarketData
+from app.services.trade_executor import TradeExecutor
+
+
+def mask_secret(secret: str) -> str:
+    secret = secret.strip()
+    if not secret:
+        return ""
+    if len(secret) <= 10:
+        return "*" * len(secret)
+    return f"{secret[:6]}...{secret[-4:]}"
+
+
+class Account:
+    def __init__(self, config: AccountConfig) -> None:
+        self.config = config
+        self.executor = TradeExecutor()
+        self.executor.stats.balance = config.starting_balance
+        self.last_decision_by_asset: dict[str, str] = {}
+        # decisão do engine -> trade paper aberta ou ack do CLOB, em ms
+        self.latencies_ms: deque[float] = deque(maxlen=200)
+        self.orders: Counter[str] = Counter()
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    @property
+    def wallet_configured(self) -> bool:
+        return bool(self.config.wallet_secret.strip())
+
+    def view(self) -> dict:
+        analytics = self.executor.analytics.view()
+        stats = self.executor.stats
+        latencies = sorted(self.latencies_ms)
+
+        def pct(p: float) -> float | None:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            "name": self.name,
+            "config": {**self.config.model_dump(exclude={"wallet_secret"}), "wallet_masked": mask_secret(self.config.wallet_secret)},
+            "stats": {
+                "balance": stats.balance,
+                "today_pnl": stats.today_pnl,
+                "all_time_pnl": stats.all_time_pnl,
+                "trades": stats.trades,
+                "win_rate": stats.win_rate,
+            },
+            "overall": analytics["overall"],
+            "by_asset": analytics["by_asset"],
+            "orders": dict(self.orders),
+            "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": round(latencies[-1], 3) if latencies else None},
+            "open_trades": [t.as_dict() for t in self.executor.open_trades.values()],
+            "last_decision_by_asset": dict(self.last_decision_by_asset),
+        }
+
+
+class AccountRegistry:
+    def __init__(self, order_manager: OrderManager, configs: list[AccountConfig] | None = None) -> None:
+        self.order_manager = order_manager
+        self.accounts: list[Account] = []
+        self._by_name: dict[str, Account] = {}
+        # contas fora da config atual (removidas ou vindas do snapshot): o book volta se o nome voltar
+        self.dormant: dict[str, Account] = {}
+        self.configure(configs or [])
+
+    def configure(self, configs: list[AccountConfig]) -> None:
+        """Troca o conjunto de contas; as que mantêm o nome preservam book e saldo."""
+        names = [c.name for c in configs]
+        if any(not name.strip() for name in names):
+            raise ValueError("conta sem nome")
+        if len(set(names)) != len(names):
+            raise ValueError("nomes de conta duplicados")
+        known = {**self.dormant, **self._by_name}
+        accounts = []
+        for config in configs:
+            account = known.pop(config.name, None) or Account(config)
+            account.config = config
+            accounts.append(account)
+        self.accounts = accounts
+        self._by_name = {a.name: a for a in accounts}
+        self.dormant = known
+
+    def books(self) -> dict[str, Account]:
+        """Todas as contas com book, ativas e dormentes (snapshot)."""
+        return {**self.dormant, **self._by_name}
+
+    def restore(self, name: str) -> Account:
+        """Conta que recebe o book do snapshot; se o nome não está na config atual, fica dormente."""
+        account = self._by_name.get(name) or self.dormant.get(name)
+        if account is None:
+            account = self.dormant[name] = Account(AccountConfig(name=name, enabled=False))
+        return account
+
+    def prepare(self, market_data: MarketData) -> None:
+        """Templates de ordem das contas REAL na zona de entrada (a conexão aquecida é a mesma)."""
+        for account in self.accounts:
+            if account.config.enabled and account.config.mode == ExecutionMode.REAL and account.wallet_configured:
+                self.order_manager.orders.prepare(market_data, account.name)
+
+    def dispatch(
+        self,
+        snapshot: SnapshotRecord,
+        signal: SignalRecord,
+        api_mode: ApiMode,
+        closes_at: datetime,
+        stop_loss_pct: float,
+        market_data: MarketData,
+        decided_at: float,
+    ) -> None:
+        """Abre a entrada decidida pelo engine em cada conta habilitada; ordens REAL só são enfileiradas."""
+        asset = snapshot.asset
+        for account in self.accounts:
+            config = account.config
+            if not config.enabled:
+                continue
+            if any(t.asset == asset for t in account.executor.open_trades.values()):
+                account.last_decision_by_asset[asset] = "WAIT_OPEN_TRADE_TO_CLOSE"
+                continue
+            if config.mode == ExecutionMode.REAL and not account.wallet_configured:
+                account.last_decision_by_asset[asset] = "REAL_MODE_NEEDS_WALLET"
+                continue
+            trade = account.executor.open_trade(
+                snapshot, signal, api_mode, closes_at=closes_at, stop_loss_pct=stop_loss_pct, amount_usd=config.amount_usd
+            )
+            if config.mode == ExecutionMode.REAL:
+                self.order_manager.submit(market_data, signal.direction, config.amount_usd, trade.id, decided_at, account.name)
+                account.last_decision_by_asset[asset] = f"ORDER_PENDING::{trade.id}"
+            else:
+                account.latencies_ms.append((time.perf_counter() - decided_at) * 1000)
+                account.last_decision_by_asset[asset] = f"PAPER_ORDER::{signal.direction.value}::{trade.id}"
+
+    def order_done(self, record: OrderRecord) -> None:
+        # conta removida com a ordem em voo fica dormente: o resultado da ordem ainda vale para o book dela
+        account = self.books().get(record.account)
+        if account is None:
+            return
+        account.latencies_ms.append(record.latency_ms)
+        account.orders[record.state.value] += 1
+        account.last_decision_by_asset[record.asset] = f"ORDER::{record.message}::{record.trade_id}"
+        trade = account.executor.open_trades.get(record.trade_id)
+        if trade is not None and record.state is not OrderState.ACKED:
+            trade.status = "ORDER_REJECTED"
+
+    def settle(
+        self,
+        latest_snapshots: dict[str, SnapshotRecord],
+        results_by_market: dict[str, tuple[float | None, float | None, str]],
+        deferred_markets: set[str],
+    ) -> None:
+        # dormentes também liquidam: trades abertas antes de sair da config não ficam congeladas
+        for account in self.books().values():
+            if account.executor.open_trades:
+                account.executor.settle_with_market_results(latest_snapshots, results_by_market, deferred_markets, "ACCOUNT_SPOT")
+
+    def view(self) -> dict:
+        return {"accounts": [a.view() for a in self.accounts]}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import fcntl
+from pathlib import Path
+
+from app.core import clock
+
+
+class ActionJournal:
+    """Journal append-only de ações por janela (`ENTRY|BTC|<window_ts>|<source>|<iso>`).
+
+    Compartilhado entre processos do engine no mesmo host: `claim` pega um `flock` exclusivo,
+    lê o que outros processos escreveram desde a última leitura e só grava a ação se ninguém
+    tiver gravado a mesma chave antes — uma entrada por janela mesmo com vários shards.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.handled: set[str] = set()
+        self._offset = 0
+        if self.path.exists():
+            with self.path.open("rb") as f:
+                self._read_new(f)
+
+    @staticmethod
+    def key(action: str, asset: str, window_ts: int) -> str:
+        return f"{asset}:{window_ts}:{action}"
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.handled
+
+    def _read_new(self, f) -> None:
+        f.seek(self._offset)
+        data = f.read()
+        # linha incompleta (escrita em andamento fora do lock) fica para a próxima leitura
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            parts = line.strip().split("|")
+            if len(parts) >= 3:
+                self.handled.add(self.key(parts[0], parts[1], parts[2]))
+        self._offset += len(complete)
+
+    def claim(self, action: str, asset: str, window_ts: int, source: str) -> bool:
+        """Grava a ação se a chave ainda não existe no journal; False se outro processo chegou antes."""
+        key = self.key(action, asset, window_ts)
+        if key in self.handled:
+            return False
+        with self.path.open("a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._read_new(f)
+                if key in self.handled:
+                    return False
+                line = f"{action}|{asset}|{window_ts}|{source}|{clock.utcnow().isoformat()}\n".encode("utf-8")
+                f.seek(0, 2)
+                f.write(line)
+                f.flush()
+                self._offset += len(line)
+                self.handled.add(key)
+                return True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
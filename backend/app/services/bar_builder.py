@@ -0,0 +1,158 @@
+"""Barras OHLCV incrementais a partir dos spots de cada tick.
+
+Cada timeframe (ex.: 15s, 1m, 5m) precisa dividir a janela de 15 minutos, então as barras
+começam em múltiplos do timeframe e nenhuma atravessa a fronteira de uma janela. Barras
+fechadas vão para um ring de capacidade fixa por ativo/timeframe (colunas `array`). Os
+indicadores consomem só barras fechadas do timeframe principal: o período de um indicador
+passa a significar tempo, não número de polls, e não muda com `POLL_INTERVAL_SECONDS`.
+
+Sem spot (preço <= 0) não há atualização. Um buraco curto entre ticks é preenchido com barras
+planas (close anterior, volume 0); depois de um buraco maior que `MAX_GAP_FILL_BARS`, a próxima
+barra simplesmente começa do zero.
+"""
+from __future__ import annotations
+
+from array import array
+
+from app.services.streaming_indicators import Bar
+
+GRID_SECONDS = 900
+MAX_GAP_FILL_BARS = 30
+
+_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_timeframe(value: str) -> int:
+    """'15s' / '1m' / '5m' -> segundos; o timeframe precisa dividir a janela de 15 minutos."""
+    try:
+        seconds = int(value[:-1]) * _UNITS[value[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"timeframe inválido: {value} (ex.: 15s, 1m, 5m)") from None
+    if seconds <= 0 or GRID_SECONDS % seconds:
+        raise ValueError(f"timeframe {value} não divide a janela de {GRID_SECONDS // 60} minutos")
+    return seconds
+
+
+class _BarSeries:
+    __slots__ = (
+        "seconds", "capacity", "head", "size", "start", "open", "high", "low", "close", "volume",
+        "cur_start", "cur_open", "cur_high", "cur_low", "cur_close", "cur_volume",
+    )
+
+    def __init__(self, seconds: int, capacity: int) -> None:
+        self.seconds = seconds
+        self.capacity = capacity
+        self.head = 0
+        self.size = 0
+        self.start = array("q", bytes(8 * capacity))
+        self.open = array("d", bytes(8 * capacity))
+        self.high = array("d", bytes(8 * capacity))
+        self.low = array("d", bytes(8 * capacity))
+        self.close = array("d", bytes(8 * capacity))
+        self.volume = array("d", bytes(8 * capacity))
+        self.cur_start: int | None = None
+        self.cur_open = self.cur_high = self.cur_low = self.cur_close = self.cur_volume = 0.0
+
+    def update(self, price: float, ts: float, volume: float, closed: list[Bar] | None) -> None:
+        start = int(ts) // self.seconds * self.seconds
+        if self.cur_start is not None and start > self.cur_start:
+            self._close_current(closed)
+            missing = (start - self.cur_start) // self.seconds - 1
+            if missing <= MAX_GAP_FILL_BARS:
+                last = self.cur_close
+                for i in range(1, missing + 1):
+                    self._store(self.cur_start + i * self.seconds, (last, last, last, last, 0.0), closed)
+            self.cur_start = None
+        if self.cur_start is None:
+            self.cur_start = start
+            self.cur_open = self.cur_high = self.cur_low = self.cur_close = price
+            self.cur_volume = volume
+            return
+        # mesma barra (ou spot atrasado, com start < cur_start: entra na barra aberta em vez de reabrir uma fechada)
+        if price > self.cur_high:
+            self.cur_high = price
+        if price < self.cur_low:
+            self.cur_low = price
+        self.cur_close = price
+        self.cur_volume += volume
+
+    def _close_current(self, closed: list[Bar] | None) -> None:
+        bar = (self.cur_open, self.cur_high, self.cur_low, self.cur_close, self.cur_volume)
+        self._store(self.cur_start, bar, closed)
+
+    def _store(self, start: int, bar: Bar, closed: list[Bar] | None) -> None:
+        i = self.head
+        self.start[i] = start
+        self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i] = bar
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if closed is not None:
+            closed.append(bar)
+
+    def recent(self, limit: int) -> list[dict]:
+        count = min(limit, self.size)
+        bars = []
+        for k in range(count, 0, -1):
+            i = (self.head - k) % self.capacity
+            bars.append(
+                {
+                    "start": self.start[i],
+                    "open": self.open[i],
+                    "high": self.high[i],
+                    "low": self.low[i],
+                    "close": self.close[i],
+                    "volume": self.volume[i],
+                }
+            )
+        return bars
+
+    def current(self) -> dict | None:
+        if self.cur_start is None:
+            return None
+        return {
+            "start": self.cur_start,
+            "open": self.cur_open,
+            "high": self.cur_high,
+            "low": self.cur_low,
+            "close": self.cur_close,
+            "volume": self.cur_volume,
+        }
+
+
+class BarBuilder:
+    def __init__(self, timeframes: list[str], primary: str, capacity: int = 500) -> None:
+        self.timeframes = {name: parse_timeframe(name) for name in dict.fromkeys([*timeframes, primary])}
+        self.primary = primary
+        self.capacity = max(1, capacity)
+        self._series: dict[str, dict[str, _BarSeries]] = {}
+
+    def _asset(self, asset: str) -> dict[str, _BarSeries]:
+        series = self._series.get(asset)
+        if series is None:
+            series = self._series[asset] = {name: _BarSeries(seconds, self.capacity) for name, seconds in self.timeframes.items()}
+        return series
+
+    def update(self, prices: dict[str, float], ts: float, volume: float = 1.0) -> dict[str, list[Bar]]:
+        """Aplica um spot por ativo; devolve as barras do timeframe principal que fecharam (mais antiga primeiro)."""
+        closed_by_asset: dict[str, list[Bar]] = {}
+        for asset, price in prices.items():
+            if price <= 0:
+                continue
+            closed: list[Bar] = []
+            for name, series in self._asset(asset).items():
+                series.update(price, ts, volume, closed if name == self.primary else None)
+            if closed:
+                closed_by_asset[asset] = closed
+        return closed_by_asset
+
+    def bars(self, asset: str, timeframe: str, limit: int = 100) -> dict:
+        if timeframe not in self.timeframes:
+            raise KeyError(f"timeframe não configurado: {timeframe} (use {', '.join(self.timeframes)})")
+        series = self._series.get(asset, {}).get(timeframe)
+        return {
+            "asset": asset,
+            "timeframe": timeframe,
+            "seconds": self.timeframes[timeframe],
+            "bars": series.recent(max(0, limit)) if series else [],
+            "current": series.current() if series else None,
+        }
@@ -0,0 +1,148 @@
+"""Indicadores de todos os ativos de uma vez, com NumPy (dependência opcional).
+
+Os históricos ficam numa única matriz `[ativo, MAX_HISTORY]`, alinhados à esquerda (coluna 0 =
+preço mais antigo de cada ativo). O primeiro `macd_bias`/`trend_bias` depois de um push
+calcula EMA12/EMA26/sinal do MACD e as SMAs para todos os ativos, com um passo vetorizado por
+coluna de tempo; as consultas seguintes do mesmo tick saem do cache.
+
+As operações seguem a mesma ordem de ponto flutuante do caminho escalar (`v * k + ema * (1 - k)`,
+soma sequencial nas SMAs), então os vieses são idênticos, inclusive em empates.
+"""
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+from app.models.entities import Direction
+from app.services.indicator_service import MAX_HISTORY, IndicatorService, as_bars
+from app.services.streaming_indicators import Bar, StreamingIndicators
+
+_MIN_HISTORY = 30
+_K12 = 2 / (12 + 1)
+_K26 = 2 / (26 + 1)
+_K9 = 2 / (9 + 1)
+
+
+class BatchIndicatorService(IndicatorService):
+    def __init__(self, htf_factor: int = 5) -> None:
+        self._index: dict[str, int] = {}
+        self._prices = np.zeros((8, MAX_HISTORY))
+        self._lengths = np.zeros(8, dtype=np.intp)
+        self._biases: dict[str, tuple[Direction | None, Direction | None]] | None = None
+        self._bars = {}
+        self.streaming = StreamingIndicators(self.bars, htf_factor)
+
+    def _row(self, asset: str) -> int:
+        row = self._index.get(asset)
+        if row is None:
+            row = self._index[asset] = len(self._index)
+            if row >= len(self._lengths):
+                self._prices = np.vstack([self._prices, np.zeros_like(self._prices)])
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+        return row
+
+    def push_bar(self, asset: str, bar: Bar) -> None:
+        self.push_bars({asset: bar})
+
+    def push_bars(self, bars: dict[str, Bar]) -> None:
+        if not bars:
+            return
+        rows = np.fromiter((self._row(asset) for asset in bars), dtype=np.intp, count=len(bars))
+        closes = np.fromiter((bar[3] for bar in bars.values()), dtype=float, count=len(bars))
+        full = self._lengths[rows] == MAX_HISTORY
+        if full.any():
+            shifted = rows[full]
+            self._prices[shifted, :-1] = self._prices[shifted, 1:]
+        self._lengths[rows[~full]] += 1
+        self._prices[rows, self._lengths[rows] - 1] = closes
+        self._biases = None
+        for asset, bar in bars.items():
+            self._keep_bar(asset, bar)
+        if self.streaming.indicators:
+            for asset, bar in bars.items():
+                self.streaming.push(asset, bar)
+
+    def seed(self, asset: str, history: list[float] | list[Bar]) -> None:
+        bars = as_bars(history)[-MAX_HISTORY:]
+        row = self._row(asset)
+        self._prices[row, : len(bars)] = [bar[3] for bar in bars]
+        self._lengths[row] = len(bars)
+        self._bars[asset] = deque(bars, maxlen=MAX_HISTORY)
+        self._biases = None
+        self.streaming.reset(asset)
+
+    def history(self, asset: str) -> list[float]:
+        row = self._index.get(asset)
+        return [] if row is None else self._prices[row, : self._lengths[row]].tolist()
+
+    def history_len(self, asset: str) -> int:
+        row = self._index.get(asset)
+        return 0 if row is None else int(self._lengths[row])
+
+    def macd_bias(self, asset: str) -> Direction | None:
+        return self._bias(asset)[0]
+
+    def trend_bias(self, asset: str) -> Direction | None:
+        return self._bias(asset)[1]
+
+    def _bias(self, asset: str) -> tuple[Direction | None, Direction | None]:
+        if self._biases is None:
+            self._biases = self.compute_biases()
+        return self._biases.get(asset, (None, None))
+
+    def compute_biases(self) -> dict[str, tuple[Direction | None, Direction | None]]:
+        """(MACD, TREND) de todos os ativos; ativos com menos de 30 pontos ficam com (None, None)."""
+        count = len(self._index)
+        lengths = self._lengths[:count]
+        macd_up = np.zeros(count, dtype=bool)
+        trend_up = np.zeros(count, dtype=bool)
+        # cada grupo de ativos com o mesmo tamanho de histórico roda sem máscara (em regime: um grupo só)
+        for length in np.unique(lengths[lengths >= _MIN_HISTORY]):
+            rows = np.flatnonzero(lengths == length)
+            prices = self._prices[rows, :length]
+            macd_up[rows] = self._macd_up(prices)
+            trend_up[rows] = self._sma(prices, 10) >= self._sma(prices, _MIN_HISTORY)
+
+        biases: dict[str, tuple[Direction | None, Direction | None]] = {}
+        for asset, row in self._index.items():
+            if lengths[row] < _MIN_HISTORY:
+                biases[asset] = (None, None)
+            else:
+                biases[asset] = (
+                    Direction.UP if macd_up[row] else Direction.DOWN,
+                    Direction.UP if trend_up[row] else Direction.DOWN,
+                )
+        return biases
+
+    @staticmethod
+    def _macd_up(prices: np.ndarray) -> np.ndarray:
+        ema12 = prices[:, 0].copy()
+        ema26 = prices[:, 0].copy()
+        signal = np.zeros(len(prices))
+        step = np.empty(len(prices))
+        for t in range(1, prices.shape[1]):
+            column = prices[:, t]
+            np.multiply(column, _K12, out=step)
+            ema12 *= 1 - _K12
+            ema12 += step
+            np.multiply(column, _K26, out=step)
+            ema26 *= 1 - _K26
+            ema26 += step
+            if t == 25:
+                # primeiro ponto da série do MACD semeia a EMA9 do sinal, como no caminho escalar
+                np.subtract(ema12, ema26, out=signal)
+            elif t > 25:
+                np.subtract(ema12, ema26, out=step)
+                step *= _K9
+                signal *= 1 - _K9
+                signal += step
+        return (ema12 - ema26) >= signal
+
+    @staticmethod
+    def _sma(prices: np.ndarray, period: int) -> np.ndarray:
+        window = prices[:, -period:]
+        total = window[:, 0].copy()
+        for j in range(1, period):
+            total += window[:, j]
+        return total / period
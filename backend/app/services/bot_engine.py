@@ -1,59 +1,114 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import datetime, timezone
 from pathlib import Path
+from uuid import uuid4
 
+from app.core import clock, deadline
+from app.core.deadline import deadline_scope
 from app.core.config import settings
+from app.core.markets import WINDOW_LENGTHS, MarketRegistry, market_registry
 from app.models.entities import (
+    AccountConfig,
     ApiMode,
-    Asset,
     Direction,
     ExecutionConfigUpdate,
     ExecutionConfigView,
     ExecutionMode,
-    MarketSnapshot,
-    Signal,
+    ShadowStrategyConfig,
     StrategyConfig,
 )
-from app.services.indicator_service import IndicatorService
-from app.services.polymarket_service import PolymarketService
+from app.models.records import SignalRecord, SnapshotRecord, TradeRecord
+from app.services.accounts import AccountRegistry, mask_secret
+from app.services.action_journal import ActionJournal
+from app.services.bar_builder import BarBuilder
+from app.services.candle_history import CandleCache, CandleHistory
+from app.services.decision_log import DecisionLog, Outcome
+from app.services.engine_snapshot import EngineSnapshotter
+from app.services.indicator_service import build_indicator_service
+from app.services.market_resolver import MarketResolver
+from app.services.order_manager import OrderManager, OrderRecord, OrderState
+from app.services.polymarket_service import MarketData, PolymarketService
 from app.services.price_service import PriceService
+from app.services.rate_limiter import RateLimitScheduler
+from app.services.shadow_strategies import ShadowRunner
+from app.services.trade_analytics import TradeAnalytics
 from app.services.trade_executor import TradeExecutor
+from app.services.trade_store import TradeStore
+from app.services.window_series import WindowSeriesStore
+from app.services.tracing import TickTracer, annotate, span
 
 
 class BotEngine:
-    def __init__(self) -> None:
-        self.market_map = {
-            Asset.BTC: settings.markets_btc,
-            Asset.ETH: settings.markets_eth,
-            Asset.SOL: settings.markets_sol,
-        }
-        self.price_service = PriceService()
-        self.poly_service = PolymarketService()
-        self.indicator_service = IndicatorService()
-        self.trade_executor = TradeExecutor()
-        self.latest_snapshots: dict[str, MarketSnapshot] = {}
+    def __init__(
+        self,
+        price_service: PriceService | None = None,
+        poly_service: PolymarketService | None = None,
+        action_log_path: Path | None = None,
+        registry: MarketRegistry | None = None,
+    ) -> None:
+        self.registry = registry or market_registry
+        # um único scheduler para todos os upstreams, para que preço, Gamma e CLOB dividam o mesmo orçamento por host
+        self.rate_limiter = poly_service.limiter if poly_service else RateLimitScheduler.from_settings(settings)
+        self.price_service = price_service or PriceService(registry=self.registry, limiter=self.rate_limiter)
+        self.poly_service = poly_service or PolymarketService(registry=self.registry, limiter=self.rate_limiter)
+        self.indicator_service = build_indicator_service(settings.indicator_backend, settings.indicator_htf_factor)
+        self.bar_builder = BarBuilder(settings.bar_timeframes, settings.indicator_timeframe, settings.bar_history_size)
+        self.candle_history = CandleHistory(
+            self.price_service, CandleCache(Path(settings.candle_cache_dir)), settings.indicator_bootstrap_candles
+        )
+        self.trade_executor = TradeExecutor(TradeAnalytics(settings.analytics_day_retention, settings.analytics_equity_points))
+        self.tracer = TickTracer(settings.trace_buffer_size)
+        self.shadow = ShadowRunner(self.indicator_service, [ShadowStrategyConfig(**c) for c in settings.shadow_strategies])
+        self.latest_snapshots: dict[str, SnapshotRecord] = {}
         self.last_decision_by_asset: dict[str, str] = {}
+        self.decision_log = DecisionLog(
+            settings.decision_buffer_size, Path(settings.decision_spill_dir) if settings.decision_spill_dir else None
+        )
+        self.trade_store = TradeStore(Path(settings.trade_store_path) if settings.trade_store_path else None)
+        self.window_series = WindowSeriesStore(
+            settings.window_series_retention, Path(settings.window_series_dir) if settings.window_series_dir else None
+        )
+        # decisão do tick corrente por ativo: (outcome, (window_ts, remaining, probabilidade, direção))
+        self._decisions: dict[str, tuple[Outcome, tuple | None]] = {}
+        # ativos cujos dados do tick atual são last-known porque o prazo do tick acabou
+        self._stale_assets: set[str] = set()
+        self._background_tasks: dict[str, asyncio.Task] = {}
         self.last_tick_at: datetime | None = None
         self.tick_count = 0
+        # incrementa a cada tick e a cada mudança de config; a API só reserializa o estado em versão nova
+        self.state_version = 0
+        # o contador recomeça em 0 a cada processo: a versão publicada leva o boot para não repetir após um restart
+        self.boot_id = uuid4().hex[:12]
         self.running = False
         self._task: asyncio.Task | None = None
         self.execution_mode = ExecutionMode.TEST
         self.wallet_secret = ""
         self.strategy_config = StrategyConfig(
+            enabled_assets=self.registry.symbols,
             confidence_threshold=settings.confidence_threshold,
             entry_probability_threshold=settings.entry_probability_threshold,
             late_entry_seconds=settings.late_entry_seconds,
             stop_loss_pct=settings.stop_loss_pct,
         )
-        self._asset_locks = {asset: asyncio.Lock() for asset in Asset}
-        self._action_log_path = Path("backend/data/window_actions.log")
-        self._action_log_path.parent.mkdir(parents=True, exist_ok=True)
-        self._handled_actions: set[str] = self._load_handled_actions()
+        self.market_resolver = MarketResolver(
+            self.poly_service,
+            self.registry,
+            enabled_assets=lambda: self.strategy_config.enabled_assets,
+            late_entry_seconds=lambda: self.strategy_config.late_entry_seconds,
+        )
+        self.order_manager = OrderManager(
+            self.poly_service.orders, settings.order_max_in_flight, settings.order_per_market_limit, on_done=self._order_done
+        )
+        self.accounts = AccountRegistry(self.order_manager, [AccountConfig(**c) for c in settings.accounts])
+        self.snapshotter = EngineSnapshotter(Path(settings.state_snapshot_path), settings.state_snapshot_interval_seconds)
+        self._asset_locks = {spec.symbol: asyncio.Lock() for spec in self.registry}
+        self.action_journal = ActionJournal(action_log_path or Path("backend/data/window_actions.log"))
 
     def decide_api_mode(self, closes_at: datetime) -> ApiMode:
-        remaining = int((closes_at - datetime.utcnow()).total_seconds())
+        remaining = int((closes_at - clock.utcnow()).total_seconds())
         return ApiMode.GAMMA_API if remaining <= settings.switch_to_gamma_seconds else ApiMode.CLOB
 
     @property
@@ -62,12 +117,7 @@ class BotEngine:
 
     @property
     def wallet_masked(self) -> str:
-        secret = self.wallet_secret.strip()
-        if not secret:
-            return ""
-        if len(secret) <= 10:
-            return "*" * len(secret)
-        return f"{secret[:6]}...{secret[-4:]}"
+        return mask_secret(self.wallet_secret)
 
     def get_execution_config(self) -> ExecutionConfigView:
         return ExecutionConfigView(mode=self.execution_mode, wallet_configured=self.wallet_configured, wallet_masked=self.wallet_masked)
@@ -75,51 +125,104 @@ class BotEngine:
     def update_execution_config(self, payload: ExecutionConfigUpdate) -> ExecutionConfigView:
         self.execution_mode = payload.mode
         self.wallet_secret = (payload.wallet_secret or "").strip()
+        self.state_version += 1
         return self.get_execution_config()
 
-    def _load_handled_actions(self) -> set[str]:
-        if not self._action_log_path.exists():
-            return set()
-        entries: set[str] = set()
-        for line in self._action_log_path.read_text().splitlines():
-            parts = line.strip().split("|")
-            if len(parts) >= 3:
-                entries.add(f"{parts[1]}:{parts[2]}:{parts[0]}")
-        return entries
-
-    def _append_action(self, action: str, asset: Asset, window_ts: int, source: str) -> None:
-        self._action_log_path.parent.mkdir(parents=True, exist_ok=True)
-        with self._action_log_path.open("a", encoding="utf-8") as f:
-            f.write(f"{action}|{asset.value}|{window_ts}|{source}|{datetime.utcnow().isoformat()}\n")
-        self._handled_actions.add(f"{asset.value}:{window_ts}:{action}")
-
     async def start(self) -> None:
         if self.running:
             return
         self.running = True
+        self.state_version += 1
+        self.market_resolver.start()
         self._task = asyncio.create_task(self._loop())
 
     async def stop(self) -> None:
         self.running = False
+        self.state_version += 1
+        await self.market_resolver.stop()
         if self._task:
             await self._task
+            self._task = None
+            await self.order_manager.drain()
+            await self.snapshotter.flush(self)
+            await self.decision_log.flush()
+            await self.trade_store.flush()
+            await self.window_series.flush()
 
-    def update_strategy_config(self, payload: StrategyConfig) -> StrategyConfig:
-        if not payload.enabled_assets:
+    def update_strategy_config(self, payload: StrategyConfig, allow_empty: bool = False) -> StrategyConfig:
+        # allow_empty: um shard pode ficar sem ativos habilitados quando a config global não usa nenhum dos seus
+        if not payload.enabled_assets and not allow_empty:
             raise ValueError("enabled_assets não pode ser vazio")
+        unknown = [asset for asset in payload.enabled_assets if asset not in self.registry]
+        if unknown:
+            raise ValueError(f"ativos fora do registry: {', '.join(unknown)}")
+        self._validate_limits(payload, payload.enabled_assets)
+        self.strategy_config = payload
+        self.state_version += 1
+        return self.strategy_config
+
+    def update_accounts(self, configs: list[AccountConfig]) -> list[AccountConfig]:
+        self.accounts.configure(configs)
+        self.state_version += 1
+        return configs
+
+    def update_shadow_strategies(self, configs: list[ShadowStrategyConfig]) -> list[ShadowStrategyConfig]:
+        for config in configs:
+            # sombras avaliam os ativos habilitados na estratégia principal
+            self._validate_limits(config, self.strategy_config.enabled_assets)
+        self.shadow.configure(configs)
+        self.state_version += 1
+        return configs
+
+    def _validate_limits(self, payload: StrategyConfig | ShadowStrategyConfig, assets: list[str]) -> None:
         if not (0.5 <= payload.entry_probability_threshold <= 1.0):
             raise ValueError("entry_probability_threshold deve estar entre 0.5 e 1.0")
-        if not (30 <= payload.late_entry_seconds <= 900):
-            raise ValueError("late_entry_seconds deve estar entre 30 e 900")
+        # a zona de entrada cabe na menor janela habilitada; sem ativos (shard vazio) vale a maior janela suportada
+        max_late_entry = min((self.registry.get(a).window_seconds for a in assets if a in self.registry), default=max(WINDOW_LENGTHS.values()))
+        if not (30 <= payload.late_entry_seconds <= max_late_entry):
+            raise ValueError(f"late_entry_seconds deve estar entre 30 e {max_late_entry} (menor janela dos ativos habilitados)")
         if not (0.0 <= payload.stop_loss_pct <= 0.95):
             raise ValueError("stop_loss_pct deve estar entre 0 e 0.95")
-        self.strategy_config = payload
-        return self.strategy_config
+
+    @property
+    def state_key(self) -> str:
+        """Versão do estado única entre processos: `<boot_id>:<state_version>`."""
+        return f"{self.boot_id}:{self.state_version}"
+
+    def restore_snapshot(self) -> bool:
+        """Restaura trades, stats, mercados resolvidos e histórico do último snapshot (chamado no startup)."""
+        return self.snapshotter.restore(self)
+
+    async def bootstrap_indicators(self) -> None:
+        """Semeia o histórico dos indicadores com candles reais de 1m antes do primeiro tick."""
+        if settings.indicator_bootstrap_candles <= 0:
+            return
+        # os candles são de 1m; em outro timeframe misturariam períodos no mesmo histórico
+        if settings.indicator_timeframe != "1m":
+            return
+        # ativos com histórico recente restaurado do snapshot não precisam de candles
+        assets = [a for a in self.strategy_config.enabled_assets if self.indicator_service.history_len(a) < 30]
+        if not assets:
+            return
+        closes_by_asset = await self.candle_history.load(assets)
+        for asset, closes in closes_by_asset.items():
+            self.indicator_service.seed(asset, closes)
 
     async def _loop(self) -> None:
+        try:
+            await self.bootstrap_indicators()
+        except Exception:  # noqa: BLE001
+            # sem candles o tick cai no warmup sintético de sempre
+            pass
         while self.running:
+            started = clock.monotonic()
             await self.tick()
-            await asyncio.sleep(settings.poll_interval_seconds)
+            self.snapshotter.maybe_write(self)
+            self.decision_log.maybe_spill()
+            self.trade_store.maybe_flush()
+            self.window_series.maybe_flush()
+            # cadência fixa: o tempo gasto no tick (limitado pelo prazo) sai do intervalo de espera
+            await clock.idle(max(0.0, settings.poll_interval_seconds - (clock.monotonic() - started)))
 
     @staticmethod
     def _to_naive_utc(end_ts: int | None) -> datetime | None:
@@ -135,97 +238,307 @@ class BotEngine:
             return Direction.DOWN, down_odds
         return None, up_odds
 
-    async def _process_asset(self, asset: Asset, spot: float, change: float) -> None:
-        async with self._asset_locks[asset]:
-            market_data = await self.poly_service.fetch_market_data(asset.value)
-            market_close = self._to_naive_utc(market_data.end_ts) or datetime.utcnow()
-            remaining_seconds = max(0, int((market_close - datetime.utcnow()).total_seconds()))
-            api_mode = self.decide_api_mode(market_close)
-
-            snapshot = MarketSnapshot(
-                asset=asset,
-                spot_price=spot,
-                change_24h=change,
-                yes_odds=market_data.yes_odds,
-                no_odds=market_data.no_odds,
-                odds_source=f"{market_data.odds_source}::{market_data.resolver_source}",
-                odds_live=market_data.odds_live,
-                price_source=self.price_service.last_source_by_asset.get(asset, "UNKNOWN"),
-                price_age_seconds=self.price_service.last_price_age_seconds(asset),
-                market_id=market_data.market_id,
-                market_slug=market_data.market_slug,
-                window_ts=market_data.window_ts,
-                market_end_ts=market_data.end_ts,
-                price_to_beat=market_data.price_to_beat,
-                final_price=market_data.final_price,
+    async def _process_asset(self, asset: str, spot: float, change: float) -> None:
+        with span("process_asset", asset=asset):
+            async with self._asset_locks[asset]:
+                pending_order = self._decide_asset(asset, spot, change)
+            if pending_order is not None:
+                market_data, signal, trade, decided_at = pending_order
+                # só enfileira: o envio corre em paralelo com as entradas dos outros ativos
+                self.order_manager.submit(market_data, signal.direction, settings.order_amount_usd, trade.id, decided_at)
+            if asset in self._stale_assets:
+                self.last_decision_by_asset[asset] = f"DEADLINE_EXCEEDED::{self.last_decision_by_asset.get(asset, '')}"
+
+    def _decide_asset(self, asset: str, spot: float, change: float) -> tuple[MarketData, SignalRecord, TradeRecord, float] | None:
+        """Lógica de decisão sob o lock do ativo: só lê o mercado já resolvido, sem I/O.
+
+        A entrada é registrada no action log antes de soltar o lock; o envio da ordem REAL
+        (retornado aqui, com o instante da decisão) acontece fora dele.
+        """
+        market_data = self.market_resolver.latest.get(asset)
+        if market_data is None:
+            self._decide(asset, Outcome.WAIT_MARKET_RESOLUTION, "WAIT_MARKET_RESOLUTION")
+            return None
+        rolling_over = False
+        if self.market_resolver.running:
+            # lido na hora da decisão: o refresh em background pode ter chegado depois do início do tick
+            now_ts = clock.now()
+            rolling_over = self.market_resolver.rolling_over(asset, now_ts)
+            if self.market_resolver.is_stale(asset, now_ts):
+                self._stale_assets.add(asset)
+        market_close = self._to_naive_utc(market_data.end_ts) or clock.utcnow()
+        remaining_seconds = max(0, int((market_close - clock.utcnow()).total_seconds()))
+        api_mode = self.decide_api_mode(market_close)
+
+        snapshot = SnapshotRecord(
+            asset=asset,
+            spot_price=spot,
+            change_24h=change,
+            yes_odds=market_data.yes_odds,
+            no_odds=market_data.no_odds,
+            odds_source=f"{market_data.odds_source}::{market_data.resolver_source}",
+            odds_live=market_data.odds_live,
+            price_source=self.price_service.last_source_by_asset.get(asset, "UNKNOWN"),
+            price_age_seconds=self.price_service.last_price_age_seconds(asset),
+            market_id=market_data.market_id,
+            market_slug=market_data.market_slug,
+            window_ts=market_data.window_ts,
+            market_end_ts=market_data.end_ts,
+            price_to_beat=market_data.price_to_beat,
+            final_price=market_data.final_price,
+            stale=asset in self._stale_assets,
+        )
+        self.latest_snapshots[asset] = snapshot
+        if rolling_over:
+            # virada de janela com o refresh já agendado: o mercado em mãos é o da janela que fechou
+            self._decide(asset, Outcome.MARKET_PENDING, f"MARKET_PENDING::ROLLOVER(window={market_data.window_ts})")
+            return None
+        if not snapshot.stale:
+            # odds last-known repetiriam o ponto anterior: só dados frescos entram na trajetória da janela
+            self.window_series.record(snapshot, clock.now())
+
+        dominant_direction, dominant_probability = self._dominant_direction(snapshot.yes_odds, snapshot.no_odds)
+        # estratégias sombra: mesmo snapshot e mesmos indicadores, só CPU
+        self.shadow.evaluate(snapshot, remaining_seconds, market_close, api_mode, (dominant_direction, dominant_probability))
+        late_window_ready = remaining_seconds <= self.strategy_config.late_entry_seconds
+        probability_ready = dominant_probability >= self.strategy_config.entry_probability_threshold
+        has_open_trade = any(t.asset == asset for t in self.trade_executor.open_trades.values())
+        action_key = ActionJournal.key("ENTRY", asset, market_data.window_ts)
+        context = (market_data.window_ts, remaining_seconds, dominant_probability, dominant_direction)
+
+        if self.execution_mode == ExecutionMode.REAL and not self.wallet_configured:
+            self._decide(asset, Outcome.REAL_MODE_NEEDS_WALLET, "REAL_MODE_NEEDS_WALLET", context)
+            return None
+        if remaining_seconds <= self.strategy_config.late_entry_seconds + settings.poll_interval_seconds:
+            # zona de entrada (ou o tick antes dela): templates UP/DOWN prontos e conexão CLOB aquecida antes da decisão
+            if self.execution_mode == ExecutionMode.REAL:
+                self.poly_service.orders.prepare(market_data)
+            self.accounts.prepare(market_data)
+
+        if dominant_direction is None:
+            self._decide(asset, Outcome.TIE_UP_DOWN, f"TIE_UP_DOWN(UP={snapshot.yes_odds:.2f} DOWN={snapshot.no_odds:.2f})", context)
+            return None
+
+        if action_key in self.action_journal:
+            self._decide(asset, Outcome.SKIP_DUPLICATE_WINDOW, f"SKIP_DUPLICATE_WINDOW::{market_data.window_ts}", context)
+            return None
+
+        if not has_open_trade and late_window_ready and probability_ready and snapshot.stale:
+            # odds last-known não abrem posição; a decisão volta a valer no próximo tick com dados frescos
+            self._decide(asset, Outcome.ENTRY_BLOCKED_STALE_DATA, f"ENTRY_BLOCKED_STALE_DATA(window={market_data.window_ts})", context)
+        elif not has_open_trade and late_window_ready and probability_ready:
+            # o claim no journal compartilhado vem antes do trade: outro shard/processo pode ter entrado nesta janela
+            if not self.action_journal.claim("ENTRY", asset, market_data.window_ts, snapshot.odds_source):
+                self._decide(asset, Outcome.SKIP_DUPLICATE_WINDOW, f"SKIP_DUPLICATE_WINDOW::{market_data.window_ts}", context)
+                return None
+            signal = SignalRecord(asset=asset, direction=dominant_direction, confidence=dominant_probability, reason=f"WINDOW_{market_data.window_ts}")
+            trade = self.trade_executor.open_trade(snapshot, signal, api_mode, closes_at=market_close, stop_loss_pct=self.strategy_config.stop_loss_pct)
+            decided_at = time.perf_counter()
+            # o mesmo sinal em todas as contas: sem recalcular nada e sem request upstream
+            self.accounts.dispatch(
+                snapshot, signal, api_mode, market_close, self.strategy_config.stop_loss_pct, market_data, decided_at
             )
-            self.latest_snapshots[asset] = snapshot
-
-            dominant_direction, dominant_probability = self._dominant_direction(snapshot.yes_odds, snapshot.no_odds)
-            late_window_ready = remaining_seconds <= self.strategy_config.late_entry_seconds
-            probability_ready = dominant_probability >= self.strategy_config.entry_probability_threshold
-            has_open_trade = any(t.asset == asset for t in self.trade_executor.open_trades.values())
-            action_key = f"{asset.value}:{market_data.window_ts}:ENTRY"
-
-            if self.execution_mode == ExecutionMode.REAL and not self.wallet_configured:
-                self.last_decision_by_asset[asset] = "REAL_MODE_NEEDS_WALLET"
-                return
-
-            if dominant_direction is None:
-                self.last_decision_by_asset[asset] = f"TIE_UP_DOWN(UP={snapshot.yes_odds:.2f} DOWN={snapshot.no_odds:.2f})"
-                return
-
-            if action_key in self._handled_actions:
-                self.last_decision_by_asset[asset] = f"SKIP_DUPLICATE_WINDOW::{market_data.window_ts}"
-                return
-
-            if not has_open_trade and late_window_ready and probability_ready:
-                signal = Signal(asset=asset, direction=dominant_direction, confidence=dominant_probability, reason=f"WINDOW_{market_data.window_ts}")
-                trade = self.trade_executor.open_trade(snapshot, signal, api_mode, closes_at=market_close, stop_loss_pct=self.strategy_config.stop_loss_pct)
-                if self.execution_mode == ExecutionMode.REAL:
-                    ok, msg = await self.poly_service.place_clob_order(market_data, signal.direction, amount_usd=20.0, wallet_secret=self.wallet_secret)
-                    self.last_decision_by_asset[asset] = f"ORDER::{msg}::{trade.id}"
-                    if not ok:
-                        trade.status = "ORDER_REJECTED"
-                else:
-                    self.last_decision_by_asset[asset] = f"PAPER_ORDER::{signal.direction.value}::{trade.id}"
-                self._append_action("ENTRY", asset, market_data.window_ts, snapshot.odds_source)
-            elif has_open_trade:
-                self.last_decision_by_asset[asset] = "WAIT_OPEN_TRADE_TO_CLOSE"
-            else:
-                self.last_decision_by_asset[asset] = (
-                    f"WAIT_WINDOW_OR_PROB(window={market_data.window_ts} rem={remaining_seconds}s max_prob={dominant_probability:.2f} dir={dominant_direction.value})"
-                )
+            if self.execution_mode == ExecutionMode.REAL:
+                self._decide(asset, Outcome.ORDER_PENDING, f"ORDER_PENDING::{trade.id}", context)
+                return market_data, signal, trade, decided_at
+            self._decide(asset, Outcome.PAPER_ORDER, f"PAPER_ORDER::{signal.direction.value}::{trade.id}", context)
+        elif has_open_trade:
+            self._decide(asset, Outcome.WAIT_OPEN_TRADE_TO_CLOSE, "WAIT_OPEN_TRADE_TO_CLOSE", context)
+        else:
+            self._decide(
+                asset,
+                Outcome.WAIT_WINDOW_OR_PROB,
+                f"WAIT_WINDOW_OR_PROB(window={market_data.window_ts} rem={remaining_seconds}s max_prob={dominant_probability:.2f} dir={dominant_direction.value})",
+                context,
+            )
+        return None
+
+    def _order_done(self, record: OrderRecord) -> None:
+        """Ack (ou falha) de uma ordem da fila: vira um evento próprio no log, com a latência decisão→ack."""
+        if record.account:
+            # ordens das contas ficam no book e nas métricas da própria conta
+            self.accounts.order_done(record)
+            self.state_version += 1
+            return
+        outcome = Outcome.ORDER_SENT if record.state is OrderState.ACKED else Outcome.ORDER_REJECTED
+        self.last_decision_by_asset[record.asset] = f"ORDER::{record.message}::{record.trade_id}"
+        self._log_decision(record.asset, outcome, (record.window_ts, None, 0.0, record.direction), record.latency_ms)
+        trade = self.trade_executor.open_trades.get(record.trade_id)
+        if trade is not None and record.state is not OrderState.ACKED:
+            trade.status = "ORDER_REJECTED"
+        self.state_version += 1
 
     async def tick(self) -> None:
+        with self.tracer.trace_tick(self.tick_count + 1):
+            await self._tick()
+
+    def _decide(self, asset: str, outcome: Outcome, message: str, context: tuple | None = None) -> None:
+        """Registra a decisão do tick: texto livre para o dashboard, outcome + contexto para o log estruturado."""
+        self.last_decision_by_asset[asset] = message
+        if context is None and asset in self._decisions:
+            context = self._decisions[asset][1]
+        self._decisions[asset] = (outcome, context)
+
+    def _log_decision(self, asset: str, outcome: Outcome, context: tuple | None, latency_ms: float) -> None:
+        window_ts, remaining, probability, direction = context or (None, None, 0.0, None)
+        self.decision_log.record(
+            asset,
+            clock.now(),
+            self.tick_count + 1,
+            outcome,
+            window_ts=window_ts,
+            remaining_seconds=remaining,
+            probability=probability,
+            direction=direction,
+            latency_ms=latency_ms,
+            stale=asset in self._stale_assets,
+        )
+
+    async def _tick_asset(self, asset: str, price: tuple[float, float]) -> None:
+        started = time.perf_counter()
+        try:
+            spot, change = price
+            await self._process_asset(asset, spot, change)
+        except Exception as exc:  # noqa: BLE001
+            self._decide(asset, Outcome.ERROR, f"ERROR::{exc.__class__.__name__}")
+        decision = self._decisions.pop(asset, None)
+        if decision is not None:
+            self._log_decision(asset, decision[0], decision[1], (time.perf_counter() - started) * 1000)
+
+    async def _tick(self) -> None:
         assets = list(self.strategy_config.enabled_assets)
-        price_by_asset = await self.price_service.fetch_spots(assets)
+        self._stale_assets = set()
+        with deadline_scope(settings.tick_deadline_seconds):
+            price_by_asset = await self._fetch_spots_within_deadline(assets)
+            if not self.market_resolver.running:
+                # sem o resolver em background, o tick resolve sob demanda; com ele, só lê o último estado resolvido
+                self._stale_assets.update(await self.market_resolver.refresh(assets))
+            await self._process_assets(assets, price_by_asset)
+            result_overrides, deferred = await self._fetch_due_results()
+
+        open_trades = self.trade_executor.open_trades
+        results_by_market = {open_trades[tid].market_id: result for tid, result in result_overrides.items()}
+        deferred_markets = {open_trades[tid].market_id for tid in deferred}
+        with span("settle_due_trades", open_trades=len(open_trades), deferred=len(deferred)):
+            settled = self.trade_executor.settle_due_trades(self.latest_snapshots, result_overrides, deferred=deferred)
+        self.trade_store.add(settled)
+        if self.shadow.strategies:
+            with span("settle_shadow_trades", strategies=len(self.shadow.strategies)):
+                self.shadow.settle(self.latest_snapshots, results_by_market, deferred_markets)
+        if self.accounts.accounts:
+            with span("settle_account_trades", accounts=len(self.accounts.accounts)):
+                self.accounts.settle(self.latest_snapshots, results_by_market, deferred_markets)
+        self.last_tick_at = clock.utcnow()
+        self.tick_count += 1
+        self.state_version += 1
+
+    async def _fetch_spots_within_deadline(self, assets: list[str]) -> dict[str, tuple[float, float]]:
+        try:
+            prices = await deadline.within(self.price_service.fetch_spots(assets))
+        except asyncio.TimeoutError:
+            prices = self.price_service.last_known_spots(assets)
+        if deadline.expired():
+            stale = [a for a in assets if self.price_service.last_source_by_asset.get(a) in ("LAST_KNOWN", "UNAVAILABLE")]
+            self._stale_assets.update(stale)
+        return prices
 
+    async def _process_assets(self, assets: list[str], price_by_asset: dict[str, tuple[float, float]]) -> None:
+        """Processa os ativos em paralelo até o prazo; o que passar dele segue em background (não é cancelado
+        no meio de uma ordem) e o ativo fica marcado como DEADLINE_EXCEEDED neste tick."""
+        runnable: list[str] = []
         for asset in assets:
-            try:
-                spot, change = price_by_asset.get(asset, (0.0, 0.0))
-                self.indicator_service.warmup(asset, spot)
-                self.indicator_service.push_price(asset, spot)
-                await self._process_asset(asset, spot, change)
-            except Exception as exc:  # noqa: BLE001
-                self.last_decision_by_asset[asset] = f"ERROR::{exc.__class__.__name__}"
+            running = self._background_tasks.get(asset)
+            if running is not None and not running.done():
+                self.last_decision_by_asset[asset] = "DEADLINE_EXCEEDED::PREVIOUS_TICK_STILL_RUNNING"
+                self._log_decision(asset, Outcome.DEADLINE_EXCEEDED, None, 0.0)
+                continue
+            runnable.append(asset)
+        if not runnable:
+            return
+        # todas as barras fechadas entram antes de qualquer decisão: no backend em lote, os indicadores são calculados uma vez por tick
+        spots = {asset: price_by_asset.get(asset, (0.0, 0.0))[0] for asset in runnable}
+        for asset, spot in spots.items():
+            self.indicator_service.warmup(asset, spot)
+        closed = self.bar_builder.update(spots, clock.now())
+        # depois de um buraco curto o mesmo ativo fecha várias barras; vão em rodadas, uma barra por ativo
+        for round_ in range(max((len(bars) for bars in closed.values()), default=0)):
+            self.indicator_service.push_bars({asset: bars[round_] for asset, bars in closed.items() if round_ < len(bars)})
+        tasks = {asset: asyncio.create_task(self._tick_asset(asset, price_by_asset.get(asset, (0.0, 0.0)))) for asset in runnable}
+        left = deadline.remaining()
+        _done, pending = await asyncio.wait(tasks.values(), timeout=None if left is None else max(0.0, left))
+        late = [asset for asset, task in tasks.items() if task in pending]
+        for asset in late:
+            self._background_tasks[asset] = tasks[asset]
+            self._stale_assets.add(asset)
+            self.last_decision_by_asset[asset] = "DEADLINE_EXCEEDED::PROCESSING_IN_BACKGROUND"
+            # o evento com a decisão real é registrado pela própria task quando ela terminar
+        if late:
+            annotate(deadline_exceeded=True, background=late)
 
-        result_overrides: dict[str, tuple[float | None, float | None, str]] = {}
-        now = datetime.utcnow()
+    async def _fetch_due_results(self) -> tuple[dict[str, tuple[float | None, float | None, str]], set[str]]:
+        """Busca o resultado dos trades vencidos (uma request por mercado); os que não chegarem até o
+        prazo ficam abertos para o próximo tick em vez de liquidar por snapshot."""
+        now = clock.utcnow()
+        due_by_market: dict[str, list] = {}
         for trade in self.trade_executor.open_trades.values():
             trade.api_mode = self.decide_api_mode(trade.closes_at)
             if now >= trade.closes_at:
-                final_price, price_to_beat, source = await self.poly_service.fetch_market_result(trade.market_id, self.market_map[trade.asset])
-                result_overrides[trade.id] = (final_price, price_to_beat, source)
+                due_by_market.setdefault(trade.market_id, []).append(trade)
+        if not due_by_market:
+            return {}, set()
 
-        self.trade_executor.settle_due_trades(self.latest_snapshots, result_overrides)
-        self.last_tick_at = datetime.utcnow()
-        self.tick_count += 1
+        tasks = [
+            asyncio.create_task(
+                self.poly_service.fetch_market_result(market_id, self.poly_service.window_slug(trades[0].asset, trades[0].window_ts or 0))
+            )
+            for market_id, trades in due_by_market.items()
+        ]
+        left = deadline.remaining()
+        _done, pending = await asyncio.wait(tasks, timeout=None if left is None else max(0.0, left))
+        for task in pending:
+            task.cancel()
+        expired = deadline.expired()
+
+        result_overrides: dict[str, tuple[float | None, float | None, str]] = {}
+        deferred: set[str] = set()
+        for trades, task in zip(due_by_market.values(), tasks):
+            result = None if task in pending else task.result()
+            for trade in trades:
+                if result is None or (expired and result[2] == "NO_RESULT"):
+                    deferred.add(trade.id)
+                else:
+                    result_overrides[trade.id] = result
+        return result_overrides, deferred
+
+    def state_payload(self) -> dict:
+        stats = self.trade_executor.stats
+        return {
+            "stats": {
+                "balance": stats.balance,
+                "today_pnl": stats.today_pnl,
+                "all_time_pnl": stats.all_time_pnl,
+                "trades": stats.trades,
+                "win_rate": stats.win_rate,
+                "avg_pnl": stats.avg_pnl,
+            },
+            "config": self.strategy_config.model_dump(),
+            "available_assets": self.registry.symbols,
+            "execution_config": self.get_execution_config().model_dump(),
+            "running": self.running,
+            "tick_count": self.tick_count,
+            "last_tick_at": self.last_tick_at,
+            "last_decision_by_asset": self.last_decision_by_asset,
+            "markets": {k: v.as_dict() for k, v in self.latest_snapshots.items()},
+            "open_trades": [t.as_dict() for t in self.trade_executor.open_trades.values()],
+            "history": [t.as_dict() for t in self.trade_executor.closed_trades],
+        }
 
     async def shutdown(self) -> None:
         await self.stop()
+        # trades liquidadas por ticks avulsos (sem o loop) também vão para o store
+        await self.trade_store.flush()
+        # a janela aberta também vai para o disco; depois do restart ela continua em outro bloco
+        await self.window_series.flush(include_open=True)
         await self.price_service.close()
         await self.poly_service.close()
 
-
-engine = BotEngine()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+from pathlib import Path
+
+from app.core import clock
+from app.services.price_service import PriceService
+from app.services.tracing import annotate, span
+
+CANDLE_MS = 60_000
+
+# registro fixo por candle: open_time em ms (int64) + close (float64), little-endian
+_RECORD = struct.Struct("<qd")
+
+
+class CandleCache:
+    """Candles de 1m por ativo em arquivo binário compacto (16 bytes por candle)."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def path(self, asset: str) -> Path:
+        return self.cache_dir / f"{asset}-1m.bin"
+
+    def load(self, asset: str) -> list[tuple[int, float]]:
+        path = self.path(asset)
+        if not path.exists():
+            return []
+        data = path.read_bytes()
+        usable = len(data) - len(data) % _RECORD.size
+        return list(_RECORD.iter_unpack(data[:usable]))
+
+    def save(self, asset: str, candles: list[tuple[int, float]]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(asset)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(b"".join(_RECORD.pack(open_ms, close) for open_ms, close in candles))
+        os.replace(tmp, path)
+
+
+class CandleHistory:
+    """Bootstrap do histórico de indicadores a partir de candles reais de 1m.
+
+    O cache em disco guarda os últimos `size` candles de cada ativo; num restart só a cauda
+    que falta (desde o último candle salvo) é buscada, numa única request por ativo.
+    """
+
+    def __init__(self, price_service: PriceService, cache: CandleCache, size: int) -> None:
+        self.price_service = price_service
+        self.cache = cache
+        self.size = size
+
+    async def load(self, assets: list[str]) -> dict[str, list[float]]:
+        with span("bootstrap_candles", assets=len(assets), size=self.size):
+            results = await asyncio.gather(*(self._load_asset(asset) for asset in assets))
+            closes = {asset: [close for _, close in candles] for asset, candles in zip(assets, results) if candles}
+            annotate(loaded=len(closes))
+            return closes
+
+    async def _load_asset(self, asset: str) -> list[tuple[int, float]]:
+        now_ms = int(clock.now() * 1000)
+        oldest_needed = (now_ms // CANDLE_MS - self.size) * CANDLE_MS
+        cached = [c for c in self.cache.load(asset) if c[0] >= oldest_needed]
+
+        start_ms = cached[-1][0] + CANDLE_MS if cached else oldest_needed
+        missing = (now_ms - start_ms) // CANDLE_MS
+        fresh = await self.price_service.fetch_klines(asset, start_ms, int(missing)) if missing > 0 else []
+
+        merged = dict(cached)
+        merged.update(fresh)
+        candles = sorted(merged.items())[-self.size:]
+        if fresh:
+            self.cache.save(asset, candles)
+        return candles
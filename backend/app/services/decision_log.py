@@ -0,0 +1,310 @@
+"""Log estruturado das decisões do engine, uma por ativo por tick.
+
+Cada ativo tem um ring buffer de capacidade fixa em colunas `array` (sem um objeto por
+evento), então registrar toda decisão de todo tick custa poucas escritas em memória. Com
+`spill_dir`, o evento sobrescrito quando o ring dá a volta é empacotado (struct de tamanho
+fixo) e gravado em `decisions-<ATIVO>.bin` fora do event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import struct
+from array import array
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from app.models.entities import Direction
+
+
+class Outcome(IntEnum):
+    WAIT_MARKET_RESOLUTION = 1
+    REAL_MODE_NEEDS_WALLET = 2
+    TIE_UP_DOWN = 3
+    SKIP_DUPLICATE_WINDOW = 4
+    ENTRY_BLOCKED_STALE_DATA = 5
+    WAIT_OPEN_TRADE_TO_CLOSE = 6
+    WAIT_WINDOW_OR_PROB = 7
+    PAPER_ORDER = 8
+    ORDER_PENDING = 9
+    ORDER_SENT = 10
+    ORDER_REJECTED = 11
+    DEADLINE_EXCEEDED = 12
+    ERROR = 13
+    MARKET_PENDING = 14
+
+
+_DIRECTIONS = (None, Direction.UP, Direction.DOWN)
+_DIRECTION_CODE = {None: 0, Direction.UP: 1, Direction.DOWN: 2}
+
+# at, tick, window_ts, remaining_seconds, probability, direction, outcome, latency_ms, stale
+_RECORD = struct.Struct("<dqqidBBfB")
+# registros lidos por vez na consulta ao disco (de trás para frente)
+_READ_CHUNK = 4096
+
+
+class _Ring:
+    __slots__ = ("capacity", "head", "size", "at", "tick", "window_ts", "remaining", "probability", "direction", "outcome", "latency_ms", "stale")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.head = 0
+        self.size = 0
+        self.at = array("d", bytes(8 * capacity))
+        self.tick = array("q", bytes(8 * capacity))
+        self.window_ts = array("q", bytes(8 * capacity))
+        self.remaining = array("i", bytes(4 * capacity))
+        self.probability = array("d", bytes(8 * capacity))
+        self.direction = array("B", bytes(capacity))
+        self.outcome = array("B", bytes(capacity))
+        self.latency_ms = array("f", bytes(4 * capacity))
+        self.stale = array("B", bytes(capacity))
+
+    def pack(self, i: int) -> bytes:
+        return _RECORD.pack(
+            self.at[i], self.tick[i], self.window_ts[i], self.remaining[i], self.probability[i],
+            self.direction[i], self.outcome[i], self.latency_ms[i], self.stale[i],
+        )
+
+    def row(self, i: int) -> tuple:
+        return (
+            self.at[i], self.tick[i], self.window_ts[i], self.remaining[i], self.probability[i],
+            self.direction[i], self.outcome[i], self.latency_ms[i], self.stale[i],
+        )
+
+    def newest_first(self) -> Iterator[tuple]:
+        for k in range(self.size):
+            yield self.row((self.head - 1 - k) % self.capacity)
+
+    def oldest_first(self) -> Iterator[tuple]:
+        for k in range(self.size):
+            yield self.row((self.head - self.size + k) % self.capacity)
+
+
+def _event(asset: str, row: tuple) -> dict:
+    at, tick, window_ts, remaining, probability, direction, outcome, latency_ms, stale = row
+    return {
+        "asset": asset,
+        "at": at,
+        "tick": tick,
+        "window_ts": window_ts if window_ts >= 0 else None,
+        "remaining_seconds": remaining if remaining >= 0 else None,
+        "probability": probability,
+        "direction": _DIRECTIONS[direction].value if direction else None,
+        "outcome": Outcome(outcome).name,
+        "latency_ms": round(latency_ms, 3),
+        "stale": bool(stale),
+    }
+
+
+def _matching(rows: Iterable[tuple], window_ts: int | None, outcomes: set[Outcome] | None, limit: int) -> list[tuple]:
+    """Até `limit` linhas que passam nos filtros, na ordem em que chegam."""
+    found = []
+    if limit <= 0:
+        return found
+    for row in rows:
+        if window_ts is not None and row[2] != window_ts:
+            continue
+        if outcomes and row[6] not in outcomes:
+            continue
+        found.append(row)
+        if len(found) == limit:
+            break
+    return found
+
+
+def _newest(events: list[dict], limit: int) -> list[dict]:
+    events.sort(key=lambda e: (e["at"], e["tick"]), reverse=True)
+    return events[: max(0, limit)]
+
+
+class DecisionLog:
+    def __init__(self, capacity: int = 512, spill_dir: Path | None = None) -> None:
+        self.capacity = max(1, capacity)
+        self.spill_dir = spill_dir
+        self._rings: dict[str, _Ring] = {}
+        self._spill_pending: dict[str, bytearray] = {}
+        # lote da última escrita em disco (pode estar em andamento)
+        self._spilling: dict[str, bytearray] = {}
+        self._spill_task: asyncio.Task | None = None
+        self.spilled = 0
+
+    def record(
+        self,
+        asset: str,
+        at: float,
+        tick: int,
+        outcome: Outcome,
+        window_ts: int | None = None,
+        remaining_seconds: int | None = None,
+        probability: float = 0.0,
+        direction: Direction | None = None,
+        latency_ms: float = 0.0,
+        stale: bool = False,
+    ) -> None:
+        ring = self._rings.get(asset)
+        if ring is None:
+            ring = self._rings[asset] = _Ring(self.capacity)
+        i = ring.head
+        if ring.size == ring.capacity:
+            if self.spill_dir is not None:
+                self._spill_pending.setdefault(asset, bytearray()).extend(ring.pack(i))
+        else:
+            ring.size += 1
+        ring.at[i] = at
+        ring.tick[i] = tick
+        ring.window_ts[i] = -1 if window_ts is None else window_ts
+        ring.remaining[i] = -1 if remaining_seconds is None else remaining_seconds
+        ring.probability[i] = probability
+        ring.direction[i] = _DIRECTION_CODE[direction]
+        ring.outcome[i] = outcome
+        ring.latency_ms[i] = latency_ms
+        ring.stale[i] = stale
+        ring.head = (i + 1) % ring.capacity
+
+    def query(
+        self,
+        asset: str | None = None,
+        window_ts: int | None = None,
+        outcomes: set[Outcome] | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Eventos dos rings, mais recentes primeiro."""
+        assets = [asset] if asset is not None else list(self._rings)
+        events: list[dict] = []
+        for name in assets:
+            rows = self._rings[name].newest_first() if name in self._rings else iter(())
+            events.extend(_event(name, row) for row in _matching(rows, window_ts, outcomes, limit))
+        return _newest(events, limit)
+
+    async def query_spilled(
+        self,
+        asset: str | None = None,
+        window_ts: int | None = None,
+        outcomes: set[Outcome] | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Como `query`, continuando pelo que saiu do ring: pendentes de spill e disco.
+
+        O disco é lido de trás para frente, em blocos e em thread, e a leitura de cada ativo
+        para quando encontra `limit` eventos que passam nos filtros.
+        """
+        assets = [asset] if asset is not None else self.assets()
+        events: list[dict] = []
+        for name in assets:
+            # memória copiada antes de ler o disco (mais recentes primeiro); o lote que for gravado
+            # durante a leitura aparece nos dois lados e a repetição é descartada
+            memory = list(self._rings[name].newest_first()) if name in self._rings else []
+            for batch in (self._spill_pending, self._spilling):
+                memory.extend(reversed(list(_RECORD.iter_unpack(bytes(batch.get(name, b""))))))
+            rows = _matching(memory, window_ts, outcomes, limit)
+            if len(rows) < limit:
+                rows.extend(await asyncio.to_thread(self._spilled_backwards, name, window_ts, outcomes, limit))
+            seen: set[tuple] = set()
+            unique = [row for row in rows if not (row in seen or seen.add(row))]
+            events.extend(_event(name, row) for row in unique[:limit])
+        return _newest(events, limit)
+
+    def _spilled_backwards(
+        self, asset: str, window_ts: int | None, outcomes: set[Outcome] | None, limit: int
+    ) -> list[tuple]:
+        path = self.spill_path(asset)
+        if path is None or not path.exists():
+            return []
+        size = _RECORD.size
+        rows: list[tuple] = []
+        with path.open("rb") as f:
+            end = f.seek(0, 2) // size
+            while end > 0 and len(rows) < limit:
+                start = max(0, end - _READ_CHUNK)
+                f.seek(start * size)
+                chunk = list(_RECORD.iter_unpack(f.read((end - start) * size)))
+                rows.extend(_matching(reversed(chunk), window_ts, outcomes, limit - len(rows)))
+                end = start
+        return rows
+
+    async def export_page(self, asset: str, after: tuple[float, int], until: float | None, limit: int) -> list[dict]:
+        """Até `limit` eventos do ativo com (at, tick) depois de `after`, mais antigos primeiro.
+
+        A sequência de um ativo (disco, pendentes de spill, ring) é crescente em (at, tick), então
+        a chave do último evento exportado serve de cursor estável mesmo com o ring girando entre
+        páginas. O disco é lido em thread, por busca binária.
+        """
+        # memória copiada antes de ler o disco: o que for gravado durante a leitura aparece nos
+        # dois lados, e a chave descarta a repetição
+        memory = list(_RECORD.iter_unpack(bytes(self._spilling.get(asset, b""))))
+        memory.extend(_RECORD.iter_unpack(bytes(self._spill_pending.get(asset, b""))))
+        if asset in self._rings:
+            memory.extend(self._rings[asset].oldest_first())
+        rows = await asyncio.to_thread(self._spilled_after, asset, after, limit)
+        if len(rows) < limit:
+            last = (rows[-1][0], rows[-1][1]) if rows else after
+            rows.extend(row for row in memory if (row[0], row[1]) > last)
+        events = []
+        for row in rows[:limit]:
+            if until is not None and row[0] > until:
+                break
+            events.append(_event(asset, row))
+        return events
+
+    def _spilled_after(self, asset: str, after: tuple[float, int], limit: int) -> list[tuple]:
+        path = self.spill_path(asset)
+        if path is None or not path.exists():
+            return []
+        size = _RECORD.size
+        with path.open("rb") as f:
+            count = f.seek(0, 2) // size
+            lo, hi = 0, count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid * size)
+                at, tick = _RECORD.unpack(f.read(size))[:2]
+                if (at, tick) > after:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            f.seek(lo * size)
+            data = f.read(min(limit, count - lo) * size)
+        return list(_RECORD.iter_unpack(data))
+
+    def assets(self) -> list[str]:
+        """Ativos com eventos em memória ou no disco (de execuções anteriores inclusive)."""
+        names = set(self._rings)
+        if self.spill_dir is not None and self.spill_dir.exists():
+            names.update(path.stem.removeprefix("decisions-") for path in self.spill_dir.glob("decisions-*.bin"))
+        return sorted(names)
+
+    def spill_path(self, asset: str) -> Path | None:
+        return None if self.spill_dir is None else self.spill_dir / f"decisions-{asset}.bin"
+
+    def maybe_spill(self) -> None:
+        """Grava em thread o que o ring sobrescreveu desde a última rodada; uma escrita por vez."""
+        if not self._spill_pending or (self._spill_task is not None and not self._spill_task.done()):
+            return
+        pending, self._spill_pending = self._spill_pending, {}
+        self._spilling = pending
+        self._spill_task = asyncio.create_task(asyncio.to_thread(self._write_spill, pending))
+
+    async def flush(self) -> None:
+        if self._spill_task is not None:
+            await self._spill_task
+        if self._spill_pending:
+            pending, self._spill_pending = self._spill_pending, {}
+            self._spilling = pending
+            await asyncio.to_thread(self._write_spill, pending)
+
+    def _write_spill(self, pending: dict[str, bytearray]) -> None:
+        assert self.spill_dir is not None
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        for asset, data in pending.items():
+            with self.spill_path(asset).open("ab") as f:
+                f.write(data)
+            self.spilled += len(data) // _RECORD.size
+
+    def stats(self) -> dict:
+        return {
+            "capacity_per_asset": self.capacity,
+            "buffered": {asset: ring.size for asset, ring in self._rings.items()},
+            "spill_dir": str(self.spill_dir) if self.spill_dir else None,
+            "spilled": self.spilled,
+        }
@@ -0,0 +1,324 @@
+"""Fronteira entre a API e o engine de trading.
+
+As rotas nunca tocam o `BotEngine` diretamente: chamam `gateway.call(comando, **args)`.
+`LocalEngineGateway` despacha no mesmo processo (dev, testes, um worker só);
+`RemoteEngineGateway` fala com o processo `app.engine_worker` por um socket Unix, de modo
+que vários workers de API stateless compartilham um único engine sem nunca atrasar o tick.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.models.entities import AccountConfig, ExecutionConfigUpdate, ShadowStrategyConfig, StrategyConfig
+from app.services import exporter
+from app.services.bot_engine import BotEngine
+from app.services.decision_log import Outcome
+from app.services.order_manager import OrderState
+
+# uma linha JSON por mensagem; estados grandes cabem folgado
+STREAM_LIMIT = 64 * 1024 * 1024
+# comandos cuja resposta já sai só com tipos JSON
+_JSON_NATIVE = frozenset({"export_page"})
+
+
+class EngineCommandError(Exception):
+    """Erro de um comando do engine, com o status HTTP que a rota deve devolver."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class EngineCommands:
+    """Tabela de comandos executados no processo do engine; respostas são JSON puro."""
+
+    def __init__(self, engine: BotEngine) -> None:
+        self.engine = engine
+        self._state_cache: tuple[str, dict] | None = None
+        self._commands: dict[str, Callable[..., Awaitable[dict]]] = {
+            "health": self.health,
+            "start": self.start,
+            "stop": self.stop,
+            "tick": self.tick,
+            "get_config": self.get_config,
+            "update_config": self.update_config,
+            "registry": self.registry,
+            "get_execution_config": self.get_execution_config,
+            "update_execution_config": self.update_execution_config,
+            "state": self.state,
+            "analytics": self.analytics,
+            "decisions": self.decisions,
+            "bars": self.bars,
+            "window_series": self.window_series,
+            "shadow": self.shadow,
+            "update_shadow": self.update_shadow,
+            "accounts": self.accounts,
+            "update_accounts": self.update_accounts,
+            "debug_ticks": self.debug_ticks,
+            "debug_tick": self.debug_tick,
+            "rate_limits": self.rate_limits,
+            "orders": self.orders,
+            "order_queue": self.order_queue,
+            "export_page": self.export_page,
+            "snapshot": self.snapshot,
+            "profile": self.profile,
+        }
+
+    async def dispatch(self, command: str, args: dict[str, Any]) -> dict:
+        handler = self._commands.get(command)
+        if handler is None:
+            raise EngineCommandError(400, f"comando desconhecido: {command}")
+        result = await handler(**args)
+        # páginas do export já vêm só com tipos JSON; o encoder custaria dezenas de ms por página
+        return result if command in _JSON_NATIVE else jsonable_encoder(result)
+
+    async def health(self) -> dict:
+        engine = self.engine
+        return {"status": "ok", "running": engine.running, "last_tick_at": engine.last_tick_at, "tick_count": engine.tick_count}
+
+    async def start(self) -> dict:
+        await self.engine.start()
+        return {"status": "started"}
+
+    async def stop(self) -> dict:
+        await self.engine.stop()
+        return {"status": "stopped"}
+
+    async def tick(self) -> dict:
+        await self.engine.tick()
+        return {"status": "tick_complete", "tick_count": self.engine.tick_count}
+
+    async def get_config(self) -> dict:
+        return {"config": self.engine.strategy_config.model_dump()}
+
+    async def update_config(self, config: dict, allow_empty: bool = False) -> dict:
+        try:
+            updated = self.engine.update_strategy_config(StrategyConfig(**config), allow_empty=allow_empty)
+        except ValueError as exc:
+            raise EngineCommandError(400, str(exc)) from exc
+        return {"status": "updated", "config": updated.model_dump()}
+
+    async def registry(self) -> dict:
+        return {"markets": [spec.to_dict() for spec in self.engine.registry]}
+
+    async def get_execution_config(self) -> dict:
+        return {"execution_config": self.engine.get_execution_config().model_dump()}
+
+    async def update_execution_config(self, config: dict) -> dict:
+        updated = self.engine.update_execution_config(ExecutionConfigUpdate(**config))
+        return {"status": "updated", "execution_config": updated.model_dump()}
+
+    async def state(self, since: str | None = None) -> dict:
+        """Estado versionado: serializado uma vez por versão; quem já tem a versão recebe só `unchanged`."""
+        version = self.engine.state_key
+        if since == version:
+            return {"version": version, "unchanged": True}
+        if self._state_cache is None or self._state_cache[0] != version:
+            self._state_cache = (version, jsonable_encoder(self.engine.state_payload()))
+        return {"version": version, "state": self._state_cache[1]}
+
+    async def analytics(self) -> dict:
+        return self.engine.trade_executor.analytics.view()
+
+    async def decisions(
+        self,
+        asset: str | None = None,
+        window_ts: int | None = None,
+        outcome: str | None = None,
+        limit: int = 100,
+        include_spilled: bool = False,
+    ) -> dict:
+        try:
+            outcomes = {Outcome[name.strip().upper()] for name in outcome.split(",") if name.strip()} if outcome else None
+        except KeyError as exc:
+            raise EngineCommandError(400, f"outcome desconhecido: {exc.args[0]} (use {', '.join(o.name for o in Outcome)})") from None
+        log = self.engine.decision_log
+        events = await log.query_spilled(asset, window_ts, outcomes, limit) if include_spilled else log.query(asset, window_ts, outcomes, limit)
+        return {"decisions": events, "buffer": log.stats()}
+
+    async def bars(self, asset: str, timeframe: str = "1m", limit: int = 100) -> dict:
+        if asset not in self.engine.registry.symbols:
+            raise EngineCommandError(404, f"ativo desconhecido: {asset}")
+        try:
+            return self.engine.bar_builder.bars(asset, timeframe, limit)
+        except KeyError as exc:
+            raise EngineCommandError(400, exc.args[0]) from None
+
+    async def window_series(self, asset: str, window_ts: int | None = None) -> dict:
+        if asset not in self.engine.registry.symbols:
+            raise EngineCommandError(404, f"ativo desconhecido: {asset}")
+        store = self.engine.window_series
+        if window_ts is None:
+            return {"asset": asset, "windows": await store.windows(asset), "store": store.stats()}
+        series = await store.series(asset, window_ts)
+        if series is None:
+            raise EngineCommandError(404, f"janela {window_ts} de {asset} sem pontos")
+        return series
+
+    async def shadow(self) -> dict:
+        return self.engine.shadow.view()
+
+    async def update_shadow(self, strategies: list[dict]) -> dict:
+        try:
+            updated = self.engine.update_shadow_strategies([ShadowStrategyConfig(**s) for s in strategies])
+        except ValueError as exc:
+            raise EngineCommandError(400, str(exc)) from exc
+        return {"status": "updated", "strategies": [s.model_dump() for s in updated]}
+
+    async def accounts(self) -> dict:
+        return self.engine.accounts.view()
+
+    async def update_accounts(self, accounts: list[dict]) -> dict:
+        try:
+            self.engine.update_accounts([AccountConfig(**a) for a in accounts])
+        except ValueError as exc:
+            raise EngineCommandError(400, str(exc)) from exc
+        # a resposta não devolve os segredos das carteiras
+        return {"status": "updated", "accounts": [a.view()["config"] for a in self.engine.accounts.accounts]}
+
+    async def debug_ticks(self, limit: int | None = None) -> dict:
+        tracer = self.engine.tracer
+        return {"capacity": tracer.capacity, "pending_profiles": tracer.pending_profiles(), "ticks": tracer.recent(limit)}
+
+    async def debug_tick(self, tick: int) -> dict:
+        trace = self.engine.tracer.get(tick)
+        if trace is None:
+            raise EngineCommandError(404, f"tick {tick} não está no buffer")
+        return trace
+
+    async def rate_limits(self) -> dict:
+        return self.engine.rate_limiter.snapshot()
+
+    async def orders(self) -> dict:
+        return self.engine.poly_service.orders.stats()
+
+    async def order_queue(self, state: str | None = None, asset: str | None = None, limit: int = 100) -> dict:
+        if state is not None and state.upper() not in OrderState.__members__:
+            raise EngineCommandError(400, f"estado de ordem desconhecido: {state}")
+        return self.engine.order_manager.view(state, asset, limit)
+
+    async def export_page(
+        self,
+        kind: str,
+        cursor: Any = None,
+        asset: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> dict:
+        if asset is not None and asset not in self.engine.registry.symbols:
+            raise EngineCommandError(404, f"ativo desconhecido: {asset}")
+        try:
+            return await exporter.export_page(self.engine, kind, cursor, asset, since, until, settings.export_page_size)
+        except ValueError as exc:
+            raise EngineCommandError(400, str(exc)) from None
+
+    async def snapshot(self) -> dict:
+        snapshotter = self.engine.snapshotter
+        return {"path": str(snapshotter.path), **vars(snapshotter.stats)}
+
+    async def profile(self, mode: str, tick: int | None = None) -> dict:
+        try:
+            self.engine.tracer.request_profile(mode, tick)
+        except ValueError as exc:
+            raise EngineCommandError(400, str(exc)) from exc
+        return {"status": "scheduled", "pending_profiles": self.engine.tracer.pending_profiles()}
+
+
+class LocalEngineGateway:
+    """Engine no mesmo processo da API."""
+
+    def __init__(self, engine: BotEngine) -> None:
+        self.engine = engine
+        self.commands = EngineCommands(engine)
+
+    async def startup(self) -> None:
+        self.engine.restore_snapshot()
+
+    async def shutdown(self) -> None:
+        await self.engine.shutdown()
+
+    async def call(self, command: str, **args: Any) -> dict:
+        return await self.commands.dispatch(command, args)
+
+    async def state(self) -> dict:
+        return (await self.call("state"))["state"]
+
+
+class RemoteEngineGateway:
+    """Cliente IPC do processo do engine (socket Unix, uma linha JSON por request/resposta).
+
+    Mantém um pool de conexões e a última versão do estado: `/api/state` só recebe o payload
+    inteiro quando o engine publicou uma versão nova.
+    """
+
+    def __init__(self, socket_path: Path, timeout_seconds: float = 30.0) -> None:
+        self.socket_path = socket_path
+        self.timeout_seconds = timeout_seconds
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.state_version: str | None = None
+        self._state: dict | None = None
+
+    async def startup(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        while self._idle:
+            _reader, writer = self._idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    async def call(self, command: str, **args: Any) -> dict:
+        reader, writer = self._idle.pop() if self._idle else await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+        try:
+            writer.write(json.dumps({"command": command, "args": args}).encode() + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), self.timeout_seconds)
+            if not line:
+                raise ConnectionError("engine fechou a conexão")
+        except BaseException:
+            writer.close()
+            raise
+        self._idle.append((reader, writer))
+        reply = json.loads(line)
+        if "error" in reply:
+            raise EngineCommandError(reply["error"]["status_code"], reply["error"]["detail"])
+        return reply["result"]
+
+    async def state(self) -> dict:
+        reply = await self.call("state", since=self.state_version)
+        if not reply.get("unchanged"):
+            self.state_version, self._state = reply["version"], reply["state"]
+        return self._state or {}
+
+
+async def serve(commands: EngineCommands, socket_path: Path) -> asyncio.AbstractServer:
+    """Servidor IPC do processo do engine."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    reply = {"result": await commands.dispatch(request["command"], request.get("args") or {})}
+                except EngineCommandError as exc:
+                    reply = {"error": {"status_code": exc.status_code, "detail": exc.detail}}
+                except (ValueError, KeyError, TypeError) as exc:
+                    reply = {"error": {"status_code": 400, "detail": f"{exc.__class__.__name__}: {exc}"}}
+                writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: conexão ainda aberta quando o processo encerra o loop
+            pass
+        finally:
+            writer.close()
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+    return await asyncio.start_unix_server(handle, path=str(socket_path), limit=STREAM_LIMIT)
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from array import array
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from app.core import clock
+from app.models.entities import BotStats, StrategyConfig
+from app.models.records import SnapshotRecord, TradeRecord
+from app.services.polymarket_service import MarketData
+from app.services.trade_analytics import TradeAnalytics
+from app.services.trade_executor import TradeExecutor
+
+if TYPE_CHECKING:
+    from app.services.bot_engine import BotEngine
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"PSNP"
+SNAPSHOT_VERSION = 2
+# magic, versão, crc32 do corpo comprimido
+_HEADER = struct.Struct("<4sHI")
+# histórico de indicador mais velho que isso não é restaurado: o bootstrap de candles refaz melhor
+MAX_HISTORY_AGE_SECONDS = 300
+# a captura roda no event loop; o intervalo cresce para ela nunca passar de ~1% do tempo
+MAX_LOOP_SHARE = 0.01
+
+
+@dataclass
+class SnapshotStats:
+    writes: int = 0
+    skipped: int = 0
+    restored: bool = False
+    last_capture_ms: float = 0.0
+    last_write_ms: float = 0.0
+    last_bytes: int = 0
+    last_written_at: float | None = None
+    interval_seconds: float = 0.0
+    failures: int = 0
+    last_error: str | None = None
+
+
+def _book_state(executor: TradeExecutor) -> dict:
+    return {
+        "stats": executor.stats.model_dump(mode="json"),
+        "open_trades": [t.as_dict() for t in executor.open_trades.values()],
+        "closed_trades": [t.as_dict() for t in executor.closed_trades],
+        "analytics": executor.analytics.to_state(),
+    }
+
+
+def _decode_book(state: dict, analytics: TradeAnalytics) -> tuple:
+    """Book do snapshot em objetos prontos, sem tocar no executor; `analytics` (novo) recebe os buckets."""
+    if "analytics" in state:
+        analytics.load_state(state["analytics"])
+    return (
+        BotStats(**state["stats"]),
+        {t["id"]: TradeRecord.from_dict(t) for t in state["open_trades"]},
+        [TradeRecord.from_dict(t) for t in state["closed_trades"]],
+        analytics if "analytics" in state else None,
+    )
+
+
+def _assign_book(executor: TradeExecutor, book: tuple) -> None:
+    executor.stats, executor.open_trades, executor.closed_trades, analytics = book
+    if analytics is not None:
+        executor.analytics = analytics
+
+
+def capture(engine: "BotEngine") -> dict:
+    """Cópia em dados puros do estado do engine; precisa rodar no event loop para ser consistente."""
+    return {
+        "created_at": clock.now(),
+        "tick_count": engine.tick_count,
+        "strategy_config": engine.strategy_config.model_dump(mode="json"),
+        **_book_state(engine.trade_executor),
+        # books das contas, pelo nome (a config delas, com os segredos, não vai para o snapshot)
+        "accounts": {
+            name: {**_book_state(account.executor), "last_decision_by_asset": dict(account.last_decision_by_asset)}
+            for name, account in engine.accounts.books().items()
+        },
+        # books das estratégias sombra, pelo nome; `entered_windows` evita reentrar numa janela após o restart
+        "shadow": {
+            strategy.config.name: {
+                **_book_state(strategy.executor),
+                "last_decision_by_asset": dict(strategy.last_decision_by_asset),
+                "entered_windows": [[asset, window_ts, closes_at] for (asset, window_ts), closes_at in strategy.entered_windows.items()],
+            }
+            for strategy in engine.shadow.strategies
+        },
+        "latest_snapshots": {k: v.as_dict() for k, v in engine.latest_snapshots.items()},
+        "last_decision_by_asset": dict(engine.last_decision_by_asset),
+        "markets": {k: asdict(v) for k, v in engine.market_resolver.latest.items()},
+        "market_fetched_at": dict(engine.market_resolver.fetched_at),
+        # barras OHLCV como floats crus (5 x 8 bytes por barra) em vez de texto JSON
+        "indicator_bars": {
+            asset: base64.b64encode(array("d", [value for bar in bars for value in bar]).tobytes()).decode()
+            for asset, bars in engine.indicator_service.snapshot().items()
+        },
+    }
+
+
+def _json_default(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"tipo não serializável no snapshot: {type(value).__name__}")
+
+
+def encode(state: dict) -> bytes:
+    body = zlib.compress(json.dumps(state, separators=(",", ":"), default=_json_default).encode(), 6)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(body)) + body
+
+
+def decode(data: bytes) -> dict:
+    if len(data) < _HEADER.size:
+        raise ValueError("snapshot truncado")
+    magic, version, crc = _HEADER.unpack_from(data)
+    body = data[_HEADER.size:]
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot incompatível: {magic!r} v{version}")
+    if zlib.crc32(body) != crc:
+        raise ValueError("snapshot corrompido (crc)")
+    return json.loads(zlib.decompress(body))
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def apply(engine: "BotEngine", state: dict) -> None:
+    """Restaura o estado no engine.
+
+    Tudo é decodificado antes da primeira atribuição: um snapshot com campo faltando ou inválido
+    levanta a exceção com o engine intacto, nunca meio restaurado.
+    """
+    current = engine.trade_executor.analytics
+    book = _decode_book(state, TradeAnalytics(current.day_retention, current.equity_curve.maxlen or 1))
+    accounts = {
+        name: (_decode_book(account, TradeAnalytics()), dict(account["last_decision_by_asset"]))
+        for name, account in state.get("accounts", {}).items()
+    }
+    # só as estratégias sombra da config atual recebem o book
+    strategies = {strategy.config.name: strategy for strategy in engine.shadow.strategies}
+    shadow = {
+        name: (
+            _decode_book(strategy, TradeAnalytics()),
+            dict(strategy["last_decision_by_asset"]),
+            {(asset, window_ts): datetime.fromisoformat(closes_at) for asset, window_ts, closes_at in strategy["entered_windows"]},
+        )
+        for name, strategy in state.get("shadow", {}).items()
+        if name in strategies
+    }
+    tick_count = int(state["tick_count"])
+    last_decision_by_asset = {k: v for k, v in state["last_decision_by_asset"].items() if k in engine.registry}
+    latest_snapshots = {k: SnapshotRecord.from_dict(v) for k, v in state["latest_snapshots"].items() if k in engine.registry}
+    markets = {k: MarketData(**v) for k, v in state["markets"].items() if k in engine.registry}
+    market_fetched_at = {k: float(v) for k, v in state["market_fetched_at"].items() if k in engine.registry}
+    config = StrategyConfig(**state["strategy_config"])
+    config.enabled_assets = [a for a in config.enabled_assets if a in engine.registry]
+    history: dict[str, list] = {}
+    if clock.now() - state["created_at"] <= MAX_HISTORY_AGE_SECONDS:
+        # snapshots anteriores guardavam só os closes
+        for asset, raw in state.get("indicator_history", {}).items():
+            prices = array("d")
+            prices.frombytes(base64.b64decode(raw))
+            history[asset] = prices.tolist()
+        for asset, raw in state.get("indicator_bars", {}).items():
+            values = array("d")
+            values.frombytes(base64.b64decode(raw))
+            history[asset] = [tuple(values[i : i + 5]) for i in range(0, len(values), 5)]
+
+    _assign_book(engine.trade_executor, book)
+    for name, (account_book, decisions) in accounts.items():
+        account = engine.accounts.restore(name)
+        _assign_book(account.executor, account_book)
+        account.last_decision_by_asset = decisions
+    for name, (strategy_book, decisions, entered_windows) in shadow.items():
+        strategy = strategies[name]
+        _assign_book(strategy.executor, strategy_book)
+        strategy.last_decision_by_asset = decisions
+        strategy.entered_windows = entered_windows
+    engine.tick_count = tick_count
+    engine.last_decision_by_asset = last_decision_by_asset
+    engine.latest_snapshots = latest_snapshots
+    engine.market_resolver.latest = markets
+    engine.market_resolver.fetched_at = market_fetched_at
+    if config.enabled_assets:
+        engine.strategy_config = config
+    for asset, bars in history.items():
+        engine.indicator_service.seed(asset, bars)
+
+
+class EngineSnapshotter:
+    """Snapshots periódicos e atômicos do estado do engine.
+
+    Só a captura (cópia para dados puros) roda no event loop; serialização, compressão e
+    escrita vão para uma thread. Uma escrita por vez: se a anterior ainda não terminou, a
+    rodada é pulada.
+    """
+
+    def __init__(self, path: Path, interval_seconds: float) -> None:
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.stats = SnapshotStats(interval_seconds=interval_seconds)
+        self._next_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0
+
+    def maybe_write(self, engine: "BotEngine") -> None:
+        if not self.enabled or time.monotonic() < self._next_at:
+            return
+        if self._task is not None and not self._task.done():
+            self.stats.skipped += 1
+            return
+        self._task = asyncio.create_task(self.write(engine))
+        self._task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task) -> None:
+        # ninguém espera a task de `maybe_write`: a falha é registrada aqui e a próxima rodada tenta de novo
+        if task.cancelled() or task.exception() is None:
+            return
+        error = task.exception()
+        self.stats.failures += 1
+        self.stats.last_error = f"{error.__class__.__name__}: {error}"
+        logger.error("falha ao gravar o snapshot em %s", self.path, exc_info=error)
+
+    async def write(self, engine: "BotEngine") -> None:
+        started = time.perf_counter()
+        state = capture(engine)
+        capture_seconds = time.perf_counter() - started
+        self.stats.last_capture_ms = round(capture_seconds * 1000, 3)
+        self.stats.interval_seconds = max(self.interval_seconds, capture_seconds / MAX_LOOP_SHARE)
+        self._next_at = time.monotonic() + self.stats.interval_seconds
+
+        def encode_and_write() -> int:
+            data = encode(state)
+            write_atomic(self.path, data)
+            return len(data)
+
+        started = time.perf_counter()
+        self.stats.last_bytes = await asyncio.to_thread(encode_and_write)
+        self.stats.last_write_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.stats.last_written_at = clock.now()
+        self.stats.writes += 1
+
+    async def flush(self, engine: "BotEngine") -> None:
+        if not self.enabled:
+            return
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.write(engine)
+
+    def restore(self, engine: "BotEngine") -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            apply(engine, decode(self.path.read_bytes()))
+        except (ValueError, KeyError, TypeError, OSError) as error:
+            # o próximo `maybe_write` sobrescreveria o arquivo: ele vai para o lado, para inspeção ou restore manual
+            self.stats.last_error = f"restore: {error.__class__.__name__}: {error}"
+            aside = self.path.with_suffix(self.path.suffix + ".corrupt")
+            try:
+                os.replace(self.path, aside)
+            except OSError:
+                aside = None
+            logger.error("snapshot em %s não foi restaurado (movido para %s)", self.path, aside, exc_info=error)
+            return False
+        self.stats.restored = True
+        return True
@@ -0,0 +1,158 @@
+"""Export em streaming de trades, ticks e decisões (`GET /api/export/{kind}`).
+
+O engine responde por páginas (`export_page`): no máximo `EXPORT_PAGE_SIZE` linhas, já só
+com tipos JSON (o gateway não passa a página pelo `jsonable_encoder`), e um cursor para a
+próxima. Do lado da API, `iter_pages` percorre as páginas pelo gateway e
+`ndjson_chunks`/`csv_chunks` viram cada uma num bloco de texto, então a memória fica na
+ordem de uma página, seja o export de mil linhas ou de dezenas de milhões. Leitura de disco
+roda em thread e cada página devolve o controle ao event loop.
+
+Cursores:
+- `trades`: offset em bytes no `TRADE_STORE_PATH` (sem store, as `closed_trades` em memória);
+- `decisions`: `[índice do ativo, at, tick]` do último evento exportado;
+- `ticks`: número do último tick exportado (só os do `TickTracer`, `TRACE_BUFFER_SIZE`).
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.records import TradeRecord
+from app.services.trade_store import trade_row
+
+if TYPE_CHECKING:
+    from app.services.bot_engine import BotEngine
+
+EXPORT_KINDS = ("trades", "decisions", "ticks")
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# colunas do CSV; no NDJSON cada linha é o objeto completo
+CSV_COLUMNS = {
+    "trades": list(TradeRecord.__slots__),
+    "decisions": [
+        "asset", "at", "tick", "window_ts", "remaining_seconds", "probability", "direction", "outcome", "latency_ms", "stale",
+    ],
+    "ticks": ["tick", "started_at", "duration_ms", "spans", "profile"],
+}
+
+
+def _epoch(value: datetime) -> float:
+    # datetimes do engine são UTC naive
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+async def export_page(
+    engine: BotEngine,
+    kind: str,
+    cursor: Any,
+    asset: str | None,
+    since: float | None,
+    until: float | None,
+    limit: int,
+) -> dict:
+    if kind == "trades":
+        return await _trades_page(engine, cursor, asset, since, until, limit)
+    if kind == "decisions":
+        return await _decisions_page(engine, cursor, asset, since, until, limit)
+    if kind == "ticks":
+        return _ticks_page(engine, cursor, since, until, limit)
+    raise ValueError(f"export desconhecido: {kind} (use {', '.join(EXPORT_KINDS)})")
+
+
+async def _trades_page(
+    engine: BotEngine, cursor: int | None, asset: str | None, since: float | None, until: float | None, limit: int
+) -> dict:
+    store = engine.trade_store
+    if store.enabled:
+        rows, next_offset = await store.export_page(cursor or 0, asset, since, until, limit)
+        return {"rows": rows, "cursor": next_offset}
+    # sem store: só o que está em memória (no máximo 200), numa página
+    rows = []
+    for trade in reversed(engine.trade_executor.closed_trades):
+        closed = _epoch(trade.closed_at) if trade.closed_at else None
+        if asset is not None and trade.asset != asset:
+            continue
+        if (since is not None or until is not None) and (
+            closed is None or (since is not None and closed < since) or (until is not None and closed > until)
+        ):
+            continue
+        rows.append(trade_row(trade))
+    return {"rows": rows, "cursor": None}
+
+
+async def _decisions_page(
+    engine: BotEngine, cursor: list | None, asset: str | None, since: float | None, until: float | None, limit: int
+) -> dict:
+    log = engine.decision_log
+    assets = [asset] if asset is not None else log.assets()
+    start = (since if since is not None else float("-inf"), -1)
+    index, after = 0, start
+    if cursor:
+        index = cursor[0]
+        after = (cursor[1], cursor[2]) if cursor[1] is not None else start
+    while index < len(assets):
+        events = await log.export_page(assets[index], after, until, limit)
+        if len(events) == limit:
+            return {"rows": events, "cursor": [index, events[-1]["at"], events[-1]["tick"]]}
+        index, after = index + 1, start
+        if events:
+            return {"rows": events, "cursor": [index, None, None] if index < len(assets) else None}
+    return {"rows": [], "cursor": None}
+
+
+def _ticks_page(engine: BotEngine, cursor: int | None, since: float | None, until: float | None, limit: int) -> dict:
+    rows = []
+    for trace in engine.tracer.traces():
+        if cursor is not None and trace.tick <= cursor:
+            continue
+        started = _epoch(trace.started_at)
+        if (since is not None and started < since) or (until is not None and started > until):
+            continue
+        rows.append(jsonable_encoder(trace.to_dict()))
+        if len(rows) == limit:
+            return {"rows": rows, "cursor": trace.tick}
+    return {"rows": rows, "cursor": None}
+
+
+async def iter_pages(gateway: Any, kind: str, **filters: Any) -> AsyncIterator[list[dict]]:
+    """Páginas do export pelo gateway (local, remoto ou coordenador de shards) até o cursor acabar."""
+    cursor = None
+    while True:
+        page = await gateway.call("export_page", kind=kind, cursor=cursor, **filters)
+        yield page["rows"]
+        cursor = page["cursor"]
+        if cursor is None:
+            return
+        # gateway local: a página pode ter saído toda da memória, sem nenhum await real
+        await asyncio.sleep(0)
+
+
+async def ndjson_chunks(pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    async for rows in pages:
+        if rows:
+            yield b"".join(json.dumps(row, separators=(",", ":")).encode() + b"\n" for row in rows)
+
+
+async def csv_chunks(pages: AsyncIterator[list[dict]], columns: list[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in pages:
+        for row in rows:
+            writer.writerow(_csv_cell(row.get(column)) for column in columns)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _csv_cell(value: Any) -> Any:
+    # spans/profile dos ticks: JSON dentro da célula
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return "" if value is None else value
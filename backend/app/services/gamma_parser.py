@@ -0,0 +1,312 @@
+"""Parser dos payloads da Gamma, especializado pelo formato de cada resposta.
+
+As funções `extract_*` são o caminho genérico: testam as chaves alternativas em ordem e
+decodificam os campos que chegam como string JSON (`outcomePrices`, `clobTokenIds`). Um
+mercado da Gamma tem sempre as mesmas chaves, na mesma ordem, tick após tick; `GammaParser`
+usa a tupla de chaves como assinatura do formato e compila, uma vez por formato, um extrator
+que já sabe de qual chave ler cada campo e como convertê-la. Campos que não mudam entre ticks
+(`endDate`, `clobTokenIds`) ficam memorizados pelo texto bruto, e `outcomePrices` é lido por
+fatiamento da string. Se um valor foge do formato compilado, aquele campo cai no caminho
+genérico, então o resultado é sempre o mesmo das funções `extract_*`.
+
+Com `orjson` instalado (`pip install orjson`), o corpo das respostas é decodificado direto
+dos bytes por ele; sem, pelo `json` da stdlib.
+"""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+_loads: Callable[[bytes | str], Any] = orjson.loads if orjson is not None else json.loads
+
+END_TS_KEYS = ("endDate", "endTime", "endTimestamp", "closingDate")
+PRICE_TO_BEAT_KEYS = ("priceToBeat", "strikePrice", "targetPrice")
+FINAL_PRICE_KEYS = ("finalPrice", "outcomePrice", "settlementPrice")
+TOKEN_KEYS = ("clobTokenIds", "clob_token_ids")
+
+# memória dos campos estáveis; zera ao encher (um mercado novo por ativo a cada janela)
+_MEMO_SIZE = 4096
+
+
+def extract_market_end_ts(item: dict) -> int | None:
+    for key in END_TS_KEYS:
+        value = item.get(key)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)):
+            return int(value)
+        if isinstance(value, str):
+            try:
+                dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return int(dt.timestamp())
+            except Exception:
+                continue
+    return None
+
+
+def extract_yes(payload: object) -> float | None:
+    if isinstance(payload, list) and payload:
+        payload = payload[0]
+    if not isinstance(payload, dict):
+        return None
+
+    outcome_prices = payload.get("outcomePrices")
+    if isinstance(outcome_prices, list) and outcome_prices:
+        try:
+            return float(outcome_prices[0])
+        except (TypeError, ValueError):
+            pass
+    if isinstance(outcome_prices, str):
+        try:
+            parsed = json.loads(outcome_prices)
+            if isinstance(parsed, list) and parsed:
+                return float(parsed[0])
+        except Exception:
+            pass
+
+    outcomes = payload.get("outcomes")
+    if isinstance(outcomes, list) and outcomes:
+        first = outcomes[0]
+        if isinstance(first, dict):
+            for key in ("price", "lastPrice", "bestBid"):
+                if key in first:
+                    try:
+                        return float(first[key])
+                    except (TypeError, ValueError):
+                        continue
+    return None
+
+
+def extract_clob_token_ids(market: dict) -> list[str]:
+    raw = market.get("clobTokenIds") or market.get("clob_token_ids")
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        try:
+            parsed = json.loads(raw)
+            if isinstance(parsed, list):
+                return [str(x) for x in parsed if x is not None]
+        except Exception:
+            return [part.strip() for part in raw.split(",") if part.strip()] if "," in raw else [raw]
+    if isinstance(raw, list):
+        return [str(x) for x in raw if x is not None]
+    return []
+
+
+def extract_yes_no_tokens(market: dict) -> tuple[str | None, str | None]:
+    token_ids = extract_clob_token_ids(market)
+    if len(token_ids) >= 2:
+        return token_ids[0], token_ids[1]
+    if len(token_ids) == 1:
+        return token_ids[0], None
+    return None, None
+
+
+def extract_float(payload: dict, keys: tuple[str, ...] | list[str]) -> float | None:
+    for key in keys:
+        if key not in payload:
+            continue
+        value = payload.get(key)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+@dataclass(slots=True)
+class GammaFields:
+    yes: float | None
+    end_ts: int | None
+    price_to_beat: float | None
+    final_price: float | None
+    yes_token_id: str | None
+    no_token_id: str | None
+
+
+# sinal de "o valor não tem o formato compilado": o campo vai para o caminho genérico
+_MISS = object()
+_Getter = Callable[[dict], Any]
+
+
+class _Memo:
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values: dict[str, Any] = {}
+
+    def get(self, raw: str, parse: Callable[[str], Any]) -> Any:
+        value = self.values.get(raw, _MISS)
+        if value is _MISS:
+            if len(self.values) >= _MEMO_SIZE:
+                self.values.clear()
+            value = self.values[raw] = parse(raw)
+        return value
+
+
+def _first_quoted_float(raw: object) -> Any:
+    # '["0.91", "0.09"]' sem passar pelo decoder JSON
+    if isinstance(raw, str) and raw.startswith('["'):
+        end = raw.find('"', 2)
+        if end > 2:
+            try:
+                return float(raw[2:end])
+            except ValueError:
+                pass
+    return _MISS
+
+
+class _Extractor:
+    """Getters de um formato de payload, um por campo de `GammaFields`."""
+
+    __slots__ = ("yes", "end_ts", "price_to_beat", "final_price", "tokens")
+
+    def __init__(self, sample: dict, end_ts_memo: _Memo, token_memo: _Memo) -> None:
+        self.yes = self._compile_yes(sample)
+        self.end_ts = self._compile_end_ts(sample, end_ts_memo)
+        self.price_to_beat = self._compile_float(sample, PRICE_TO_BEAT_KEYS)
+        self.final_price = self._compile_float(sample, FINAL_PRICE_KEYS)
+        self.tokens = self._compile_tokens(sample, token_memo)
+
+    @staticmethod
+    def _present(sample: dict, keys: tuple[str, ...]) -> list[str]:
+        return [key for key in keys if key in sample]
+
+    @staticmethod
+    def _compile_yes(sample: dict) -> _Getter | None:
+        value = sample.get("outcomePrices")
+        if isinstance(value, str):
+            return lambda payload: _first_quoted_float(payload["outcomePrices"])
+        if isinstance(value, list):
+            def from_list(payload: dict) -> Any:
+                prices = payload["outcomePrices"]
+                try:
+                    return float(prices[0])
+                except (TypeError, ValueError, IndexError, KeyError):
+                    return _MISS
+            return from_list
+        if "outcomePrices" not in sample and "outcomes" not in sample:
+            return lambda payload: None
+        # `outcomes` com preço por outcome (raro) ou tipo inesperado: caminho genérico
+        return None
+
+    @classmethod
+    def _compile_end_ts(cls, sample: dict, memo: _Memo) -> _Getter | None:
+        present = cls._present(sample, END_TS_KEYS)
+        if not present:
+            return lambda payload: None
+        key = present[0]
+        value = sample[key]
+        if isinstance(value, str):
+            def from_iso(payload: dict) -> Any:
+                raw = payload[key]
+                if not isinstance(raw, str):
+                    return _MISS
+                parsed = memo.get(raw, lambda text: extract_market_end_ts({key: text}))
+                return _MISS if parsed is None else parsed
+            return from_iso
+        if isinstance(value, (int, float)):
+            def from_number(payload: dict) -> Any:
+                raw = payload[key]
+                return int(raw) if isinstance(raw, (int, float)) else _MISS
+            return from_number
+        return None
+
+    @classmethod
+    def _compile_float(cls, sample: dict, keys: tuple[str, ...]) -> _Getter | None:
+        present = cls._present(sample, keys)
+        if not present:
+            return lambda payload: None
+        key = present[0]
+
+        def getter(payload: dict) -> Any:
+            raw = payload[key]
+            # None (mercado ainda aberto) ou texto inválido: as chaves seguintes decidem
+            if raw is None:
+                return None if len(present) == 1 else _MISS
+            try:
+                return float(raw)
+            except (TypeError, ValueError):
+                return _MISS
+        return getter
+
+    @staticmethod
+    def _compile_tokens(sample: dict, memo: _Memo) -> _Getter | None:
+        value = sample.get("clobTokenIds")
+        if isinstance(value, str) and value:
+            def from_text(payload: dict) -> Any:
+                raw = payload["clobTokenIds"]
+                if not isinstance(raw, str) or not raw:
+                    return _MISS
+                return memo.get(raw, lambda text: extract_yes_no_tokens({"clobTokenIds": text}))
+            return from_text
+        if not any(key in sample for key in TOKEN_KEYS):
+            return lambda payload: (None, None)
+        return None
+
+
+def _field(getter: _Getter | None, payload: dict, fallback: Callable[[dict], Any]) -> Any:
+    if getter is None:
+        return fallback(payload)
+    value = getter(payload)
+    return fallback(payload) if value is _MISS else value
+
+
+class GammaParser:
+    def __init__(self) -> None:
+        self._extractors: dict[tuple[str, ...], _Extractor] = {}
+        self._end_ts_memo = _Memo()
+        self._token_memo = _Memo()
+        self.decoded = 0
+        self.decode_ns = 0
+        self.parsed = 0
+        self.parse_ns = 0
+
+    def decode(self, content: bytes) -> Any:
+        started = time.perf_counter_ns()
+        try:
+            return _loads(content)
+        finally:
+            self.decoded += 1
+            self.decode_ns += time.perf_counter_ns() - started
+
+    def parse(self, market: dict) -> GammaFields:
+        started = time.perf_counter_ns()
+        shape = tuple(market)
+        extractor = self._extractors.get(shape)
+        if extractor is None:
+            extractor = self._extractors[shape] = _Extractor(market, self._end_ts_memo, self._token_memo)
+        try:
+            yes_token, no_token = _field(extractor.tokens, market, extract_yes_no_tokens)
+            return GammaFields(
+                yes=_field(extractor.yes, market, extract_yes),
+                end_ts=_field(extractor.end_ts, market, extract_market_end_ts),
+                price_to_beat=_field(extractor.price_to_beat, market, lambda p: extract_float(p, PRICE_TO_BEAT_KEYS)),
+                final_price=_field(extractor.final_price, market, lambda p: extract_float(p, FINAL_PRICE_KEYS)),
+                yes_token_id=yes_token,
+                no_token_id=no_token,
+            )
+        finally:
+            self.parsed += 1
+            self.parse_ns += time.perf_counter_ns() - started
+
+    def stats(self) -> dict:
+        return {
+            "json_backend": JSON_BACKEND,
+            "shapes": len(self._extractors),
+            "decoded": self.decoded,
+            "decode_us": round(self.decode_ns / 1000, 3),
+            "parsed": self.parsed,
+            "parse_us": round(self.parse_ns / 1000, 3),
+        }
@@ -1,23 +1,72 @@
 from __future__ import annotations
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from typing import Iterable
 
-from app.models.entities import Direction
+from app.models.entities import Direction, Indicator
+from app.services.streaming_indicators import Bar, StreamingIndicators
+
+MAX_HISTORY = 300
+
+
+def as_bars(history: Iterable[float | Bar]) -> list[Bar]:
+    """Histórico em barras; um close solto (candles só com fechamento) vira uma barra plana."""
+    return [point if isinstance(point, tuple) else (point, point, point, point, 1.0) for point in history]
 
 
 class IndicatorService:
-    def __init__(self) -> None:
+    def __init__(self, htf_factor: int = 5) -> None:
         self._history: dict[str, list[float]] = defaultdict(list)
+        # barras OHLCV completas: é delas que os grafos streaming são reconstruídos
+        self._bars: dict[str, deque[Bar]] = {}
+        self.streaming = StreamingIndicators(self.bars, htf_factor)
+
+    def _keep_bar(self, asset: str, bar: Bar) -> None:
+        series = self._bars.get(asset)
+        if series is None:
+            series = self._bars[asset] = deque(maxlen=MAX_HISTORY)
+        series.append(bar)
+
+    def push_bar(self, asset: str, bar: Bar) -> None:
+        """Barra fechada (open, high, low, close, volume): MACD/TREND usam o close, os streaming a barra inteira."""
+        self._history[asset].append(bar[3])
+        self._history[asset] = self._history[asset][-MAX_HISTORY:]
+        self._keep_bar(asset, bar)
+        self.streaming.push(asset, bar)
+
+    def push_bars(self, bars: dict[str, Bar]) -> None:
+        """Uma barra por ativo, todas antes de decidir qualquer ativo."""
+        for asset, bar in bars.items():
+            self.push_bar(asset, bar)
 
     def push_price(self, asset: str, price: float) -> None:
-        self._history[asset].append(price)
-        self._history[asset] = self._history[asset][-300:]
+        self.push_bar(asset, (price, price, price, price, 1.0))
+
+    def push_prices(self, prices: dict[str, float]) -> None:
+        self.push_bars({asset: (price, price, price, price, 1.0) for asset, price in prices.items()})
+
+    def seed(self, asset: str, history: list[float] | list[Bar]) -> None:
+        """Substitui o histórico por barras (snapshot) ou closes reais (bootstrap de candles), mantendo os mais recentes."""
+        bars = as_bars(history)[-MAX_HISTORY:]
+        self._history[asset] = [bar[3] for bar in bars]
+        self._bars[asset] = deque(bars, maxlen=MAX_HISTORY)
+        self.streaming.reset(asset)
+
+    def history(self, asset: str) -> list[float]:
+        return list(self._history.get(asset, ()))
+
+    def bars(self, asset: str) -> list[Bar]:
+        return list(self._bars.get(asset, ()))
+
+    def snapshot(self) -> dict[str, list[Bar]]:
+        """Barras por ativo, para o snapshot de estado."""
+        return {asset: list(bars) for asset, bars in self._bars.items() if bars}
 
     def history_len(self, asset: str) -> int:
         return len(self._history[asset])
 
     def warmup(self, asset: str, base_price: float, points: int = 40) -> None:
-        """Pré-carrega histórico para evitar ficar minutos sem sinal na inicialização."""
+        """Pré-carrega histórico sintético quando não há candles reais (bootstrap desligado ou falhou)."""
         if self.history_len(asset) >= points:
             return
         drift = max(base_price * 0.0002, 0.01)
@@ -37,6 +86,13 @@ class IndicatorService:
         signal_line = self._ema(macd_hist, 9)
         return Direction.UP if macd_line >= signal_line else Direction.DOWN
 
+    def require(self, indicators: Iterable[Indicator]) -> None:
+        """Monta de antemão os nós streaming dos indicadores que alguma estratégia vai ler."""
+        self.streaming.require(indicators)
+
+    def stream_bias(self, asset: str, indicator: Indicator) -> tuple[bool, Direction | None]:
+        return self.streaming.bias(asset, indicator)
+
     def trend_bias(self, asset: str) -> Direction | None:
         prices = self._history[asset]
         if len(prices) < 30:
@@ -54,3 +110,18 @@ class IndicatorService:
         for v in values[1:]:
             ema = v * k + ema * (1 - k)
         return ema
+
+
+def build_indicator_service(backend: str = "auto", htf_factor: int = 5) -> IndicatorService:
+    """`python`: listas por ativo; `numpy`: matriz única com cálculo em lote; `auto`: numpy se instalado."""
+    if backend == "python":
+        return IndicatorService(htf_factor)
+    if backend not in ("auto", "numpy"):
+        raise ValueError(f"indicator_backend inválido: {backend} (use auto, python ou numpy)")
+    try:
+        from app.services.batch_indicators import BatchIndicatorService
+    except ImportError:
+        if backend == "numpy":
+            raise
+        return IndicatorService(htf_factor)
+    return BatchIndicatorService(htf_factor)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+from app.core import clock, deadline
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.markets import MarketRegistry
+from app.services.polymarket_service import MarketData, PolymarketService
+from app.services.rate_limiter import Priority, priority_scope
+from app.services.tracing import annotate, span
+
+
+class MarketResolver:
+    """Mantém o último `MarketData` de cada ativo, resolvido fora do caminho de decisão.
+
+    Com o engine rodando, uma task por tamanho de janela reconsulta a Gamma no ritmo do grupo
+    (a cada `poll_interval_seconds` na zona de entrada, a cada `market_resolution_ttl_seconds`
+    fora dela) e o tick só lê `latest`. Sem as tasks (tick manual, testes), `refresh` resolve
+    sob demanda dentro do prazo do tick.
+    """
+
+    def __init__(
+        self,
+        poly_service: PolymarketService,
+        registry: MarketRegistry,
+        enabled_assets: Callable[[], list[str]],
+        late_entry_seconds: Callable[[], int],
+    ) -> None:
+        self.poly_service = poly_service
+        self.registry = registry
+        self._enabled_assets = enabled_assets
+        self._late_entry_seconds = late_entry_seconds
+        self.latest: dict[str, MarketData] = {}
+        self.fetched_at: dict[str, float] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    def in_entry_zone(self, window_seconds: int, now_ts: float) -> bool:
+        remaining = window_seconds - (now_ts % window_seconds)
+        return remaining <= self._late_entry_seconds() + settings.poll_interval_seconds
+
+    def refresh_interval(self, window_seconds: int, now_ts: float) -> float:
+        if self.in_entry_zone(window_seconds, now_ts):
+            return settings.poll_interval_seconds
+        return settings.market_resolution_ttl_seconds
+
+    def due_assets(self, assets: list[str], now_ts: float) -> list[str]:
+        """Agenda refresh de odds por tamanho de janela.
+
+        Longe da zona de entrada as odds não decidem nada, então cada grupo de janela só é
+        reconsultado a cada `market_resolution_ttl_seconds`; na zona de entrada (e na virada
+        de janela) o refresh é a cada tick.
+        """
+        due: list[str] = []
+        for window_seconds, specs in self.registry.group_by_window(assets).items():
+            current_window = int(now_ts // window_seconds) * window_seconds
+            hot = self.in_entry_zone(window_seconds, now_ts)
+            for spec in specs:
+                cached = self.latest.get(spec.symbol)
+                fetched_at = self.fetched_at.get(spec.symbol, 0.0)
+                if (
+                    cached is None
+                    or not cached.odds_live
+                    or cached.window_ts != current_window
+                    or hot
+                    or now_ts - fetched_at >= settings.market_resolution_ttl_seconds
+                ):
+                    due.append(spec.symbol)
+        return due
+
+    def rolling_over(self, asset: str, now_ts: float) -> bool:
+        """A janela acabou de virar e o cache ainda tem o mercado da anterior.
+
+        A task do grupo acorda na virada, então o refresh já está agendado: o mercado novo tem
+        até dois intervalos para chegar antes de o atraso contar como stale.
+        """
+        spec = self.registry.get(asset)
+        cached = self.latest.get(asset)
+        current_window = spec.window_ts(int(now_ts))
+        return (
+            cached is not None
+            and cached.window_ts < current_window
+            and now_ts - current_window <= 2 * self.refresh_interval(spec.window_seconds, now_ts)
+        )
+
+    def is_stale(self, asset: str, now_ts: float) -> bool:
+        """Mercado resolvido em background atrasado: outra janela ou mais de dois intervalos sem refresh (fora da virada)."""
+        cached = self.latest.get(asset)
+        if cached is None or self.rolling_over(asset, now_ts):
+            return False
+        spec = self.registry.get(asset)
+        age = now_ts - self.fetched_at.get(asset, 0.0)
+        return cached.window_ts != spec.window_ts(int(now_ts)) or age > 2 * self.refresh_interval(spec.window_seconds, now_ts)
+
+    async def refresh(self, assets: list[str]) -> list[str]:
+        """Resolve os ativos devidos; retorna os que ficaram com o mercado anterior porque o prazo acabou."""
+        now_ts = clock.now()
+        due = self.due_assets(assets, now_ts)
+        if not due:
+            return []
+        entry = [a for a in due if self.in_entry_zone(self.registry.get(a).window_seconds, now_ts)]
+        background = [a for a in due if a not in entry]
+        with span("refresh_markets", due=len(due), entry=len(entry), cached=len(assets) - len(due)):
+            try:
+                batches = await deadline.within(
+                    asyncio.gather(
+                        self._fetch_with_priority(entry, Priority.ENTRY, int(now_ts)),
+                        self._fetch_with_priority(background, Priority.MARKET_DATA, int(now_ts)),
+                    )
+                )
+            except asyncio.TimeoutError:
+                batches = []
+            expired = deadline.expired()
+            refreshed: set[str] = set()
+            for resolved in batches:
+                for asset, data in resolved.items():
+                    if expired and not data.odds_live and asset in self.latest:
+                        # fallback causado pelo prazo: mantém o último mercado resolvido
+                        continue
+                    self.latest[asset] = data
+                    self.fetched_at[asset] = now_ts
+                    refreshed.add(asset)
+            stale = [a for a in due if a not in refreshed]
+            if stale:
+                annotate(deadline_exceeded=True, stale=stale)
+            return stale
+
+    async def _fetch_with_priority(self, assets: list[str], priority: Priority, now_ts: int) -> dict[str, MarketData]:
+        if not assets:
+            return {}
+        with priority_scope(priority):
+            return await self.poly_service.fetch_market_data_batch(assets, now_ts)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = {
+            window_seconds: asyncio.create_task(self._run(window_seconds))
+            for window_seconds in self.registry.group_by_window(self.registry.symbols)
+        }
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, window_seconds: int) -> None:
+        while True:
+            assets = [a for a in self._enabled_assets() if self.registry.get(a).window_seconds == window_seconds]
+            if assets:
+                # cada rodada tem o mesmo orçamento de um tick, para retries da Gamma não atrasarem a próxima
+                with deadline_scope(settings.tick_deadline_seconds):
+                    try:
+                        await self.refresh(assets)
+                    except Exception:  # noqa: BLE001
+                        pass
+            await clock.sleep(self._sleep_seconds(window_seconds, clock.now()))
+
+    def _sleep_seconds(self, window_seconds: int, now_ts: float) -> float:
+        interval = self.refresh_interval(window_seconds, now_ts)
+        if self.in_entry_zone(window_seconds, now_ts):
+            return interval
+        # acorda no início da zona de entrada mesmo que o TTL ainda não tenha vencido
+        remaining = window_seconds - (now_ts % window_seconds)
+        until_entry = remaining - (self._late_entry_seconds() + settings.poll_interval_seconds)
+        return max(0.05, min(interval, until_entry))
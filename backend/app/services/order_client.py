@@ -0,0 +1,228 @@
+"""Caminho de ordens REAL no CLOB, separado do tráfego de dados.
+
+Quando uma janela entra na zona de late entry, `prepare` monta os templates UP e DOWN do
+mercado (token, lado, client_order_id e o corpo JSON já serializado até o preço) e `warm`
+mantém aquecida a conexão do cliente HTTP dedicado. Na decisão, `fire` só completa preço e
+tamanho no corpo pronto e faz um POST, com timeout e retries próprios. A latência decisão→ack
+de cada ordem fica registrada para `/api/debug/orders`.
+
+Nesta versão o payload do CLOB não é assinado; quando for, a assinatura entra no `prepare`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import httpx
+
+from app.core import clock
+from app.core.config import settings
+from app.models.entities import Direction
+from app.services.rate_limiter import Priority, RateLimitScheduler
+
+if TYPE_CHECKING:
+    from app.services.polymarket_service import MarketData
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass(slots=True)
+class OrderTemplate:
+    asset: str
+    window_ts: int
+    direction: Direction
+    token_id: str
+    client_order_id: str
+    # corpo JSON até antes de `price`/`size`, que só são conhecidos na decisão
+    prefix: bytes
+    prepared_at: float
+
+    def body(self, price: float, size: float) -> bytes:
+        return self.prefix + f'"price":{round(price, 4)},"size":{round(size, 2)}}}'.encode()
+
+
+def client_order_id(asset: str, window_ts: int, direction: Direction, account: str = "") -> str:
+    # um id por conta, janela e direção: um retry do mesmo disparo não vira uma segunda ordem no CLOB
+    prefix = f"bot-{account}-" if account else "bot-"
+    return f"{prefix}{asset}-{window_ts}-{direction.value}"
+
+
+def build_template(market_data: MarketData, direction: Direction, now: float, account: str = "") -> OrderTemplate | None:
+    token_id = market_data.yes_token_id if direction == Direction.UP else market_data.no_token_id
+    if not token_id:
+        return None
+    order_id = client_order_id(market_data.asset, market_data.window_ts, direction, account)
+    static = json.dumps(
+        {"token_id": token_id, "side": "BUY", "client_order_id": order_id, "order_type": "market"},
+        separators=(",", ":"),
+    )
+    return OrderTemplate(
+        asset=market_data.asset,
+        window_ts=market_data.window_ts,
+        direction=direction,
+        token_id=token_id,
+        client_order_id=order_id,
+        prefix=static[:-1].encode() + b",",
+        prepared_at=now,
+    )
+
+
+@dataclass(slots=True)
+class OrderAck:
+    ok: bool
+    message: str
+    client_order_id: str
+    attempts: int
+    latency_ms: float
+    prepared: bool
+    # sem resposta definitiva do CLOB (transporte, 429, 5xx): reenviar com o mesmo id é seguro
+    retryable: bool = False
+
+
+class ClobOrderClient:
+    def __init__(self, client: httpx.AsyncClient | None = None, limiter: RateLimitScheduler | None = None) -> None:
+        # conexão própria: ordens não disputam o pool (nem a fila de conexões) com Gamma/preços
+        self._client = client or httpx.AsyncClient(
+            timeout=settings.order_timeout_seconds,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=2, keepalive_expiry=2 * settings.order_warm_interval_seconds),
+        )
+        self.limiter = limiter or RateLimitScheduler.from_settings(settings)
+        # (conta, ativo) -> templates UP/DOWN da janela; a conta principal é ""
+        self._templates: dict[tuple[str, str], dict[Direction, OrderTemplate]] = {}
+        self._warmed_at = 0.0
+        self._warm_task: asyncio.Task | None = None
+        self.acks: deque[OrderAck] = deque(maxlen=200)
+        self.cold_orders = 0
+        self.warm_requests = 0
+
+    def prepare(self, market_data: MarketData, account: str = "") -> bool:
+        """Templates UP/DOWN da janela do ativo (idempotente por janela) e conexão aquecida."""
+        key = (account, market_data.asset)
+        templates = self._templates.get(key)
+        if templates is None or next(iter(templates.values())).window_ts != market_data.window_ts:
+            now = clock.now()
+            built = {
+                d: t for d in (Direction.UP, Direction.DOWN) if (t := build_template(market_data, d, now, account)) is not None
+            }
+            if not built:
+                return False
+            self._templates[key] = built
+        self.warm()
+        return True
+
+    def template(self, market_data: MarketData, direction: Direction, account: str = "") -> OrderTemplate | None:
+        template = self._templates.get((account, market_data.asset), {}).get(direction)
+        if template is None or template.window_ts != market_data.window_ts:
+            return None
+        return template
+
+    def warm(self) -> None:
+        """Agenda um request leve ao CLOB se a conexão dedicada pode ter esfriado."""
+        if time.monotonic() - self._warmed_at < settings.order_warm_interval_seconds:
+            return
+        if self._warm_task is not None and not self._warm_task.done():
+            return
+        self._warmed_at = time.monotonic()
+        self._warm_task = asyncio.create_task(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            # sem espera na fila: se o bucket do CLOB está vazio, os tokens ficam para as ordens
+            await self.limiter.acquire(httpx.URL(settings.clob_base_url).host, Priority.SEARCH, max_wait=0.0)
+            await self._client.get(f"{settings.clob_base_url}/time")
+            self.warm_requests += 1
+        except Exception:  # noqa: BLE001
+            self._warmed_at = 0.0
+
+    async def fire(
+        self, market_data: MarketData, direction: Direction, amount_usd: float, decided_at: float | None = None, account: str = ""
+    ) -> OrderAck:
+        """Envia a ordem a partir do template; `decided_at` (perf_counter) é o instante da decisão."""
+        started = decided_at if decided_at is not None else time.perf_counter()
+        template = self.template(market_data, direction, account)
+        prepared = template is not None
+        if template is None:
+            self.cold_orders += 1
+            template = build_template(market_data, direction, clock.now(), account)
+            if template is None:
+                return self._ack(False, "TOKEN_ID_NOT_AVAILABLE", "", 0, started, prepared)
+        price = market_data.yes_odds if direction == Direction.UP else market_data.no_odds
+        body = template.body(price, max(amount_usd, 1.0))
+        host = httpx.URL(settings.clob_base_url).host
+        url = f"{settings.clob_base_url}/order"
+
+        message = "CLOB_NOT_SENT"
+        retryable = False
+        attempts = 0
+        for attempt in range(settings.order_max_retries + 1):
+            if attempt:
+                await asyncio.sleep(settings.order_retry_backoff_seconds * attempt)
+            attempts += 1
+            try:
+                await self.limiter.acquire(host, Priority.ORDER)
+                response = await self._client.post(url, content=body, headers=_JSON_HEADERS, timeout=settings.order_timeout_seconds)
+            except (httpx.TimeoutException, httpx.TransportError) as exc:
+                message, retryable = f"CLOB_ERROR::{exc.__class__.__name__}", True
+                continue
+            except Exception as exc:  # noqa: BLE001
+                message, retryable = f"CLOB_ERROR::{exc.__class__.__name__}", False
+                break
+            if 200 <= response.status_code < 300:
+                return self._ack(True, "CLOB_ORDER_ACCEPTED", template.client_order_id, attempts, started, prepared)
+            message = f"CLOB_REJECTED_{response.status_code}"
+            retryable = response.status_code == 429 or response.status_code >= 500
+            # 4xx (fora 429) não melhora com retry
+            if not retryable:
+                break
+        return self._ack(False, message, template.client_order_id, attempts, started, prepared, retryable)
+
+    def _ack(
+        self, ok: bool, message: str, client_order_id: str, attempts: int, started: float, prepared: bool, retryable: bool = False
+    ) -> OrderAck:
+        ack = OrderAck(ok, message, client_order_id, attempts, (time.perf_counter() - started) * 1000, prepared, retryable)
+        self.acks.append(ack)
+        return ack
+
+    def stats(self) -> dict:
+        latencies = sorted(ack.latency_ms for ack in self.acks if ack.attempts)
+
+        def pct(p: float) -> float | None:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            "orders": len(self.acks),
+            "accepted": sum(1 for ack in self.acks if ack.ok),
+            "cold_orders": self.cold_orders,
+            "warm_requests": self.warm_requests,
+            "prepared_assets": {
+                f"{account}/{asset}" if account else asset: next(iter(t.values())).window_ts
+                for (account, asset), t in self._templates.items()
+            },
+            "decision_to_ack_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": round(latencies[-1], 3) if latencies else None},
+            "policy": {
+                "timeout_seconds": settings.order_timeout_seconds,
+                "max_retries": settings.order_max_retries,
+                "retry_backoff_seconds": settings.order_retry_backoff_seconds,
+            },
+            "recent": [
+                {
+                    "ok": ack.ok,
+                    "message": ack.message,
+                    "client_order_id": ack.client_order_id,
+                    "attempts": ack.attempts,
+                    "latency_ms": round(ack.latency_ms, 3),
+                    "prepared": ack.prepared,
+                }
+                for ack in list(self.acks)[-20:]
+            ],
+        }
+
+    async def close(self) -> None:
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+        await self._client.aclose()
@@ -0,0 +1,199 @@
+"""Fila assíncrona das ordens REAL, com estado por ordem.
+
+`submit` só registra a ordem (QUEUED) e agenda o envio; a decisão do ativo não espera o
+round-trip do CLOB. Cada envio ocupa uma vaga global (`ORDER_MAX_IN_FLIGHT`) e uma do mercado
+(`ORDER_PER_MARKET_LIMIT`); quem não tem vaga espera na fila do semáforo, em ordem de chegada.
+No fim de uma janela, as entradas de todos os ativos saem em paralelo.
+
+O `client_order_id` (um por janela e direção) é a chave: submeter de novo uma ordem que ainda
+está na fila ou já teve ack não gera outro envio, e a que falhou sem ack (erro de transporte)
+volta para a fila com o mesmo id, que o CLOB deduplica.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable
+
+from app.core import clock
+from app.core.deadline import deadline_scope
+from app.models.entities import Direction
+from app.services.order_client import ClobOrderClient, client_order_id
+from app.services.polymarket_service import MarketData
+
+
+class OrderState(str, Enum):
+    QUEUED = "QUEUED"
+    SENDING = "SENDING"
+    ACKED = "ACKED"
+    REJECTED = "REJECTED"
+    # sem resposta do CLOB (timeout/transporte esgotou os retries): pode ser submetida de novo
+    FAILED = "FAILED"
+
+
+_DONE = (OrderState.ACKED, OrderState.REJECTED, OrderState.FAILED)
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    client_order_id: str
+    trade_id: str
+    asset: str
+    market_id: str
+    window_ts: int
+    direction: Direction
+    amount_usd: float
+    decided_at: float
+    # conta do registry de contas; "" é a conta principal do engine
+    account: str = ""
+    state: OrderState = OrderState.QUEUED
+    message: str = ""
+    attempts: int = 0
+    latency_ms: float = 0.0
+    # (estado, epoch) de cada transição
+    transitions: list[tuple[str, float]] = field(default_factory=list)
+
+    def move(self, state: OrderState, message: str = "") -> None:
+        self.state = state
+        if message:
+            self.message = message
+        self.transitions.append((state.value, clock.now()))
+
+    def view(self) -> dict:
+        return {
+            "client_order_id": self.client_order_id,
+            "account": self.account,
+            "trade_id": self.trade_id,
+            "asset": self.asset,
+            "market_id": self.market_id,
+            "window_ts": self.window_ts,
+            "direction": self.direction.value,
+            "amount_usd": self.amount_usd,
+            "state": self.state.value,
+            "message": self.message,
+            "attempts": self.attempts,
+            "latency_ms": round(self.latency_ms, 3),
+            "transitions": [list(t) for t in self.transitions],
+        }
+
+
+class OrderManager:
+    def __init__(
+        self,
+        orders: ClobOrderClient,
+        max_in_flight: int = 16,
+        per_market_limit: int = 1,
+        on_done: Callable[[OrderRecord], None] | None = None,
+        history: int = 500,
+    ) -> None:
+        self.orders = orders
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_market_limit = max(1, per_market_limit)
+        self.on_done = on_done
+        self.history = max(1, history)
+        self.records: OrderedDict[str, OrderRecord] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._market_slots: dict[tuple[str, str], asyncio.Semaphore] = {}
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    def _bind_loop(self) -> None:
+        # semáforos pertencem a um event loop; testes e o CLI rodam vários `asyncio.run` seguidos
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._market_slots = {}
+
+    def submit(
+        self,
+        market_data: MarketData,
+        direction: Direction,
+        amount_usd: float,
+        trade_id: str,
+        decided_at: float,
+        account: str = "",
+    ) -> OrderRecord:
+        order_id = client_order_id(market_data.asset, market_data.window_ts, direction, account)
+        record = self.records.get(order_id)
+        if record is not None and record.state is not OrderState.FAILED:
+            return record
+        if record is None:
+            record = OrderRecord(
+                client_order_id=order_id,
+                trade_id=trade_id,
+                asset=market_data.asset,
+                market_id=market_data.market_id,
+                window_ts=market_data.window_ts,
+                direction=direction,
+                amount_usd=amount_usd,
+                decided_at=decided_at,
+                account=account,
+            )
+            self.records[order_id] = record
+            self._trim()
+        record.move(OrderState.QUEUED)
+        self._bind_loop()
+        task = asyncio.create_task(self._send(record, market_data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return record
+
+    async def _send(self, record: OrderRecord, market_data: MarketData) -> None:
+        assert self._slots is not None
+        # o limite por mercado vale por conta: contas diferentes no mesmo mercado saem em paralelo
+        market_slot = self._market_slots.setdefault((record.account, record.market_id), asyncio.Semaphore(self.per_market_limit))
+        # a ordem não herda o prazo do tick: tem timeout e retries próprios
+        with deadline_scope(None):
+            async with self._slots, market_slot:
+                self._in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+                record.move(OrderState.SENDING)
+                try:
+                    ack = await self.orders.fire(market_data, record.direction, record.amount_usd, record.decided_at, record.account)
+                except Exception as exc:  # noqa: BLE001
+                    record.latency_ms = (time.perf_counter() - record.decided_at) * 1000
+                    record.move(OrderState.FAILED, f"CLOB_ERROR::{exc.__class__.__name__}")
+                else:
+                    record.attempts += ack.attempts
+                    record.latency_ms = ack.latency_ms
+                    if ack.ok:
+                        record.move(OrderState.ACKED, ack.message)
+                    else:
+                        record.move(OrderState.FAILED if ack.retryable else OrderState.REJECTED, ack.message)
+                finally:
+                    self._in_flight -= 1
+        if self.on_done is not None:
+            self.on_done(record)
+
+    def _trim(self) -> None:
+        while len(self.records) > self.history:
+            oldest = next(iter(self.records.values()))
+            if oldest.state not in _DONE:
+                break
+            self.records.popitem(last=False)
+
+    async def drain(self) -> None:
+        """Espera todas as ordens em andamento terminarem (stop do engine, testes)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def view(self, state: str | None = None, asset: str | None = None, limit: int = 100, account: str | None = None) -> dict:
+        records = [
+            r for r in reversed(self.records.values())
+            if (state is None or r.state.value == state.upper())
+            and (asset is None or r.asset == asset)
+            and (account is None or r.account == account)
+        ]
+        return {
+            "orders": [r.view() for r in records[: max(0, limit)]],
+            "by_state": dict(Counter(r.state.value for r in self.records.values())),
+            "in_flight": self._in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "limits": {"max_in_flight": self.max_in_flight, "per_market": self.per_market_limit},
+        }
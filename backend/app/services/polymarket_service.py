@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-import json
-import time
+import asyncio
 from dataclasses import dataclass
-from datetime import datetime, timezone
 
 import httpx
 
+from app.core import clock, deadline
+from app.core.config import settings
+from app.core.markets import MarketRegistry, MarketSpec, market_registry
 from app.models.entities import Direction
+from app.services import gamma_parser
+from app.services.gamma_parser import GammaParser
+from app.services.order_client import ClobOrderClient
+from app.services.rate_limiter import Priority, RateLimitScheduler, priority_scope
+from app.services.tracing import annotate, span
 
 
-WINDOW_SECONDS = 900
+UPSTREAM_TIMEOUT_SECONDS = 10
 
 
 @dataclass
@@ -32,44 +38,92 @@ class MarketData:
     retries: int = 0
 
 
+def _spec_for(registry: MarketRegistry, asset: str) -> MarketSpec:
+    # ativo fora do registry: spec padrão (15m, template padrão)
+    if asset in registry:
+        return registry.get(asset)
+    return MarketSpec.from_dict({"symbol": asset})
+
+
 class PolymarketService:
     """Gamma para dados de mercado + CLOB para execução."""
 
-    def __init__(self) -> None:
-        self._client = httpx.AsyncClient(timeout=10)
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        registry: MarketRegistry | None = None,
+        limiter: RateLimitScheduler | None = None,
+        order_client: ClobOrderClient | None = None,
+    ) -> None:
+        self._client = client or httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT_SECONDS)
+        self.registry = registry or market_registry
+        self.limiter = limiter or RateLimitScheduler.from_settings(settings)
+        self.orders = order_client or ClobOrderClient(limiter=self.limiter)
         self._last_yes_by_asset: dict[str, float] = {}
+        self.gamma = GammaParser()
 
     @staticmethod
-    def get_current_window_ts(now_ts: int | None = None) -> int:
-        base = int(now_ts or time.time())
-        return (base // WINDOW_SECONDS) * WINDOW_SECONDS
-
-    @staticmethod
-    def get_next_window_ts(now_ts: int | None = None) -> int:
-        return PolymarketService.get_current_window_ts(now_ts) + WINDOW_SECONDS
+    def build_window_slug(asset: str, window_ts: int, registry: MarketRegistry | None = None) -> str:
+        """Slug da janela pelo `slug_template` do spec do ativo (5m, 15m ou 1h, conforme o registry)."""
+        return _spec_for(registry or market_registry, asset).slug(window_ts)
 
-    @staticmethod
-    def _asset_slug(asset: str) -> str:
-        return asset.lower()
+    def market_spec(self, asset: str) -> MarketSpec:
+        return _spec_for(self.registry, asset)
 
-    @staticmethod
-    def build_window_slug(asset: str, window_ts: int) -> str:
-        return f"{PolymarketService._asset_slug(asset)}-updown-15m-{window_ts}"
+    def window_slug(self, asset: str, window_ts: int) -> str:
+        return self.market_spec(asset).slug(window_ts)
 
     async def fetch_market_data(self, asset: str, now_ts: int | None = None) -> MarketData:
-        now_val = int(now_ts or time.time())
-        current_window = self.get_current_window_ts(now_val)
-        for window_ts in (current_window, current_window + WINDOW_SECONDS):
+        spec = self.market_spec(asset)
+        now_val = int(now_ts or clock.now())
+        current_window = spec.window_ts(now_val)
+        for window_ts in (current_window, current_window + spec.window_seconds):
             data = await self._fetch_window_market(asset, window_ts)
             if data is not None:
                 return data
 
+        return self._fallback_market_data(asset, current_window)
+
+    async def fetch_market_data_batch(self, assets: list[str], now_ts: int | None = None) -> dict[str, MarketData]:
+        """Resolve vários ativos com uma request Gamma por tamanho de janela; só os que faltarem caem no caminho individual."""
+        now_val = int(now_ts or clock.now())
+        groups: dict[int, list[MarketSpec]] = {}
+        for asset in dict.fromkeys(assets):
+            spec = self.market_spec(asset)
+            groups.setdefault(spec.window_seconds, []).append(spec)
+
+        results = await asyncio.gather(*(self._fetch_window_group(specs, now_val) for specs in groups.values()))
+        merged: dict[str, MarketData] = {}
+        for group in results:
+            merged.update(group)
+        return merged
+
+    async def _fetch_window_group(self, specs: list[MarketSpec], now_ts: int) -> dict[str, MarketData]:
+        window_ts = specs[0].window_ts(now_ts)
+        with span("fetch_window_group", window_seconds=specs[0].window_seconds, assets=len(specs)):
+            slug_to_spec = {spec.slug(window_ts): spec for spec in specs}
+            markets = await self._fetch_gamma_markets_by_slugs(list(slug_to_spec))
+            resolved: dict[str, MarketData] = {}
+            for slug, spec in slug_to_spec.items():
+                market = markets.get(slug)
+                data = self._market_data_from_payload(spec.symbol, window_ts, slug, market, "BATCH", 0) if market else None
+                if data is not None:
+                    resolved[spec.symbol] = data
+            annotate(batch_hits=len(resolved))
+
+            missing = [spec.symbol for spec in specs if spec.symbol not in resolved]
+            if missing:
+                fallbacks = await asyncio.gather(*(self.fetch_market_data(asset, now_ts) for asset in missing))
+                resolved.update(zip(missing, fallbacks))
+            return resolved
+
+    def _fallback_market_data(self, asset: str, window_ts: int) -> MarketData:
         last_yes = self._last_yes_by_asset.get(asset, 0.5)
         return MarketData(
             asset=asset,
-            window_ts=current_window,
+            window_ts=window_ts,
             market_id=f"{asset}-unknown",
-            market_slug=self.build_window_slug(asset, current_window),
+            market_slug=self.window_slug(asset, window_ts),
             yes_odds=last_yes,
             no_odds=1 - last_yes,
             odds_source="NO_PRICE",
@@ -77,51 +131,90 @@ class PolymarketService:
             resolver_source="FALLBACK",
         )
 
+    def _market_data_from_payload(
+        self,
+        asset: str,
+        window_ts: int,
+        slug: str,
+        market: dict,
+        resolver_source: str,
+        retries: int,
+    ) -> MarketData | None:
+        fields = self.gamma.parse(market)
+        if fields.yes is None:
+            return None
+        yes = min(max(fields.yes, 0.01), 0.99)
+        self._last_yes_by_asset[asset] = yes
+        return MarketData(
+            asset=asset,
+            window_ts=window_ts,
+            market_id=str(market.get("id") or slug),
+            market_slug=str(market.get("slug") or slug),
+            yes_odds=yes,
+            no_odds=1 - yes,
+            odds_source="GAMMA_API",
+            odds_live=True,
+            resolver_source=resolver_source,
+            end_ts=fields.end_ts or (window_ts + self.market_spec(asset).window_seconds),
+            price_to_beat=fields.price_to_beat,
+            final_price=fields.final_price,
+            yes_token_id=fields.yes_token_id,
+            no_token_id=fields.no_token_id,
+            retries=retries,
+        )
+
     async def _fetch_window_market(self, asset: str, window_ts: int) -> MarketData | None:
-        slug = self.build_window_slug(asset, window_ts)
+        with span("fetch_window_market", asset=asset, window_ts=window_ts):
+            data = await self._fetch_window_market_with_retries(asset, window_ts)
+            annotate(found=data is not None, retries=data.retries if data else None)
+            return data
+
+    async def _resolve_gamma_market(self, asset: str, slug: str, window_ts: int) -> tuple[dict | None, str]:
+        market = await self._fetch_gamma_event_by_slug(slug)
+        if market is not None:
+            return market, "EVENT_SLUG"
+        market = await self._fetch_gamma_market_by_slug(slug)
+        if market is not None:
+            return market, "MARKET_SLUG"
+        market = await self._search_gamma_market(asset, window_ts)
+        if market is not None:
+            return market, "SEARCH"
+        return None, "NONE"
+
+    async def _fetch_window_market_with_retries(self, asset: str, window_ts: int) -> MarketData | None:
+        slug = self.window_slug(asset, window_ts)
         retries = 5
         delay = 2
 
         for attempt in range(1, retries + 1):
-            market = await self._fetch_gamma_event_by_slug(slug)
-            if market is None:
-                market = await self._fetch_gamma_market_by_slug(slug)
-            if market is None:
-                market = await self._search_gamma_market(asset, window_ts)
+            with span("gamma_attempt", attempt=attempt):
+                market, strategy = await self._resolve_gamma_market(asset, slug, window_ts)
+                annotate(strategy=strategy)
 
             if market:
-                yes = self._extract_yes_from_gamma_payload(market)
-                if yes is not None:
-                    yes = min(max(yes, 0.01), 0.99)
-                    self._last_yes_by_asset[asset] = yes
-                    yes_token, no_token = self._extract_yes_no_tokens(market)
-                    market_id = str(market.get("id") or slug)
-                    return MarketData(
-                        asset=asset,
-                        window_ts=window_ts,
-                        market_id=market_id,
-                        market_slug=str(market.get("slug") or slug),
-                        yes_odds=yes,
-                        no_odds=1 - yes,
-                        odds_source="GAMMA_API",
-                        odds_live=True,
-                        resolver_source=f"RETRY_{attempt}",
-                        end_ts=self._extract_market_end_ts(market) or (window_ts + WINDOW_SECONDS),
-                        price_to_beat=self._extract_float(market, ["priceToBeat", "strikePrice", "targetPrice"]),
-                        final_price=self._extract_float(market, ["finalPrice", "outcomePrice", "settlementPrice"]),
-                        yes_token_id=yes_token,
-                        no_token_id=no_token,
-                        retries=attempt - 1,
-                    )
+                data = self._market_data_from_payload(asset, window_ts, slug, market, f"RETRY_{attempt}", attempt - 1)
+                if data is not None:
+                    return data
 
             if attempt < retries:
-                await self._sleep(delay)
+                left = deadline.remaining()
+                if left is not None and left <= delay:
+                    annotate(stopped_by_deadline=True)
+                    break
+                with span("retry_backoff", seconds=delay):
+                    await self._sleep(delay)
                 delay *= 2
 
         return None
 
 
     async def fetch_market_result(self, market_id: str, market_slug: str) -> tuple[float | None, float | None, str]:
+        with span("fetch_market_result", market_id=market_id), priority_scope(Priority.SETTLEMENT):
+            result = await self._fetch_market_result(market_id, market_slug)
+            annotate(source=result[2])
+            return result
+
+    async def _fetch_market_result(self, market_id: str, market_slug: str) -> tuple[float | None, float | None, str]:
         market = await self._fetch_gamma_market_by_id(market_id)
         source = "GAMMA_ID"
         if market is None:
@@ -129,9 +222,8 @@ class PolymarketService:
             source = "GAMMA_SLUG"
         if market is None:
             return None, None, "NO_RESULT"
-        final_price = self._extract_float(market, ["finalPrice", "outcomePrice", "settlementPrice"])
-        price_to_beat = self._extract_float(market, ["priceToBeat", "strikePrice", "targetPrice"])
-        return final_price, price_to_beat, source
+        fields = self.gamma.parse(market)
+        return fields.final_price, fields.price_to_beat, source
 
     async def place_clob_order(
         self,
@@ -139,38 +231,20 @@ class PolymarketService:
         direction: Direction,
         amount_usd: float,
         wallet_secret: str,
+        decided_at: float | None = None,
     ) -> tuple[bool, str]:
         if not wallet_secret.strip():
             return False, "WALLET_NOT_CONFIGURED"
-
-        token_id = market_data.yes_token_id if direction == Direction.UP else market_data.no_token_id
-        if not token_id:
-            return False, "TOKEN_ID_NOT_AVAILABLE"
-
-        payload = {
-            "token_id": token_id,
-            "side": "BUY",
-            "price": round(market_data.yes_odds if direction == Direction.UP else market_data.no_odds, 4),
-            "size": round(max(amount_usd, 1.0), 2),
-            "client_order_id": f"bot-{market_data.asset}-{market_data.window_ts}-{int(time.time()*1000)}",
-            "order_type": "market",
-        }
-
-        try:
-            response = await self._client.post("https://clob.polymarket.com/order", json=payload)
-            if 200 <= response.status_code < 300:
-                return True, "CLOB_ORDER_ACCEPTED"
-            return False, f"CLOB_REJECTED_{response.status_code}"
-        except Exception as exc:  # noqa: BLE001
-            return False, f"CLOB_ERROR::{exc.__class__.__name__}"
+        ack = await self.orders.fire(market_data, direction, amount_usd, decided_at)
+        return ack.ok, ack.message
 
     async def _fetch_gamma_event_by_slug(self, slug: str) -> dict | None:
         try:
-            response = await self._client.get("https://gamma-api.polymarket.com/events", params={"slug": slug})
+            response = await self._get(f"{settings.gamma_base_url}/events", params={"slug": slug})
             if response.status_code == 404:
                 return None
             response.raise_for_status()
-            payload = response.json()
+            payload = self.gamma.decode(response.content)
             if isinstance(payload, list) and payload:
                 event = payload[0]
                 if isinstance(event, dict):
@@ -189,11 +263,11 @@ class PolymarketService:
 
     async def _fetch_gamma_market_by_id(self, market_id: str) -> dict | None:
         try:
-            response = await self._client.get(f"https://gamma-api.polymarket.com/markets/{market_id}")
+            response = await self._get(f"{settings.gamma_base_url}/markets/{market_id}")
             if response.status_code == 404:
                 return None
             response.raise_for_status()
-            payload = response.json()
+            payload = self.gamma.decode(response.content)
             if isinstance(payload, dict):
                 return payload
         except Exception:
@@ -202,9 +276,9 @@ class PolymarketService:
 
     async def _fetch_gamma_market_by_slug(self, slug: str) -> dict | None:
         try:
-            response = await self._client.get("https://gamma-api.polymarket.com/markets", params={"slug": slug})
+            response = await self._get(f"{settings.gamma_base_url}/markets", params={"slug": slug})
             response.raise_for_status()
-            payload = response.json()
+            payload = self.gamma.decode(response.content)
             if isinstance(payload, list) and payload:
                 first = payload[0]
                 if isinstance(first, dict):
@@ -213,12 +287,25 @@ class PolymarketService:
             return None
         return None
 
+    async def _fetch_gamma_markets_by_slugs(self, slugs: list[str]) -> dict[str, dict]:
+        if not slugs:
+            return {}
+        try:
+            response = await self._get(f"{settings.gamma_base_url}/markets", params=[("slug", slug) for slug in slugs])
+            response.raise_for_status()
+            payload = self.gamma.decode(response.content)
+        except Exception:
+            return {}
+        if not isinstance(payload, list):
+            return {}
+        return {str(item.get("slug")): item for item in payload if isinstance(item, dict) and item.get("slug")}
+
     async def _search_gamma_market(self, asset: str, window_ts: int) -> dict | None:
-        query = f"{asset.lower()} up or down 15m {window_ts}"
+        query = self.market_spec(asset).search_query(window_ts)
         try:
-            response = await self._client.get("https://gamma-api.polymarket.com/markets", params={"search": query, "limit": 20})
+            response = await self._get(f"{settings.gamma_base_url}/markets", priority=Priority.SEARCH, params={"search": query, "limit": 20})
             response.raise_for_status()
-            payload = response.json()
+            payload = self.gamma.decode(response.content)
             if isinstance(payload, list):
                 for item in payload:
                     if not isinstance(item, dict):
@@ -232,99 +319,21 @@ class PolymarketService:
             return None
         return None
 
-    @staticmethod
-    async def _sleep(seconds: int) -> None:
-        import asyncio
-
-        await asyncio.sleep(seconds)
+    async def _get(self, url: str, priority: Priority | None = None, **kwargs) -> httpx.Response:
+        await self.limiter.acquire(httpx.URL(url).host, priority, max_wait=deadline.remaining())
+        return await self._client.get(url, timeout=deadline.timeout(UPSTREAM_TIMEOUT_SECONDS), **kwargs)
 
     @staticmethod
-    def _extract_market_end_ts(item: dict) -> int | None:
-        for key in ("endDate", "endTime", "endTimestamp", "closingDate"):
-            value = item.get(key)
-            if value is None:
-                continue
-            if isinstance(value, (int, float)):
-                return int(value)
-            if isinstance(value, str):
-                try:
-                    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
-                    return int(dt.timestamp())
-                except Exception:
-                    continue
-        return None
-
-    @staticmethod
-    def _extract_yes_from_gamma_payload(payload: object) -> float | None:
-        if isinstance(payload, list) and payload:
-            payload = payload[0]
-        if not isinstance(payload, dict):
-            return None
-
-        outcome_prices = payload.get("outcomePrices")
-        if isinstance(outcome_prices, list) and outcome_prices:
-            try:
-                return float(outcome_prices[0])
-            except (TypeError, ValueError):
-                pass
-        if isinstance(outcome_prices, str):
-            try:
-                parsed = json.loads(outcome_prices)
-                if isinstance(parsed, list) and parsed:
-                    return float(parsed[0])
-            except Exception:
-                pass
-
-        outcomes = payload.get("outcomes")
-        if isinstance(outcomes, list) and outcomes:
-            first = outcomes[0]
-            if isinstance(first, dict):
-                for key in ("price", "lastPrice", "bestBid"):
-                    if key in first:
-                        try:
-                            return float(first[key])
-                        except (TypeError, ValueError):
-                            continue
-        return None
-
-    @staticmethod
-    def _extract_clob_token_ids(market: dict) -> list[str]:
-        raw = market.get("clobTokenIds") or market.get("clob_token_ids")
-        if raw is None:
-            return []
-        if isinstance(raw, str):
-            try:
-                parsed = json.loads(raw)
-                if isinstance(parsed, list):
-                    return [str(x) for x in parsed if x is not None]
-            except Exception:
-                return [part.strip() for part in raw.split(",") if part.strip()] if "," in raw else [raw]
-        if isinstance(raw, list):
-            return [str(x) for x in raw if x is not None]
-        return []
-
-    @staticmethod
-    def _extract_yes_no_tokens(market: dict) -> tuple[str | None, str | None]:
-        token_ids = PolymarketService._extract_clob_token_ids(market)
-        if len(token_ids) >= 2:
-            return token_ids[0], token_ids[1]
-        if len(token_ids) == 1:
-            return token_ids[0], None
-        return None, None
+    async def _sleep(seconds: int) -> None:
+        await clock.sleep(seconds)
 
-    @staticmethod
-    def _extract_float(payload: dict, keys: list[str]) -> float | None:
-        for key in keys:
-            if key not in payload:
-                continue
-            value = payload.get(key)
-            if value is None:
-                continue
-            try:
-                return float(value)
-            except (TypeError, ValueError):
-                continue
-        return None
+    # caminho genérico, mantido para quem extrai campos de um payload avulso
+    _extract_market_end_ts = staticmethod(gamma_parser.extract_market_end_ts)
+    _extract_yes_from_gamma_payload = staticmethod(gamma_parser.extract_yes)
+    _extract_clob_token_ids = staticmethod(gamma_parser.extract_clob_token_ids)
+    _extract_yes_no_tokens = staticmethod(gamma_parser.extract_yes_no_tokens)
+    _extract_float = staticmethod(gamma_parser.extract_float)
 
     async def close(self) -> None:
         await self._client.aclose()
+        await self.orders.close()
@@ -1,43 +1,46 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
 
 import httpx
 
-from app.models.entities import Asset
+from app.core import clock, deadline
+from app.core.config import settings
+from app.core.markets import MarketRegistry, market_registry
+from app.services.rate_limiter import Priority, RateLimitScheduler, priority_scope
+from app.services.tracing import annotate, span
 
-COINS = {
-    Asset.BTC: "bitcoin",
-    Asset.ETH: "ethereum",
-    Asset.SOL: "solana",
-}
-
-BINANCE_SYMBOLS = {
-    Asset.BTC: "BTCUSDT",
-    Asset.ETH: "ETHUSDT",
-    Asset.SOL: "SOLUSDT",
-}
-
-COINBASE_PRODUCTS = {
-    Asset.BTC: "BTC-USD",
-    Asset.ETH: "ETH-USD",
-    Asset.SOL: "SOL-USD",
-}
+UPSTREAM_TIMEOUT_SECONDS = 10
+KLINES_MAX_LIMIT = 1000
 
 
 class PriceService:
-    def __init__(self) -> None:
-        self._client = httpx.AsyncClient(timeout=10)
-        self._last_spot: dict[Asset, tuple[float, float]] = {}
-        self._last_spot_updated_at: dict[Asset, datetime] = {}
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        registry: MarketRegistry | None = None,
+        limiter: RateLimitScheduler | None = None,
+    ) -> None:
+        self._client = client or httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT_SECONDS)
+        self.registry = registry or market_registry
+        self.limiter = limiter or RateLimitScheduler.from_settings(settings)
+        self._last_spot: dict[str, tuple[float, float]] = {}
+        self._last_spot_updated_at: dict[str, datetime] = {}
         self._coingecko_blocked_until: datetime | None = None
-        self.last_source_by_asset: dict[Asset, str] = {}
+        self.last_source_by_asset: dict[str, str] = {}
 
-    async def fetch_spot(self, asset: Asset) -> tuple[float, float]:
+    async def fetch_spot(self, asset: str) -> tuple[float, float]:
         prices = await self.fetch_spots([asset])
         return prices[asset]
 
-    async def fetch_spots(self, assets: list[Asset]) -> dict[Asset, tuple[float, float]]:
+    async def fetch_spots(self, assets: list[str]) -> dict[str, tuple[float, float]]:
+        with span("fetch_spots", assets=len(assets)):
+            prices = await self._fetch_spots(assets)
+            annotate(sources=sorted({self.last_source_by_asset.get(a, "UNKNOWN") for a in prices}))
+            return prices
+
+    async def _fetch_spots(self, assets: list[str]) -> dict[str, tuple[float, float]]:
         unique_assets = list(dict.fromkeys(assets))
 
         prices = await self._fetch_coingecko_batch(unique_assets)
@@ -51,35 +54,43 @@ class PriceService:
 
         missing = [asset for asset in unique_assets if asset not in prices]
         if missing:
-            for asset in missing:
-                coinbase_spot = await self._fetch_coinbase_spot(asset)
+            coinbase_spots = await asyncio.gather(*(self._fetch_coinbase_spot(asset) for asset in missing))
+            for asset, coinbase_spot in zip(missing, coinbase_spots):
                 if coinbase_spot is not None:
                     prices[asset] = (coinbase_spot, self._derive_change(asset, coinbase_spot))
                     self._remember(asset, prices[asset], "COINBASE")
 
         missing = [asset for asset in unique_assets if asset not in prices]
-        for asset in missing:
+        prices.update(self.last_known_spots(missing))
+        return prices
+
+    def last_known_spots(self, assets: list[str]) -> dict[str, tuple[float, float]]:
+        prices: dict[str, tuple[float, float]] = {}
+        for asset in assets:
             if asset in self._last_spot:
                 prices[asset] = self._last_spot[asset]
                 self.last_source_by_asset[asset] = "LAST_KNOWN"
             else:
                 prices[asset] = (0.0, 0.0)
                 self.last_source_by_asset[asset] = "UNAVAILABLE"
-
         return prices
 
-    def last_price_age_seconds(self, asset: Asset) -> int | None:
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        await self.limiter.acquire(httpx.URL(url).host, max_wait=deadline.remaining())
+        return await self._client.get(url, timeout=deadline.timeout(UPSTREAM_TIMEOUT_SECONDS), **kwargs)
+
+    def last_price_age_seconds(self, asset: str) -> int | None:
         ts = self._last_spot_updated_at.get(asset)
         if ts is None:
             return None
-        return max(0, int((datetime.utcnow() - ts).total_seconds()))
+        return max(0, int((clock.utcnow() - ts).total_seconds()))
 
-    def _remember(self, asset: Asset, spot_tuple: tuple[float, float], source: str) -> None:
+    def _remember(self, asset: str, spot_tuple: tuple[float, float], source: str) -> None:
         self._last_spot[asset] = spot_tuple
-        self._last_spot_updated_at[asset] = datetime.utcnow()
+        self._last_spot_updated_at[asset] = clock.utcnow()
         self.last_source_by_asset[asset] = source
 
-    def _derive_change(self, asset: Asset, current_spot: float) -> float:
+    def _derive_change(self, asset: str, current_spot: float) -> float:
         previous = self._last_spot.get(asset)
         if not previous:
             return 0.0
@@ -88,18 +99,18 @@ class PriceService:
             return previous[1]
         return ((current_spot - prev_spot) / prev_spot) * 100
 
-    async def _fetch_coingecko_batch(self, assets: list[Asset]) -> dict[Asset, tuple[float, float]]:
-        now = datetime.utcnow()
+    async def _fetch_coingecko_batch(self, assets: list[str]) -> dict[str, tuple[float, float]]:
+        now = clock.utcnow()
         if self._coingecko_blocked_until and now < self._coingecko_blocked_until:
             return {}
 
-        ids = ",".join(COINS[asset] for asset in assets)
+        ids = ",".join(self.registry.get(asset).coingecko_id for asset in assets)
         url = (
-            "https://api.coingecko.com/api/v3/simple/price"
+            f"{settings.coingecko_base_url}/api/v3/simple/price"
             f"?ids={ids}&vs_currencies=usd&include_24hr_change=true"
         )
         try:
-            response = await self._client.get(url)
+            response = await self._get(url)
             if response.status_code == 429:
                 self._coingecko_blocked_until = now + timedelta(seconds=20)
                 return {}
@@ -108,9 +119,9 @@ class PriceService:
         except httpx.HTTPError:
             return {}
 
-        result: dict[Asset, tuple[float, float]] = {}
+        result: dict[str, tuple[float, float]] = {}
         for asset in assets:
-            coin = COINS[asset]
+            coin = self.registry.get(asset).coingecko_id
             info = payload.get(coin)
             if not isinstance(info, dict):
                 continue
@@ -120,14 +131,14 @@ class PriceService:
             self._remember(asset, result[asset], "COINGECKO")
         return result
 
-    async def _fetch_binance_batch(self, assets: list[Asset]) -> dict[Asset, float]:
+    async def _fetch_binance_batch(self, assets: list[str]) -> dict[str, float]:
         if not assets:
             return {}
 
-        symbols = ",".join(f'"{BINANCE_SYMBOLS[a]}"' for a in assets)
-        url = f"https://api.binance.com/api/v3/ticker/price?symbols=[{symbols}]"
+        symbols = ",".join(f'"{self.registry.get(a).binance_symbol}"' for a in assets)
+        url = f"{settings.binance_base_url}/api/v3/ticker/price?symbols=[{symbols}]"
         try:
-            response = await self._client.get(url)
+            response = await self._get(url)
             response.raise_for_status()
             payload = response.json()
         except httpx.HTTPError:
@@ -148,24 +159,51 @@ class PriceService:
                 except (TypeError, ValueError):
                     continue
 
-        result: dict[Asset, float] = {}
+        result: dict[str, float] = {}
         for asset in assets:
-            symbol = BINANCE_SYMBOLS[asset]
+            symbol = self.registry.get(asset).binance_symbol
             if symbol in by_symbol:
                 result[asset] = by_symbol[symbol]
 
         return result
 
-    async def _fetch_coinbase_spot(self, asset: Asset) -> float | None:
-        product = COINBASE_PRODUCTS[asset]
-        url = f"https://api.exchange.coinbase.com/products/{product}/ticker"
+    async def _fetch_coinbase_spot(self, asset: str) -> float | None:
+        product = self.registry.get(asset).coinbase_product
+        url = f"{settings.coinbase_base_url}/products/{product}/ticker"
         try:
-            response = await self._client.get(url)
+            response = await self._get(url)
             response.raise_for_status()
             payload = response.json()
             return float(payload["price"])
         except (httpx.HTTPError, KeyError, TypeError, ValueError):
             return None
 
+    async def fetch_klines(self, asset: str, start_ms: int, limit: int, interval: str = "1m") -> list[tuple[int, float]]:
+        """Candles fechados da Binance a partir de `start_ms`, como `(open_time_ms, close)`; uma request por ativo."""
+        symbol = self.registry.get(asset).binance_symbol
+        url = f"{settings.binance_base_url}/api/v3/klines"
+        params = {"symbol": symbol, "interval": interval, "startTime": start_ms, "limit": min(limit, KLINES_MAX_LIMIT)}
+        with span("fetch_klines", asset=asset, limit=params["limit"]), priority_scope(Priority.BACKFILL):
+            try:
+                response = await self._get(url, params=params)
+                response.raise_for_status()
+                payload = response.json()
+            except httpx.HTTPError:
+                return []
+
+        if not isinstance(payload, list):
+            return []
+        now_ms = int(clock.now() * 1000)
+        candles: list[tuple[int, float]] = []
+        for row in payload:
+            # [open_time, open, high, low, close, volume, close_time, ...]; o candle em formação fica de fora
+            try:
+                if int(row[6]) >= now_ms:
+                    continue
+                candles.append((int(row[0]), float(row[4])))
+            except (IndexError, TypeError, ValueError):
+                continue
+        return candles
+
     async def close(self) -> None:
         await self._client.aclose()
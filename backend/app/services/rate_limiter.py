@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Iterator
+
+import httpx
+
+from app.core.config import Settings
+
+
+class Priority(IntEnum):
+    """Menor valor = atendido primeiro."""
+
+    ORDER = 0
+    ENTRY = 1
+    MARKET_DATA = 2
+    SETTLEMENT = 3
+    SEARCH = 4
+    BACKFILL = 5
+
+
+DEFAULT_MAX_WAIT_SECONDS = {
+    Priority.ORDER: 2.0,
+    Priority.ENTRY: 1.0,
+    Priority.MARKET_DATA: 1.0,
+    Priority.SETTLEMENT: 5.0,
+    Priority.SEARCH: 0.5,
+    # bootstrap de candles roda fora do tick e pode esperar a fila esvaziar
+    Priority.BACKFILL: 30.0,
+}
+
+_current_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.MARKET_DATA)
+
+
+class RateLimitDropped(httpx.HTTPError):
+    """Request descartada: não caberia no token bucket do host dentro do prazo."""
+
+
+@contextmanager
+def priority_scope(priority: Priority) -> Iterator[None]:
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+def _check_limit(where: str, rate: float, burst: float) -> None:
+    # rate 0 divide por zero no cálculo da espera; burst < 1 nunca chega a ter um token inteiro
+    if not rate > 0:
+        raise ValueError(f"{where}: rate precisa ser > 0 requests/s (recebido {rate})")
+    if not burst >= 1:
+        raise ValueError(f"{where}: burst precisa ser >= 1 (recebido {burst})")
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    timeout_handle: asyncio.TimerHandle | None = field(default=None, compare=False)
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    burst: float
+    tokens: float = 0.0
+    updated_at: float = field(default_factory=time.monotonic)
+    waiters: list[_Waiter] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+    def __post_init__(self) -> None:
+        _check_limit("TokenBucket", self.rate, self.burst)
+        self.tokens = self.burst
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def pending(self) -> list[_Waiter]:
+        return [w for w in self.waiters if not w.future.done()]
+
+
+@dataclass
+class HostStats:
+    granted: int = 0
+    queued: int = 0
+    dropped: int = 0
+    wait_ms_total: float = 0.0
+
+
+class RateLimitScheduler:
+    """Token bucket por host upstream, compartilhado entre PriceService e PolymarketService.
+
+    Requests de maior prioridade (ordens, janela de entrada) passam na frente de liquidação e
+    busca; o que não couber no prazo (`max_wait`) é descartado com `RateLimitDropped` em vez de
+    ficar na fila.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        max_wait_seconds: dict[Priority, float] | None = None,
+    ) -> None:
+        self._limits = dict(limits or {})
+        for host, (rate, burst) in self._limits.items():
+            _check_limit(f"RATE_LIMITS[{host!r}]", rate, burst)
+        self._max_wait = {**DEFAULT_MAX_WAIT_SECONDS, **(max_wait_seconds or {})}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self.stats: dict[str, dict[str, HostStats]] = {}
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "RateLimitScheduler":
+        limits = {host: (float(values[0]), float(values[1])) for host, values in config.rate_limits.items()}
+        max_wait = {Priority[name.upper()]: float(seconds) for name, seconds in config.rate_limit_max_wait_seconds.items()}
+        return cls(limits, max_wait)
+
+    def _bucket(self, host: str) -> TokenBucket | None:
+        bucket = self._buckets.get(host)
+        if bucket is None and host in self._limits:
+            rate, burst = self._limits[host]
+            bucket = self._buckets[host] = TokenBucket(rate=rate, burst=burst)
+        return bucket
+
+    def _stats(self, host: str, priority: Priority) -> HostStats:
+        return self.stats.setdefault(host, {}).setdefault(priority.name, HostStats())
+
+    async def acquire(self, host: str, priority: Priority | None = None, max_wait: float | None = None) -> None:
+        bucket = self._bucket(host)
+        if bucket is None:
+            return
+        priority = current_priority() if priority is None else priority
+        stats = self._stats(host, priority)
+        budget = self._max_wait[priority] if max_wait is None else min(max_wait, self._max_wait[priority])
+
+        now = time.monotonic()
+        bucket.refill(now)
+        ahead = sum(1 for w in bucket.pending() if w.priority <= priority)
+        if ahead == 0 and bucket.tokens >= 1:
+            bucket.tokens -= 1
+            stats.granted += 1
+            return
+
+        eta = (ahead + 1 - bucket.tokens) / bucket.rate
+        if eta > budget:
+            stats.dropped += 1
+            raise RateLimitDropped(f"RATE_LIMIT_DROPPED::{host}::{priority.name}")
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority=int(priority), seq=next(self._seq), future=loop.create_future())
+        waiter.timeout_handle = loop.call_later(budget, self._expire, waiter, host, priority)
+        heapq.heappush(bucket.waiters, waiter)
+        stats.queued += 1
+        self._arm(bucket)
+        try:
+            await waiter.future
+        except RateLimitDropped:
+            stats.dropped += 1
+            raise
+        finally:
+            if waiter.timeout_handle is not None:
+                waiter.timeout_handle.cancel()
+            if not waiter.future.done():
+                waiter.future.cancel()
+        stats.granted += 1
+        stats.wait_ms_total += (time.monotonic() - now) * 1000
+
+    @staticmethod
+    def _expire(waiter: _Waiter, host: str, priority: Priority) -> None:
+        if not waiter.future.done():
+            waiter.future.set_exception(RateLimitDropped(f"RATE_LIMIT_DROPPED::{host}::{priority.name}"))
+
+    def _arm(self, bucket: TokenBucket) -> None:
+        if bucket.timer is not None:
+            return
+        delay = max(0.0, (1 - bucket.tokens) / bucket.rate)
+        bucket.timer = asyncio.get_running_loop().call_later(delay, self._dispatch, bucket)
+
+    def _dispatch(self, bucket: TokenBucket) -> None:
+        bucket.timer = None
+        bucket.refill(time.monotonic())
+        while bucket.waiters and bucket.tokens >= 1:
+            waiter = heapq.heappop(bucket.waiters)
+            if waiter.future.done():
+                continue
+            bucket.tokens -= 1
+            waiter.future.set_result(None)
+        while bucket.waiters and bucket.waiters[0].future.done():
+            heapq.heappop(bucket.waiters)
+        if bucket.waiters:
+            self._arm(bucket)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        hosts: dict[str, dict] = {}
+        for host, (rate, burst) in self._limits.items():
+            bucket = self._buckets.get(host)
+            if bucket is not None:
+                bucket.refill(now)
+            hosts[host] = {
+                "rate_per_second": rate,
+                "burst": burst,
+                "tokens": round(bucket.tokens, 3) if bucket else burst,
+                "queued_now": len(bucket.pending()) if bucket else 0,
+                "by_priority": {name: vars(s) for name, s in self.stats.get(host, {}).items()},
+            }
+        return {"hosts": hosts, "max_wait_seconds": {p.name: w for p, w in self._max_wait.items()}}
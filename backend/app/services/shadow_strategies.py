@@ -0,0 +1,164 @@
+"""Estratégias sombra: N configs extras avaliadas a cada tick sobre os mesmos dados.
+
+Cada estratégia tem seu próprio book paper (`TradeExecutor`) e usa o snapshot já montado
+pelo engine e o `IndicatorService` compartilhado; nenhuma faz request upstream. MACD/TREND
+são calculados no máximo uma vez por ativo por tick, não uma vez por estratégia.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.core import clock
+from app.models.entities import ApiMode, Direction, Indicator, ShadowStrategyConfig
+from app.models.records import SignalRecord, SnapshotRecord
+from app.services.indicator_service import IndicatorService
+from app.services.strategy_service import StrategyService
+from app.services.trade_executor import TradeExecutor
+
+_UNSET = object()
+
+
+class _TickBiases:
+    """Fachada do IndicatorService que memoriza os vieses de um ativo durante uma avaliação."""
+
+    def __init__(self, indicator_service: IndicatorService) -> None:
+        self._indicators = indicator_service
+        self._macd: object = _UNSET
+        self._trend: object = _UNSET
+
+    def macd_bias(self, asset: str) -> Direction | None:
+        if self._macd is _UNSET:
+            self._macd = self._indicators.macd_bias(asset)
+        return self._macd
+
+    def trend_bias(self, asset: str) -> Direction | None:
+        if self._trend is _UNSET:
+            self._trend = self._indicators.trend_bias(asset)
+        return self._trend
+
+    def stream_bias(self, asset: str, indicator: Indicator) -> tuple[bool, Direction | None]:
+        # indicadores streaming já são atualizados uma vez por push; a leitura é O(1)
+        return self._indicators.stream_bias(asset, indicator)
+
+
+class ShadowStrategy:
+    def __init__(self, config: ShadowStrategyConfig) -> None:
+        self.config = config
+        self.executor = TradeExecutor()
+        self.last_decision_by_asset: dict[str, str] = {}
+        # uma entrada por ativo por janela, como a estratégia principal (sem o journal compartilhado);
+        # (ativo, janela) -> fechamento da janela, para descartar as que já fecharam
+        self.entered_windows: dict[tuple[str, int | None], datetime] = {}
+
+    def evaluate(
+        self,
+        snapshot: SnapshotRecord,
+        biases: _TickBiases,
+        remaining_seconds: int,
+        closes_at: datetime,
+        api_mode: ApiMode,
+        dominant: tuple[Direction | None, float],
+    ) -> None:
+        config = self.config
+        asset = snapshot.asset
+        direction, probability = dominant
+        if direction is None:
+            self.last_decision_by_asset[asset] = "TIE_UP_DOWN"
+            return
+        if (asset, snapshot.window_ts) in self.entered_windows:
+            self.last_decision_by_asset[asset] = f"SKIP_DUPLICATE_WINDOW::{snapshot.window_ts}"
+            return
+        if any(t.asset == asset for t in self.executor.open_trades.values()):
+            self.last_decision_by_asset[asset] = "WAIT_OPEN_TRADE_TO_CLOSE"
+            return
+        if remaining_seconds > config.late_entry_seconds or probability < config.entry_probability_threshold:
+            self.last_decision_by_asset[asset] = f"WAIT_WINDOW_OR_PROB(rem={remaining_seconds}s max_prob={probability:.2f})"
+            return
+        if snapshot.stale:
+            self.last_decision_by_asset[asset] = f"ENTRY_BLOCKED_STALE_DATA(window={snapshot.window_ts})"
+            return
+
+        if config.enabled_indicators:
+            strategy = StrategyService(biases, config.confidence_threshold)
+            signal, debug = strategy.generate_signal(asset, config.enabled_indicators, direction)
+            if signal is None:
+                self.last_decision_by_asset[asset] = debug
+                return
+        else:
+            signal = SignalRecord(asset=asset, direction=direction, confidence=probability, reason=f"WINDOW_{snapshot.window_ts}")
+
+        self.entered_windows[(asset, snapshot.window_ts)] = closes_at
+        trade = self.executor.open_trade(snapshot, signal, api_mode, closes_at=closes_at, stop_loss_pct=config.stop_loss_pct)
+        self.last_decision_by_asset[asset] = f"PAPER_ORDER::{signal.direction.value}::{trade.id}"
+
+    def settle(
+        self,
+        latest_snapshots: dict[str, SnapshotRecord],
+        result_overrides: dict[str, tuple[float | None, float | None, str]],
+        deferred: set[str],
+    ) -> None:
+        # reaproveita o resultado que o engine buscou para o mesmo mercado; sem ele, spot de agora vs price to beat
+        self.executor.settle_with_market_results(latest_snapshots, result_overrides, deferred, "SHADOW_SPOT")
+        # janela fechada não recebe mais snapshots: a marca de entrada não serve para mais nada
+        now = clock.utcnow()
+        if any(closes_at <= now for closes_at in self.entered_windows.values()):
+            self.entered_windows = {key: closes_at for key, closes_at in self.entered_windows.items() if closes_at > now}
+
+    def view(self) -> dict:
+        analytics = self.executor.analytics.view()
+        return {
+            "name": self.config.name,
+            "config": self.config.model_dump(),
+            "overall": analytics["overall"],
+            "by_asset": analytics["by_asset"],
+            "today_pnl": self.executor.stats.today_pnl,
+            "open_trades": [t.as_dict() for t in self.executor.open_trades.values()],
+            "last_decision_by_asset": dict(self.last_decision_by_asset),
+        }
+
+
+class ShadowRunner:
+    def __init__(self, indicator_service: IndicatorService, configs: list[ShadowStrategyConfig] | None = None) -> None:
+        self.indicator_service = indicator_service
+        self.strategies: list[ShadowStrategy] = []
+        self.configure(configs or [])
+
+    def configure(self, configs: list[ShadowStrategyConfig]) -> None:
+        """Troca o conjunto de estratégias; as que mantêm o nome preservam o book."""
+        names = [c.name for c in configs]
+        if len(set(names)) != len(names):
+            raise ValueError("nomes de estratégia sombra duplicados")
+        self.indicator_service.require(i for config in configs for i in config.enabled_indicators)
+        existing = {s.config.name: s for s in self.strategies}
+        strategies = []
+        for config in configs:
+            strategy = existing.get(config.name) or ShadowStrategy(config)
+            strategy.config = config
+            strategies.append(strategy)
+        self.strategies = strategies
+
+    def evaluate(
+        self,
+        snapshot: SnapshotRecord,
+        remaining_seconds: int,
+        closes_at: datetime,
+        api_mode: ApiMode,
+        dominant: tuple[Direction | None, float],
+    ) -> None:
+        if not self.strategies:
+            return
+        biases = _TickBiases(self.indicator_service)
+        for strategy in self.strategies:
+            strategy.evaluate(snapshot, biases, remaining_seconds, closes_at, api_mode, dominant)
+
+    def settle(
+        self,
+        latest_snapshots: dict[str, SnapshotRecord],
+        result_overrides_by_market: dict[str, tuple[float | None, float | None, str]],
+        deferred_markets: set[str],
+    ) -> None:
+        for strategy in self.strategies:
+            strategy.settle(latest_snapshots, result_overrides_by_market, deferred_markets)
+
+    def view(self) -> dict:
+        return {"strategies": [s.view() for s in self.strategies]}
@@ -0,0 +1,252 @@
+"""Modo sharded do engine: ativos particionados entre processos, um coordenador na frente.
+
+Cada shard é um `app.engine_worker --shard i` com seu próprio `BotEngine` (registry parcial,
+socket, snapshot) e o coordenador expõe o mesmo conjunto de comandos de `EngineCommands`,
+fazendo fan-out para os shards e mesclando estado, decisões e stats. A regra de uma entrada
+por janela vale entre shards via o `ActionJournal` compartilhado (flock no mesmo arquivo).
+"""
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from app.core.markets import MarketRegistry
+from app.models.entities import StrategyConfig
+from app.services.engine_gateway import EngineCommandError, RemoteEngineGateway
+from app.services.trade_analytics import merge_views
+
+MAX_HISTORY = 200
+
+
+def shard_of(symbol: str, count: int) -> int:
+    """Shard estável por símbolo (crc32), para um ativo não trocar de shard quando o registry cresce."""
+    return zlib.crc32(symbol.encode()) % count
+
+
+def shard_registry(registry: MarketRegistry, index: int, count: int) -> MarketRegistry:
+    specs = [spec for spec in registry if shard_of(spec.symbol, count) == index]
+    if not specs:
+        raise ValueError(f"shard {index}/{count} ficou sem ativos; use menos shards")
+    return MarketRegistry(specs)
+
+
+def effective_shard_count(registry: MarketRegistry, requested: int) -> int:
+    """Maior número de shards <= `requested` em que nenhum shard fica vazio."""
+    for count in range(min(requested, len(registry)), 1, -1):
+        if len({shard_of(symbol, count) for symbol in registry.symbols}) == count:
+            return count
+    return 1
+
+
+class ShardCoordinator:
+    def __init__(self, registry: MarketRegistry, shards: list[RemoteEngineGateway]) -> None:
+        self.registry = registry
+        self.shards = shards
+        self.symbols_by_shard = [
+            [s for s in registry.symbols if shard_of(s, len(shards)) == i] for i in range(len(shards))
+        ]
+        self._state_cache: tuple[str, dict] | None = None
+        self._commands: dict[str, Callable[..., Awaitable[dict]]] = {
+            "health": self.health,
+            "start": self._broadcast("start", {"status": "started"}),
+            "stop": self._broadcast("stop", {"status": "stopped"}),
+            "tick": self.tick,
+            "get_config": self.get_config,
+            "update_config": self.update_config,
+            "registry": self.registry_view,
+            "get_execution_config": self.get_execution_config,
+            "update_execution_config": self.update_execution_config,
+            "state": self.state,
+            "analytics": self.analytics,
+            "decisions": self.decisions,
+            "bars": self.bars,
+            "window_series": self.window_series,
+            "shadow": self._per_shard("shadow"),
+            "update_shadow": self.update_shadow,
+            "accounts": self._per_shard("accounts"),
+            "update_accounts": self.update_accounts,
+            "debug_ticks": self._per_shard("debug_ticks"),
+            "debug_tick": self._per_shard("debug_tick"),
+            "rate_limits": self._per_shard("rate_limits"),
+            "orders": self._per_shard("orders"),
+            "order_queue": self.order_queue,
+            "export_page": self.export_page,
+            "snapshot": self._per_shard("snapshot"),
+            "profile": self._per_shard("profile"),
+        }
+
+    async def dispatch(self, command: str, args: dict[str, Any]) -> dict:
+        handler = self._commands.get(command)
+        if handler is None:
+            raise EngineCommandError(400, f"comando desconhecido: {command}")
+        return await handler(**args)
+
+    async def _fan_out(self, command: str, **args: Any) -> list[dict]:
+        return list(await asyncio.gather(*(shard.call(command, **args) for shard in self.shards)))
+
+    def _broadcast(self, command: str, reply: dict) -> Callable[..., Awaitable[dict]]:
+        async def handler() -> dict:
+            await self._fan_out(command)
+            return reply
+
+        return handler
+
+    def _per_shard(self, command: str) -> Callable[..., Awaitable[dict]]:
+        async def handler(**args: Any) -> dict:
+            replies = await asyncio.gather(*(shard.call(command, **args) for shard in self.shards), return_exceptions=True)
+            shards: dict[str, Any] = {}
+            for index, reply in enumerate(replies):
+                if isinstance(reply, EngineCommandError):
+                    shards[str(index)] = {"error": reply.detail, "status_code": reply.status_code}
+                elif isinstance(reply, BaseException):
+                    raise reply
+                else:
+                    shards[str(index)] = reply
+            return {"shards": shards}
+
+        return handler
+
+    async def health(self) -> dict:
+        replies = await self._fan_out("health")
+        ticks = [r["last_tick_at"] for r in replies if r["last_tick_at"]]
+        return {
+            "status": "ok",
+            "running": all(r["running"] for r in replies),
+            "last_tick_at": max(ticks) if ticks else None,
+            "tick_count": max(r["tick_count"] for r in replies),
+            "shards": len(self.shards),
+        }
+
+    async def tick(self) -> dict:
+        replies = await self._fan_out("tick")
+        return {"status": "tick_complete", "tick_count": max(r["tick_count"] for r in replies)}
+
+    async def get_config(self) -> dict:
+        configs = [r["config"] for r in await self._fan_out("get_config")]
+        return {"config": self._merge_config(configs)}
+
+    def _merge_config(self, configs: list[dict]) -> dict:
+        enabled = {asset for config in configs for asset in config["enabled_assets"]}
+        return {**configs[0], "enabled_assets": [s for s in self.registry.symbols if s in enabled]}
+
+    async def update_config(self, config: dict, allow_empty: bool = False) -> dict:
+        payload = StrategyConfig(**config)
+        if not payload.enabled_assets:
+            raise EngineCommandError(400, "enabled_assets não pode ser vazio")
+        unknown = [asset for asset in payload.enabled_assets if asset not in self.registry]
+        if unknown:
+            raise EngineCommandError(400, f"ativos fora do registry: {', '.join(unknown)}")
+        # cada shard recebe só os seus ativos; os limites numéricos são validados pelos shards
+        replies = await asyncio.gather(
+            *(
+                shard.call(
+                    "update_config",
+                    config={**payload.model_dump(mode="json"), "enabled_assets": [a for a in payload.enabled_assets if a in symbols]},
+                    allow_empty=True,
+                )
+                for shard, symbols in zip(self.shards, self.symbols_by_shard)
+            )
+        )
+        return {"status": "updated", "config": self._merge_config([r["config"] for r in replies])}
+
+    async def registry_view(self) -> dict:
+        return {
+            "markets": [{**spec.to_dict(), "shard": shard_of(spec.symbol, len(self.shards))} for spec in self.registry]
+        }
+
+    async def get_execution_config(self) -> dict:
+        return (await self._fan_out("get_execution_config"))[0]
+
+    async def update_execution_config(self, config: dict) -> dict:
+        return (await self._fan_out("update_execution_config", config=config))[0]
+
+    async def state(self, since: str | None = None) -> dict:
+        states = await asyncio.gather(*(shard.state() for shard in self.shards))
+        # chave com a versão de cada shard, não a soma: um shard reiniciado (contador de volta ao
+        # começo) poderia repetir um total que a API já tem em cache com outro estado
+        version = ",".join(str(shard.state_version) for shard in self.shards)
+        if since == version:
+            return {"version": version, "unchanged": True}
+        if self._state_cache is None or self._state_cache[0] != version:
+            self._state_cache = (version, self._merge_states(list(states)))
+        return {"version": version, "state": self._state_cache[1]}
+
+    async def analytics(self) -> dict:
+        return merge_views(await self._fan_out("analytics"))
+
+    async def window_series(self, asset: str, **args: Any) -> dict:
+        return await self.shards[shard_of(asset, len(self.shards))].call("window_series", asset=asset, **args)
+
+    async def bars(self, asset: str, **args: Any) -> dict:
+        # as barras de um ativo só existem no shard dono dele
+        return await self.shards[shard_of(asset, len(self.shards))].call("bars", asset=asset, **args)
+
+    async def decisions(self, limit: int = 100, **args: Any) -> dict:
+        replies = await self._fan_out("decisions", limit=limit, **args)
+        events = sorted((e for r in replies for e in r["decisions"]), key=lambda e: (e["at"], e["tick"]), reverse=True)
+        return {"decisions": events[: max(0, limit)], "buffer": {str(i): r["buffer"] for i, r in enumerate(replies)}}
+
+    async def order_queue(self, limit: int = 100, **args: Any) -> dict:
+        replies = await self._fan_out("order_queue", limit=limit, **args)
+        orders = sorted((o for r in replies for o in r["orders"]), key=lambda o: o["transitions"][-1][1], reverse=True)
+        by_state: Counter[str] = Counter()
+        for reply in replies:
+            by_state.update(reply["by_state"])
+        return {
+            "orders": orders[: max(0, limit)],
+            "by_state": dict(by_state),
+            "shards": {str(i): {k: r[k] for k in ("in_flight", "peak_in_flight", "limits")} for i, r in enumerate(replies)},
+        }
+
+    async def export_page(self, kind: str, cursor: list | None = None, asset: str | None = None, **args: Any) -> dict:
+        # um shard de cada vez; cursor = [posição do shard, cursor do shard]
+        order = [shard_of(asset, len(self.shards))] if asset is not None else list(range(len(self.shards)))
+        position, inner = cursor if cursor else (0, None)
+        while position < len(order):
+            page = await self.shards[order[position]].call("export_page", kind=kind, cursor=inner, asset=asset, **args)
+            if page["cursor"] is not None:
+                return {"rows": page["rows"], "cursor": [position, page["cursor"]]}
+            position, inner = position + 1, None
+            if page["rows"]:
+                return {"rows": page["rows"], "cursor": [position, None] if position < len(order) else None}
+        return {"rows": [], "cursor": None}
+
+    async def update_shadow(self, strategies: list[dict]) -> dict:
+        return (await self._fan_out("update_shadow", strategies=strategies))[0]
+
+    async def update_accounts(self, accounts: list[dict]) -> dict:
+        return (await self._fan_out("update_accounts", accounts=accounts))[0]
+
+    def _merge_states(self, states: list[dict]) -> dict:
+        trades = sum(s["stats"]["trades"] for s in states)
+        wins = sum(round(s["stats"]["win_rate"] * s["stats"]["trades"]) for s in states)
+        all_time = sum(s["stats"]["all_time_pnl"] for s in states)
+        ticks = [s["last_tick_at"] for s in states if s["last_tick_at"]]
+        history = sorted((t for s in states for t in s["history"]), key=lambda t: t.get("closed_at") or "", reverse=True)
+        merged: dict = {
+            "stats": {
+                "balance": sum(s["stats"]["balance"] for s in states),
+                "today_pnl": sum(s["stats"]["today_pnl"] for s in states),
+                "all_time_pnl": all_time,
+                "trades": trades,
+                "win_rate": wins / trades if trades else 0.0,
+                "avg_pnl": all_time / trades if trades else 0.0,
+            },
+            "config": self._merge_config([s["config"] for s in states]),
+            "available_assets": self.registry.symbols,
+            "execution_config": states[0]["execution_config"],
+            "running": all(s["running"] for s in states),
+            "tick_count": max(s["tick_count"] for s in states),
+            "last_tick_at": max(ticks) if ticks else None,
+            "last_decision_by_asset": {},
+            "markets": {},
+            "open_trades": [t for s in states for t in s["open_trades"]],
+            "history": history[:MAX_HISTORY],
+            "shards": len(states),
+        }
+        for s in states:
+            merged["last_decision_by_asset"].update(s["last_decision_by_asset"])
+            merged["markets"].update(s["markets"])
+        return merged
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from collections import Counter
 
-from app.models.entities import Direction, Indicator, Signal
+from app.models.entities import Direction, Indicator
+from app.models.records import SignalRecord
 from app.services.indicator_service import IndicatorService
+from app.services.streaming_indicators import STREAMING_INDICATORS
 
 
 class StrategyService:
@@ -16,7 +18,7 @@ class StrategyService:
         asset: str,
         indicators: list[Indicator],
         poly_bias: Direction | None,
-    ) -> tuple[Signal | None, str]:
+    ) -> tuple[SignalRecord | None, str]:
         votes: list[Direction] = []
         reasons: list[str] = []
 
@@ -40,8 +42,21 @@ class StrategyService:
             votes.append(poly_bias)
             reasons.append(f"POLY={poly_bias.value}")
 
+        for indicator in indicators:
+            if indicator not in STREAMING_INDICATORS:
+                continue
+            ready, bias = self.indicator_service.stream_bias(asset, indicator)
+            if not ready:
+                return None, f"WAITING_{indicator.value}_HISTORY"
+            if bias is None:
+                # ex.: ATR dentro da faixa; o indicador não vota neste tick
+                reasons.append(f"{indicator.value}=FLAT")
+                continue
+            votes.append(bias)
+            reasons.append(f"{indicator.value}={bias.value}")
+
         if not votes:
-            return None, "NO_INDICATORS_SELECTED"
+            return None, f"NO_DIRECTIONAL_VOTES::{' + '.join(reasons)}" if reasons else "NO_INDICATORS_SELECTED"
 
         counts = Counter(votes)
         direction, qty = counts.most_common(1)[0]
@@ -56,4 +71,4 @@ class StrategyService:
         if confidence < self.confidence_threshold:
             return None, f"LOW_CONFIDENCE({confidence:.2f})::{reason}"
 
-        return Signal(asset=asset, direction=direction, confidence=confidence, reason=reason), f"SIGNAL({confidence:.2f})::{reason}"
+        return SignalRecord(asset=asset, direction=direction, confidence=confidence, reason=reason), f"SIGNAL({confidence:.2f})::{reason}"
@@ -0,0 +1,374 @@
+"""Indicadores em streaming (O(1) por preço) montados num grafo de dependências por ativo.
+
+Cada indicador (`RSI`, `BOLLINGER`, `ATR`, `VWAP`, `RSI_HTF`, `TREND_HTF`) declara os nós de
+que precisa (EMA, RMA, janela móvel com média/variância, true range, reamostragem para um
+timeframe maior...). Nós são deduplicados pela especificação: a SMA20 do Bollinger é a mesma
+linha média da banda do ATR, e a reamostragem HTF é uma só para RSI_HTF e TREND_HTF. Um push
+percorre os nós uma vez em ordem topológica, então o custo por tick não depende de quantas
+estratégias (principal ou sombra) leem o mesmo indicador.
+
+Entrada por push: uma barra (open, high, low, close, volume), fechada pelo `BarBuilder`. O
+volume da barra hoje é só a contagem de polls nela, então o VWAP pesa as barras igualmente
+até existir volume real.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Iterable
+
+from app.models.entities import Direction, Indicator
+
+RSI_PERIOD = 14
+BOLLINGER_PERIOD = 20
+# largura das bandas em desvios padrão; dentro delas o Bollinger se abstém
+BOLLINGER_K = 2.0
+ATR_PERIOD = 14
+# fração do ATR acima/abaixo da SMA20 a partir da qual o ATR vota; dentro da faixa ele se abstém
+ATR_BAND = 0.5
+VWAP_PERIOD = 30
+
+STREAMING_INDICATORS = frozenset(
+    {Indicator.RSI, Indicator.BOLLINGER, Indicator.ATR, Indicator.VWAP, Indicator.RSI_HTF, Indicator.TREND_HTF}
+)
+
+Bar = tuple[float, float, float, float, float]
+
+
+class _Node(ABC):
+    __slots__ = ("inputs", "fired", "count", "value")
+
+    def __init__(self, *inputs: "_Node") -> None:
+        self.inputs = inputs
+        self.fired = False
+        self.count = 0
+        self.value = 0.0
+
+    def step(self) -> None:
+        self.fired = any(node.fired for node in self.inputs)
+        if self.fired:
+            self.update()
+            self.count += 1
+
+    @abstractmethod
+    def update(self) -> None:
+        """Recalcula `value` a partir dos inputs; só é chamado quando algum input disparou."""
+
+
+class _BarNode(_Node):
+    """Nó que expõe uma barra; `value` é o close."""
+
+    __slots__ = ("open", "high", "low", "volume", "prev_close")
+
+    def __init__(self, *inputs: _Node) -> None:
+        super().__init__(*inputs)
+        self.open = self.high = self.low = self.volume = 0.0
+        self.prev_close: float | None = None
+
+    def update(self) -> None:
+        # a barra é escrita por `push`/`step` da subclasse, não derivada dos inputs
+        pass
+
+
+class _Source(_BarNode):
+    __slots__ = ()
+
+    def push(self, bar: Bar) -> None:
+        self.prev_close = self.value if self.count else None
+        self.open, self.high, self.low, self.value, self.volume = bar
+        self.fired = True
+        self.count += 1
+
+
+class _Resample(_BarNode):
+    """Junta `factor` barras do input numa barra do timeframe maior; só dispara ao fechar a barra."""
+
+    __slots__ = ("factor", "_pending", "_open", "_high", "_low", "_volume")
+
+    def __init__(self, source: _BarNode, factor: int) -> None:
+        super().__init__(source)
+        self.factor = factor
+        self._pending = 0
+
+    def step(self) -> None:
+        source = self.inputs[0]
+        self.fired = False
+        if not source.fired:
+            return
+        if self._pending == 0:
+            self._open, self._high, self._low, self._volume = source.open, source.high, source.low, 0.0
+        self._high = max(self._high, source.high)
+        self._low = min(self._low, source.low)
+        self._volume += source.volume
+        self._pending += 1
+        if self._pending == self.factor:
+            self.prev_close = self.value if self.count else None
+            self.open, self.high, self.low, self.value, self.volume = self._open, self._high, self._low, source.value, self._volume
+            self._pending = 0
+            self.fired = True
+            self.count += 1
+
+
+class _Change(_Node):
+    __slots__ = ()
+
+    def update(self) -> None:
+        bar = self.inputs[0]
+        self.value = 0.0 if bar.prev_close is None else bar.value - bar.prev_close
+
+
+class _Gain(_Node):
+    __slots__ = ()
+
+    def update(self) -> None:
+        self.value = max(self.inputs[0].value, 0.0)
+
+
+class _Loss(_Node):
+    __slots__ = ()
+
+    def update(self) -> None:
+        self.value = max(-self.inputs[0].value, 0.0)
+
+
+class _TrueRange(_Node):
+    __slots__ = ()
+
+    def update(self) -> None:
+        bar = self.inputs[0]
+        if bar.prev_close is None:
+            self.value = bar.high - bar.low
+        else:
+            self.value = max(bar.high - bar.low, abs(bar.high - bar.prev_close), abs(bar.low - bar.prev_close))
+
+
+class _Ema(_Node):
+    __slots__ = ("alpha",)
+
+    def __init__(self, source: _Node, alpha: float) -> None:
+        super().__init__(source)
+        self.alpha = alpha
+
+    def update(self) -> None:
+        x = self.inputs[0].value
+        self.value = x if self.count == 0 else x * self.alpha + self.value * (1 - self.alpha)
+
+
+class _Rolling(_Node):
+    """Janela móvel com soma e soma dos quadrados; as somas são refeitas a cada volta do ring para não acumular erro."""
+
+    __slots__ = ("period", "window", "total", "total_sq", "_since_rebuild")
+
+    def __init__(self, source: _Node, period: int) -> None:
+        super().__init__(source)
+        self.period = period
+        self.window: deque[float] = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._since_rebuild = 0
+
+    def update(self) -> None:
+        x = self.inputs[0].value
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.period:
+            self.total = sum(self.window)
+            self.total_sq = sum(v * v for v in self.window)
+            self._since_rebuild = 0
+        self.value = self.total / len(self.window)
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def variance(self) -> float:
+        n = len(self.window)
+        return max(0.0, self.total_sq / n - self.value * self.value) if n else 0.0
+
+
+class _Vwap(_Node):
+    """Média do preço típico (H+L+C)/3 das últimas `period` barras, com peso igual por barra.
+
+    O volume das barras do `BarBuilder` é a contagem de polls, que depende de
+    `POLL_INTERVAL_SECONDS`; ele não entra no peso enquanto não houver volume negociado real.
+    """
+
+    __slots__ = ("period", "window", "total")
+
+    def __init__(self, source: _BarNode, period: int) -> None:
+        super().__init__(source)
+        self.period = period
+        self.window: deque[float] = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self) -> None:
+        bar = self.inputs[0]
+        typical = (bar.high + bar.low + bar.value) / 3
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(typical)
+        self.total += typical
+        self.value = self.total / len(self.window)
+
+
+class _AssetGraph:
+    """Nós de um ativo, deduplicados por especificação e guardados em ordem topológica."""
+
+    def __init__(self, htf_factor: int) -> None:
+        self.htf_factor = htf_factor
+        self.source = _Source()
+        self._nodes: dict[tuple, _Node] = {}
+        self._order: list[_Node] = []
+        self.readers: dict[Indicator, Callable[[], tuple[bool, Direction | None]]] = {}
+
+    def _node(self, key: tuple, factory: Callable[[], _Node]) -> _Node:
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = factory()
+            self._order.append(node)
+        return node
+
+    def push(self, bar: Bar) -> None:
+        self.source.push(bar)
+        for node in self._order:
+            node.step()
+
+    def htf(self) -> _BarNode:
+        return self._node(("resample", self.htf_factor), lambda: _Resample(self.source, self.htf_factor))
+
+    def rolling(self, source: _Node, key: tuple, period: int) -> _Rolling:
+        return self._node(("rolling", key, period), lambda: _Rolling(source, period))
+
+    def rma(self, source: _Node, key: tuple, period: int) -> _Ema:
+        return self._node(("rma", key, period), lambda: _Ema(source, 1 / period))
+
+    def _rsi(self, bar: _BarNode, key: tuple) -> Callable[[], tuple[bool, Direction | None]]:
+        change = self._node(("change", key), lambda: _Change(bar))
+        gains = self.rma(self._node(("gain", key), lambda: _Gain(change)), ("gain", key), RSI_PERIOD)
+        losses = self.rma(self._node(("loss", key), lambda: _Loss(change)), ("loss", key), RSI_PERIOD)
+
+        def read() -> tuple[bool, Direction | None]:
+            # a primeira barra não tem variação; RSI precisa de RSI_PERIOD variações
+            if gains.count <= RSI_PERIOD:
+                return False, None
+            rsi = 100.0 if losses.value == 0 else 100 - 100 / (1 + gains.value / losses.value)
+            return True, Direction.UP if rsi >= 50 else Direction.DOWN
+
+        return read
+
+    def add(self, indicator: Indicator) -> None:
+        if indicator in self.readers:
+            return
+        source = self.source
+        if indicator == Indicator.RSI:
+            reader = self._rsi(source, ("source",))
+        elif indicator == Indicator.RSI_HTF:
+            reader = self._rsi(self.htf(), ("htf", self.htf_factor))
+        elif indicator == Indicator.BOLLINGER:
+            middle = self.rolling(source, ("source",), BOLLINGER_PERIOD)
+
+            def reader() -> tuple[bool, Direction | None]:
+                if not middle.full:
+                    return False, None
+                # bandas = SMA20 ± k desvios, da mesma janela móvel (soma e soma dos quadrados)
+                width = BOLLINGER_K * middle.variance ** 0.5
+                if source.value > middle.value + width:
+                    return True, Direction.UP
+                if source.value < middle.value - width:
+                    return True, Direction.DOWN
+                return True, None
+
+        elif indicator == Indicator.ATR:
+            middle = self.rolling(source, ("source",), BOLLINGER_PERIOD)
+            atr = self.rma(self._node(("true_range",), lambda: _TrueRange(source)), ("true_range",), ATR_PERIOD)
+
+            def reader() -> tuple[bool, Direction | None]:
+                if not middle.full or atr.count < ATR_PERIOD:
+                    return False, None
+                if source.value > middle.value + ATR_BAND * atr.value:
+                    return True, Direction.UP
+                if source.value < middle.value - ATR_BAND * atr.value:
+                    return True, Direction.DOWN
+                return True, None
+
+        elif indicator == Indicator.VWAP:
+            vwap = self._node(("vwap", VWAP_PERIOD), lambda: _Vwap(source, VWAP_PERIOD))
+
+            def reader() -> tuple[bool, Direction | None]:
+                if vwap.count < VWAP_PERIOD:
+                    return False, None
+                return True, Direction.UP if source.value >= vwap.value else Direction.DOWN
+
+        elif indicator == Indicator.TREND_HTF:
+            htf = self.htf()
+            short = self.rolling(htf, ("htf", self.htf_factor), 10)
+            long = self.rolling(htf, ("htf", self.htf_factor), 30)
+
+            def reader() -> tuple[bool, Direction | None]:
+                if not long.full:
+                    return False, None
+                return True, Direction.UP if short.value >= long.value else Direction.DOWN
+
+        else:
+            raise ValueError(f"indicador sem versão streaming: {indicator.value}")
+        self.readers[indicator] = reader
+
+    @property
+    def node_count(self) -> int:
+        return len(self._order)
+
+
+class StreamingIndicators:
+    """Grafos por ativo. Um indicador novo reconstrói os grafos a partir das barras guardadas
+    (`bars(asset)`, até `MAX_HISTORY`), as mesmas que os pushes ao vivo receberam; depois
+    disso cada push é O(nós)."""
+
+    def __init__(self, bars: Callable[[str], list[Bar]], htf_factor: int = 5) -> None:
+        self._bars = bars
+        self.htf_factor = max(2, htf_factor)
+        self.indicators: set[Indicator] = set()
+        self._graphs: dict[str, _AssetGraph] = {}
+
+    def require(self, indicators: Iterable[Indicator]) -> None:
+        wanted = {i for i in indicators if i in STREAMING_INDICATORS}
+        if wanted - self.indicators:
+            self.indicators |= wanted
+            self._graphs.clear()
+
+    def reset(self, asset: str) -> None:
+        self._graphs.pop(asset, None)
+
+    def push(self, asset: str, bar: Bar) -> None:
+        if not self.indicators:
+            return
+        graph = self._graphs.get(asset)
+        if graph is None:
+            # o histórico já inclui esta barra
+            self._build(asset)
+        else:
+            graph.push(bar)
+
+    def _build(self, asset: str) -> _AssetGraph:
+        graph = self._graphs[asset] = _AssetGraph(self.htf_factor)
+        for indicator in sorted(self.indicators, key=lambda i: i.value):
+            graph.add(indicator)
+        for bar in self._bars(asset):
+            graph.push(bar)
+        return graph
+
+    def bias(self, asset: str, indicator: Indicator) -> tuple[bool, Direction | None]:
+        """(pronto, direção); pronto com direção None = o indicador se abstém neste tick."""
+        self.require([indicator])
+        graph = self._graphs.get(asset) or self._build(asset)
+        return graph.readers[indicator]()
+
+    def node_count(self, asset: str) -> int:
+        graph = self._graphs.get(asset)
+        return graph.node_count if graph else 0
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator
+
+from app.core import clock
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+@dataclass
+class Span:
+    id: int
+    parent_id: int | None
+    name: str
+    start: float
+    end: float | None = None
+    attrs: dict = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass
+class TickTrace:
+    tick: int
+    started_at: datetime
+    start: float
+    end: float | None = None
+    spans: list[Span] = field(default_factory=list)
+    profile: dict | None = None
+    _next_id: int = 0
+
+    def new_span(self, name: str, parent_id: int | None, attrs: dict) -> Span:
+        self._next_id += 1
+        span = Span(id=self._next_id, parent_id=parent_id, name=name, start=time.perf_counter(), attrs=attrs)
+        self.spans.append(span)
+        return span
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.end is None:
+            return None
+        return (self.end - self.start) * 1000
+
+    def to_dict(self) -> dict:
+        """Formato waterfall: offsets relativos ao início do tick, em ms."""
+        return {
+            "tick": self.tick,
+            "started_at": self.started_at,
+            "duration_ms": _round_ms(self.duration_ms),
+            "spans": [
+                {
+                    "id": s.id,
+                    "parent_id": s.parent_id,
+                    "name": s.name,
+                    "start_ms": _round_ms((s.start - self.start) * 1000),
+                    "duration_ms": _round_ms((s.end - s.start) * 1000) if s.end is not None else None,
+                    "attrs": s.attrs,
+                    "error": s.error,
+                }
+                for s in self.spans
+            ],
+            "profile": self.profile,
+        }
+
+
+_current_trace: ContextVar[TickTrace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def _round_ms(value: float | None) -> float | None:
+    return None if value is None else round(value, 3)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span | None]:
+    """Abre um span filho do span atual; no-op quando não há tick sendo rastreado."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = trace.new_span(name, parent.id if parent else None, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = exc.__class__.__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def annotate(**attrs) -> None:
+    """Adiciona atributos ao span atual (ex.: estratégia Gamma que resolveu o mercado)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+class TickTracer:
+    def __init__(self, capacity: int = 50) -> None:
+        self._traces: deque[TickTrace] = deque(maxlen=max(1, capacity))
+        self._profile_requests: dict[int | None, str] = {}
+        self._owns_tracemalloc = False
+        # maior tick já iniciado e se algum tick está com profiler ligado agora
+        self._last_tick = 0
+        self._profiling = False
+
+    @property
+    def capacity(self) -> int:
+        return self._traces.maxlen or 0
+
+    def request_profile(self, mode: str, tick: int | None = None) -> None:
+        """Agenda profiling do tick `tick` (ou do próximo, se None)."""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode deve ser um de {', '.join(PROFILE_MODES)}")
+        if tick is not None and tick <= self._last_tick:
+            raise ValueError(f"tick {tick} já rodou (último tick: {self._last_tick})")
+        self._profile_requests[tick] = mode
+
+    def pending_profiles(self) -> dict:
+        return {("next" if k is None else str(k)): v for k, v in self._profile_requests.items()}
+
+    @contextmanager
+    def trace_tick(self, tick: int) -> Iterator[TickTrace]:
+        trace = TickTrace(tick=tick, started_at=clock.utcnow(), start=time.perf_counter())
+        self._last_tick = max(self._last_tick, tick)
+        # pedidos para ticks que já passaram (ex.: contador restaurado do snapshot) não rodam mais
+        for stale in [k for k in self._profile_requests if k is not None and k < tick]:
+            del self._profile_requests[stale]
+        mode = None
+        if not self._profiling:
+            # tick manual sobreposto ao do loop: um profiler por vez, o pedido espera o próximo tick livre
+            mode = self._profile_requests.pop(tick, None) or self._profile_requests.pop(None, None)
+        profiler = self._start_profile(mode)
+        self._profiling = self._profiling or mode is not None
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            with span("tick", tick=tick):
+                yield trace
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            trace.end = time.perf_counter()
+            if mode is not None:
+                trace.profile = self._stop_profile(mode, profiler)
+                self._profiling = False
+            self._traces.append(trace)
+
+    def traces(self) -> list[TickTrace]:
+        """Traces guardados, do mais antigo para o mais recente."""
+        return list(self._traces)
+
+    def recent(self, limit: int | None = None) -> list[dict]:
+        traces = list(self._traces)
+        if limit is not None:
+            traces = traces[-limit:] if limit > 0 else []
+        return [t.to_dict() for t in reversed(traces)]
+
+    def get(self, tick: int) -> dict | None:
+        for trace in self._traces:
+            if trace.tick == tick:
+                return trace.to_dict()
+        return None
+
+    def _start_profile(self, mode: str | None) -> cProfile.Profile | None:
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        return None
+
+    def _stop_profile(self, mode: str, profiler: cProfile.Profile | None, top: int = 30) -> dict:
+        if mode == "cprofile" and profiler is not None:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            return {"mode": mode, "report": out.getvalue()}
+        if not tracemalloc.is_tracing():
+            return {"mode": mode, "report": ""}
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        return {
+            "mode": mode,
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [str(stat) for stat in snapshot.statistics("lineno")[:top]],
+        }
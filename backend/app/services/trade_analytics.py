@@ -0,0 +1,177 @@
+"""Estatísticas incrementais das trades liquidadas.
+
+Cada liquidação atualiza, em O(1), buckets de tamanho fixo por ativo, direção, hora do dia
+(UTC) e dia (UTC, com retenção), além da curva de equity (deque limitado). Nada aqui varre
+`closed_trades`, que de qualquer forma guarda só as 200 mais recentes.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+
+from app.core import clock
+from app.models.records import TradeRecord
+
+
+@dataclass(slots=True)
+class AnalyticsBucket:
+    trades: int = 0
+    wins: int = 0
+    pnl: float = 0.0
+    peak_pnl: float = 0.0
+    max_drawdown: float = 0.0
+    # >0: vitórias seguidas, <0: derrotas seguidas (STOP_LOSS conta como derrota)
+    streak: int = 0
+    max_win_streak: int = 0
+    max_loss_streak: int = 0
+
+    def record(self, pnl: float, won: bool) -> None:
+        self.trades += 1
+        self.pnl += pnl
+        if self.pnl > self.peak_pnl:
+            self.peak_pnl = self.pnl
+        drawdown = self.peak_pnl - self.pnl
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+        if won:
+            self.wins += 1
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.max_win_streak = max(self.max_win_streak, self.streak)
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            self.max_loss_streak = max(self.max_loss_streak, -self.streak)
+
+    def view(self) -> dict:
+        return {
+            "trades": self.trades,
+            "wins": self.wins,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "pnl": self.pnl,
+            "avg_pnl": self.pnl / self.trades if self.trades else 0.0,
+            "max_drawdown": self.max_drawdown,
+            "streak": self.streak,
+            "max_win_streak": self.max_win_streak,
+            "max_loss_streak": self.max_loss_streak,
+        }
+
+
+_BUCKET_FIELDS = frozenset(f.name for f in fields(AnalyticsBucket))
+
+
+def _bucket(data: dict) -> AnalyticsBucket:
+    return AnalyticsBucket(**{k: v for k, v in data.items() if k in _BUCKET_FIELDS})
+
+
+class TradeAnalytics:
+    def __init__(self, day_retention: int = 90, equity_points: int = 1000) -> None:
+        self.day_retention = max(1, day_retention)
+        self.overall = AnalyticsBucket()
+        self.by_asset: dict[str, AnalyticsBucket] = {}
+        self.by_direction: dict[str, AnalyticsBucket] = {}
+        self.by_hour = [AnalyticsBucket() for _ in range(24)]
+        self.by_day: OrderedDict[str, AnalyticsBucket] = OrderedDict()
+        # (epoch da liquidação, pnl acumulado)
+        self.equity_curve: deque[tuple[float, float]] = deque(maxlen=max(1, equity_points))
+
+    def record(self, trade: TradeRecord) -> None:
+        closed_at = trade.closed_at or clock.utcnow()
+        won = trade.status == "WIN"
+        self.overall.record(trade.pnl, won)
+        self.by_asset.setdefault(trade.asset, AnalyticsBucket()).record(trade.pnl, won)
+        self.by_direction.setdefault(trade.direction.value, AnalyticsBucket()).record(trade.pnl, won)
+        self.by_hour[closed_at.hour].record(trade.pnl, won)
+        self._day(closed_at).record(trade.pnl, won)
+        self.equity_curve.append(((closed_at - datetime(1970, 1, 1)).total_seconds(), self.overall.pnl))
+
+    def _day(self, moment: datetime) -> AnalyticsBucket:
+        key = moment.date().isoformat()
+        bucket = self.by_day.get(key)
+        if bucket is None:
+            bucket = self.by_day[key] = AnalyticsBucket()
+            while len(self.by_day) > self.day_retention:
+                self.by_day.popitem(last=False)
+        return bucket
+
+    def day_pnl(self, moment: datetime) -> float:
+        bucket = self.by_day.get(moment.date().isoformat())
+        return bucket.pnl if bucket else 0.0
+
+    def view(self) -> dict:
+        return {
+            "overall": self.overall.view(),
+            "by_asset": {asset: b.view() for asset, b in self.by_asset.items()},
+            "by_direction": {direction: b.view() for direction, b in self.by_direction.items()},
+            "by_hour": {str(hour): b.view() for hour, b in enumerate(self.by_hour) if b.trades},
+            "by_day": {day: b.view() for day, b in self.by_day.items()},
+            "equity_curve": [list(point) for point in self.equity_curve],
+            "retention": {"days": self.day_retention, "equity_points": self.equity_curve.maxlen},
+        }
+
+    def to_state(self) -> dict:
+        return {
+            "overall": asdict(self.overall),
+            "by_asset": {k: asdict(b) for k, b in self.by_asset.items()},
+            "by_direction": {k: asdict(b) for k, b in self.by_direction.items()},
+            "by_hour": [asdict(b) for b in self.by_hour],
+            "by_day": {k: asdict(b) for k, b in self.by_day.items()},
+            "equity_curve": [list(point) for point in self.equity_curve],
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.overall = _bucket(state["overall"])
+        self.by_asset = {k: _bucket(v) for k, v in state["by_asset"].items()}
+        self.by_direction = {k: _bucket(v) for k, v in state["by_direction"].items()}
+        self.by_hour = [_bucket(v) for v in state["by_hour"]]
+        self.by_day = OrderedDict((k, _bucket(v)) for k, v in list(state["by_day"].items())[-self.day_retention :])
+        self.equity_curve.clear()
+        self.equity_curve.extend((ts, equity) for ts, equity in state["equity_curve"])
+
+
+def merge_views(views: list[dict]) -> dict:
+    """Junta as views de vários shards.
+
+    Contagens e PnL somam; drawdown e sequências não são recuperáveis a partir das partes,
+    então vem o pior valor entre os shards. A curva de equity soma o último valor de cada shard.
+    """
+
+    def merge_buckets(buckets: list[dict]) -> dict:
+        trades = sum(b["trades"] for b in buckets)
+        wins = sum(b["wins"] for b in buckets)
+        pnl = sum(b["pnl"] for b in buckets)
+        return {
+            "trades": trades,
+            "wins": wins,
+            "win_rate": wins / trades if trades else 0.0,
+            "pnl": pnl,
+            "avg_pnl": pnl / trades if trades else 0.0,
+            "max_drawdown": max(b["max_drawdown"] for b in buckets),
+            "streak": max((b["streak"] for b in buckets), key=abs),
+            "max_win_streak": max(b["max_win_streak"] for b in buckets),
+            "max_loss_streak": max(b["max_loss_streak"] for b in buckets),
+        }
+
+    def merge_group(name: str) -> dict:
+        grouped: dict[str, list[dict]] = {}
+        for view in views:
+            for key, bucket in view[name].items():
+                grouped.setdefault(key, []).append(bucket)
+        return {key: merge_buckets(buckets) for key, buckets in grouped.items()}
+
+    points = sorted((ts, index, equity) for index, view in enumerate(views) for ts, equity in view["equity_curve"])
+    last_equity = [0.0] * len(views)
+    equity_curve = []
+    for ts, index, equity in points:
+        last_equity[index] = equity
+        equity_curve.append([ts, sum(last_equity)])
+    max_points = max(view["retention"]["equity_points"] for view in views)
+
+    return {
+        "overall": merge_buckets([view["overall"] for view in views]),
+        "by_asset": merge_group("by_asset"),
+        "by_direction": merge_group("by_direction"),
+        "by_hour": dict(sorted(merge_group("by_hour").items(), key=lambda item: int(item[0]))),
+        "by_day": dict(sorted(merge_group("by_day").items())),
+        "equity_curve": equity_curve[-max_points:],
+        "retention": views[0]["retention"],
+    }
@@ -3,24 +3,29 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import uuid4
 
-from app.models.entities import ApiMode, BotStats, Direction, MarketSnapshot, Signal, Trade
+from app.core import clock
+from app.models.entities import ApiMode, BotStats, Direction
+from app.models.records import SignalRecord, SnapshotRecord, TradeRecord
+from app.services.trade_analytics import TradeAnalytics
 
 
 class TradeExecutor:
-    def __init__(self) -> None:
+    def __init__(self, analytics: TradeAnalytics | None = None) -> None:
         self.stats = BotStats()
-        self.open_trades: dict[str, Trade] = {}
-        self.closed_trades: list[Trade] = []
+        self.analytics = analytics or TradeAnalytics()
+        self.open_trades: dict[str, TradeRecord] = {}
+        self.closed_trades: list[TradeRecord] = []
 
     def open_trade(
         self,
-        snapshot: MarketSnapshot,
-        signal: Signal,
+        snapshot: SnapshotRecord,
+        signal: SignalRecord,
         api_mode: ApiMode,
         closes_at: datetime,
         stop_loss_pct: float,
-    ) -> Trade:
-        trade = Trade(
+        amount_usd: float = 0.0,
+    ) -> TradeRecord:
+        trade = TradeRecord(
             id=str(uuid4())[:8],
             asset=snapshot.asset,
             direction=signal.direction,
@@ -33,20 +38,27 @@ class TradeExecutor:
             window_ts=snapshot.window_ts,
             market_end_ts=snapshot.market_end_ts,
             price_to_beat=snapshot.price_to_beat,
+            amount_usd=amount_usd,
         )
         self.open_trades[trade.id] = trade
         return trade
 
     def settle_due_trades(
         self,
-        latest_prices: dict[str, MarketSnapshot],
+        latest_prices: dict[str, SnapshotRecord],
         result_overrides: dict[str, tuple[float | None, float | None, str]] | None = None,
-    ) -> list[Trade]:
-        now = datetime.utcnow()
-        settled: list[Trade] = []
+        deferred: set[str] | None = None,
+    ) -> list[TradeRecord]:
+        now = clock.utcnow()
+        settled: list[TradeRecord] = []
         overrides = result_overrides or {}
+        skip = deferred or set()
+        # o PnL do dia vem do bucket do dia (UTC), então zera sozinho na virada
+        self.stats.today_pnl = self.analytics.day_pnl(now)
 
         for trade_id, trade in list(self.open_trades.items()):
+            if trade_id in skip:
+                continue
             snapshot = latest_prices.get(trade.asset)
             if snapshot is None:
                 continue
@@ -73,13 +85,17 @@ class TradeExecutor:
                     trade.status = "STOP_LOSS"
                 else:
                     trade.status = "WIN" if trade.pnl > 0 else "LOSS"
+            if trade.amount_usd > 0 and trade.entry_price > 0:
+                # stake em USD compra amount_usd / entrada unidades do ativo
+                trade.pnl *= trade.amount_usd / trade.entry_price
 
             self.stats.trades += 1
             self.stats.all_time_pnl += trade.pnl
-            self.stats.today_pnl += trade.pnl
             self.stats.balance += trade.pnl
             if trade.status == "WIN":
                 self.stats.wins += 1
+            self.analytics.record(trade)
+            self.stats.today_pnl = self.analytics.day_pnl(now)
 
             self.closed_trades.insert(0, trade)
             self.open_trades.pop(trade_id)
@@ -88,8 +104,37 @@ class TradeExecutor:
         self.closed_trades = self.closed_trades[:200]
         return settled
 
+    def settle_with_market_results(
+        self,
+        latest_prices: dict[str, SnapshotRecord],
+        results_by_market: dict[str, tuple[float | None, float | None, str]],
+        deferred_markets: set[str],
+        fallback_source: str,
+    ) -> list[TradeRecord]:
+        """Liquida um book secundário (sombras, contas) com os resultados que o engine já buscou por mercado.
+
+        Sem resultado para o mercado, compara o spot de agora com o price to beat; mercado adiado
+        pelo engine fica para o próximo tick. Não faz request upstream.
+        """
+        now = clock.utcnow()
+        overrides: dict[str, tuple[float | None, float | None, str]] = {}
+        skip: set[str] = set()
+        for trade in self.open_trades.values():
+            if now < trade.closes_at:
+                continue
+            result = results_by_market.get(trade.market_id)
+            if result is not None:
+                overrides[trade.id] = result
+            elif trade.market_id in deferred_markets:
+                skip.add(trade.id)
+            else:
+                snapshot = latest_prices.get(trade.asset)
+                if snapshot is not None and trade.price_to_beat is not None:
+                    overrides[trade.id] = (snapshot.spot_price, trade.price_to_beat, fallback_source)
+        return self.settle_due_trades(latest_prices, overrides, deferred=skip)
+
     @staticmethod
-    def _is_stop_hit(trade: Trade, price: float) -> bool:
+    def _is_stop_hit(trade: TradeRecord, price: float) -> bool:
         if trade.stop_loss_pct <= 0:
             return False
         if trade.direction == Direction.UP:
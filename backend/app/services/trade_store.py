@@ -0,0 +1,114 @@
+"""Histórico completo das trades liquidadas, uma linha JSON por trade (`TRADE_STORE_PATH`).
+
+`closed_trades` guarda só as 200 mais recentes para o `/api/state`; o store guarda todas. O
+tick só acumula as linhas liquidadas; a escrita no arquivo roda em thread, uma por vez, como
+o spill do log de decisões. A leitura para export é por página, a partir de um offset em bytes.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+from app.models.records import TradeRecord
+
+
+def _default(value: object) -> object:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{value.__class__.__name__} não serializável")
+
+
+def trade_row(trade: TradeRecord) -> dict:
+    """Trade como dict só de tipos JSON (datetimes em ISO, enums pelo valor)."""
+    row = trade.as_dict()
+    for key, value in row.items():
+        if isinstance(value, (datetime, Enum)):
+            row[key] = _default(value)
+    return row
+
+
+def _closed_epoch(row: dict) -> float | None:
+    closed_at = row.get("closed_at")
+    if not closed_at:
+        return None
+    return (datetime.fromisoformat(closed_at) - datetime(1970, 1, 1)).total_seconds()
+
+
+class TradeStore:
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._pending = bytearray()
+        self._write_task: asyncio.Task | None = None
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def add(self, trades: list[TradeRecord]) -> None:
+        if self.path is None:
+            return
+        for trade in trades:
+            self._pending += json.dumps(trade_row(trade), separators=(",", ":")).encode() + b"\n"
+
+    def maybe_flush(self) -> None:
+        if not self._pending or (self._write_task is not None and not self._write_task.done()):
+            return
+        pending, self._pending = self._pending, bytearray()
+        self._write_task = asyncio.create_task(asyncio.to_thread(self._write, pending))
+
+    async def flush(self) -> None:
+        if self._write_task is not None:
+            await self._write_task
+        if self._pending:
+            pending, self._pending = self._pending, bytearray()
+            await asyncio.to_thread(self._write, pending)
+
+    def _write(self, data: bytearray) -> None:
+        assert self.path is not None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as f:
+            f.write(data)
+        self.written += data.count(b"\n")
+
+    async def export_page(
+        self, offset: int, asset: str | None, since: float | None, until: float | None, limit: int
+    ) -> tuple[list[dict], int | None]:
+        """Trades a partir de `offset` (bytes) que passam nos filtros; o segundo item é o offset seguinte (None no fim)."""
+        return await asyncio.to_thread(self._read_page, offset, asset, since, until, limit)
+
+    def _read_page(
+        self, offset: int, asset: str | None, since: float | None, until: float | None, limit: int
+    ) -> tuple[list[dict], int | None]:
+        if self.path is None or not self.path.exists():
+            return [], None
+        rows: list[dict] = []
+        # filtros estreitos não prendem uma página: no máximo `limit * 16` linhas lidas por chamada
+        budget = max(1, limit) * 16
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            while budget and len(rows) < limit:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    # fim do arquivo (ou linha ainda sendo escrita): para antes dela
+                    return rows, None
+                offset += len(line)
+                budget -= 1
+                row = json.loads(line)
+                if asset is not None and row.get("asset") != asset:
+                    continue
+                if since is not None or until is not None:
+                    closed = _closed_epoch(row)
+                    if closed is None or (since is not None and closed < since) or (until is not None and closed > until):
+                        continue
+                rows.append(row)
+            more = f.read(1) != b""
+        return rows, offset if more else None
+
+    def stats(self) -> dict:
+        return {"path": str(self.path) if self.path else None, "written": self.written, "pending": self._pending.count(b"\n")}
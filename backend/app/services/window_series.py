@@ -0,0 +1,269 @@
+"""Série temporal de odds e spot por janela (`GET /api/windows/{asset}/{window_ts}`).
+
+O engine só guarda o último snapshot por ativo; aqui fica a trajetória inteira de cada janela,
+um ponto por tick: instante, odds UP/DOWN, spot e idade do preço. Cada janela é um
+`bytearray` append-only com os pontos codificados em delta (diferença para o ponto anterior,
+em inteiros escalados, zigzag + varint), então um ponto típico ocupa uns 10 bytes em vez de
+cinco floats. O índice é o próprio mapa (ativo, janela) -> série: ler uma janela decodifica
+só os bytes dela, sem varrer as outras.
+
+Ficam em memória as `WINDOW_SERIES_RETENTION` janelas mais recentes de cada ativo. Com
+`WINDOW_SERIES_DIR`, a janela é fechada quando o ativo passa para a seguinte e seu bloco vai
+para `windows-<ATIVO>.bin` (escrito em thread, como o spill do log de decisões); o índice
+do arquivo (janela -> offset) é montado lendo só os cabeçalhos dos blocos.
+"""
+from __future__ import annotations
+
+import asyncio
+import struct
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from app.models.records import SnapshotRecord
+
+# escalas dos inteiros codificados: ms, odds com 4 casas, spot com 6 casas, idade em ms
+_TIME_SCALE = 1000
+_ODDS_SCALE = 10_000
+_SPOT_SCALE = 1_000_000
+# window_ts, pontos, bytes do payload
+_BLOCK = struct.Struct("<qII")
+
+
+def _put(out: bytearray, value: int) -> None:
+    # zigzag (negativos pequenos viram positivos pequenos) + varint de 7 bits
+    value = (value << 1) ^ (value >> 63)
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode(data: bytes, count: int) -> list[tuple[int, int, int, int, int]]:
+    """Pontos (t_ms, yes, no, spot, age_ms) em inteiros escalados, na ordem em que foram gravados."""
+    points = []
+    pos = 0
+    last = [0, 0, 0, 0]
+    for _ in range(count):
+        row = []
+        for column in range(5):
+            value = shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    break
+                shift += 7
+            value = (value >> 1) ^ -(value & 1)
+            if column < 4:
+                value += last[column]
+                last[column] = value
+            row.append(value)
+        points.append(tuple(row))
+    return points
+
+
+class _Window:
+    __slots__ = ("data", "count", "last", "sealed")
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.count = 0
+        self.last = (0, 0, 0, 0)
+        # bloco já enfileirado para o disco com todos os pontos atuais
+        self.sealed = False
+
+    def append(self, t_ms: int, yes: int, no: int, spot: int, age_ms: int) -> None:
+        values = (t_ms, yes, no, spot)
+        for value, previous in zip(values, self.last):
+            _put(self.data, value - previous)
+        # a idade do preço não tem tendência entre ticks: vai absoluta
+        _put(self.data, age_ms)
+        self.last = values
+        self.count += 1
+        self.sealed = False
+
+    def block(self, window_ts: int) -> bytes:
+        return _BLOCK.pack(window_ts, self.count, len(self.data)) + bytes(self.data)
+
+
+def _columns(points: list[tuple[int, int, int, int, int]]) -> dict:
+    return {
+        "t": [p[0] / _TIME_SCALE for p in points],
+        "yes": [p[1] / _ODDS_SCALE for p in points],
+        "no": [p[2] / _ODDS_SCALE for p in points],
+        "spot": [p[3] / _SPOT_SCALE for p in points],
+        "price_age_seconds": [p[4] / _TIME_SCALE if p[4] >= 0 else None for p in points],
+    }
+
+
+class WindowSeriesStore:
+    def __init__(self, retention: int = 96, directory: Path | None = None) -> None:
+        self.retention = max(1, retention)
+        self.directory = directory
+        self._windows: dict[str, OrderedDict[int, _Window]] = {}
+        self._pending: dict[str, bytearray] = {}
+        # lote da última escrita em disco (pode estar em andamento)
+        self._writing: dict[str, bytearray] = {}
+        self._write_task: asyncio.Task | None = None
+        # ativo -> janela -> [(offset, pontos, bytes)]; a mesma janela pode ter mais de um bloco (restart no meio dela)
+        self._file_index: dict[str, dict[int, list[tuple[int, int, int]]]] = {}
+        self.points = 0
+        self.written_windows = 0
+
+    def record(self, snapshot: SnapshotRecord, at: float) -> None:
+        if snapshot.window_ts is None:
+            return
+        windows = self._windows.get(snapshot.asset)
+        if windows is None:
+            windows = self._windows[snapshot.asset] = OrderedDict()
+        window = windows.get(snapshot.window_ts)
+        if window is None:
+            # janela nova: as anteriores do ativo não recebem mais pontos e já podem ir para o disco
+            for window_ts, previous in windows.items():
+                self._seal(snapshot.asset, window_ts, previous)
+            window = windows[snapshot.window_ts] = _Window()
+            while len(windows) > self.retention:
+                windows.popitem(last=False)
+        age = snapshot.price_age_seconds
+        window.append(
+            round(at * _TIME_SCALE),
+            round(snapshot.yes_odds * _ODDS_SCALE),
+            round(snapshot.no_odds * _ODDS_SCALE),
+            round(snapshot.spot_price * _SPOT_SCALE),
+            -1 if age is None else round(age * _TIME_SCALE),
+        )
+        self.points += 1
+
+    def _seal(self, asset: str, window_ts: int, window: _Window) -> None:
+        if self.directory is None or window.count == 0 or window.sealed:
+            return
+        self._pending.setdefault(asset, bytearray()).extend(window.block(window_ts))
+        window.sealed = True
+
+    def maybe_flush(self) -> None:
+        """Grava em thread os blocos das janelas fechadas; uma escrita por vez."""
+        if not self._pending or (self._write_task is not None and not self._write_task.done()):
+            return
+        pending, self._pending = self._pending, {}
+        self._writing = pending
+        self._write_task = asyncio.create_task(asyncio.to_thread(self._write, pending))
+
+    async def flush(self, include_open: bool = False) -> None:
+        """Espera a escrita em andamento e grava o que falta; `include_open` grava também as janelas abertas (shutdown)."""
+        if self._write_task is not None:
+            await self._write_task
+        if include_open:
+            for asset, windows in self._windows.items():
+                for window_ts, window in windows.items():
+                    self._seal(asset, window_ts, window)
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self._writing = pending
+            await asyncio.to_thread(self._write, pending)
+
+    def path(self, asset: str) -> Path | None:
+        return None if self.directory is None else self.directory / f"windows-{asset}.bin"
+
+    def _write(self, pending: dict[str, bytearray]) -> None:
+        assert self.directory is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for asset, data in pending.items():
+            index = self._index(asset)
+            with self.path(asset).open("ab") as f:
+                offset = f.tell()
+                f.write(data)
+            for window_ts, count, length in self._headers(data):
+                index.setdefault(window_ts, []).append((offset, count, length))
+                offset += _BLOCK.size + length
+                self.written_windows += 1
+
+    @staticmethod
+    def _headers(data: bytes) -> list[tuple[int, int, int]]:
+        headers = []
+        pos = 0
+        while pos + _BLOCK.size <= len(data):
+            window_ts, count, length = _BLOCK.unpack_from(data, pos)
+            headers.append((window_ts, count, length))
+            pos += _BLOCK.size + length
+        return headers
+
+    def _index(self, asset: str) -> dict[int, list[tuple[int, int, int]]]:
+        """Janela -> blocos no arquivo do ativo; na primeira vez lê só os cabeçalhos (roda em thread)."""
+        index = self._file_index.get(asset)
+        if index is not None:
+            return index
+        index = self._file_index[asset] = {}
+        path = self.path(asset)
+        if path is None or not path.exists():
+            return index
+        with path.open("rb") as f:
+            size = f.seek(0, 2)
+            offset = 0
+            while offset + _BLOCK.size <= size:
+                f.seek(offset)
+                window_ts, count, length = _BLOCK.unpack(f.read(_BLOCK.size))
+                if offset + _BLOCK.size + length > size:
+                    # bloco cortado (processo morto no meio da escrita)
+                    break
+                index.setdefault(window_ts, []).append((offset, count, length))
+                offset += _BLOCK.size + length
+        return index
+
+    def _read_disk(self, asset: str, window_ts: int) -> list[list[tuple[int, int, int, int, int]]]:
+        """Pontos de cada bloco da janela no arquivo, um item por bloco."""
+        path = self.path(asset)
+        blocks = self._index(asset).get(window_ts, []) if path is not None else []
+        decoded = []
+        if blocks:
+            with path.open("rb") as f:
+                for offset, count, length in blocks:
+                    f.seek(offset + _BLOCK.size)
+                    decoded.append(decode(f.read(length), count))
+        return decoded
+
+    async def series(self, asset: str, window_ts: int) -> dict | None:
+        """Trajetória completa da janela em colunas, do ponto mais antigo ao mais recente; None se não há pontos."""
+        window = self._windows.get(asset, {}).get(window_ts)
+        # memória (janela aberta e blocos ainda a caminho do disco) copiada antes de ler o disco;
+        # um bloco gravado enquanto a janela seguia em memória é prefixo dela: cada ponto entra
+        # tantas vezes quanto na fonte que mais o repete (dois ticks no mesmo ms continuam dois pontos)
+        memory = [(bytes(window.data), window.count)] if window is not None else []
+        for batch in (self._writing, self._pending):
+            data = bytes(batch.get(asset, b""))
+            pos = 0
+            for block_ts, count, length in self._headers(data):
+                if block_ts == window_ts:
+                    memory.append((data[pos + _BLOCK.size : pos + _BLOCK.size + length], count))
+                pos += _BLOCK.size + length
+        sources = await asyncio.to_thread(self._read_disk, asset, window_ts) if self.directory is not None else []
+        sources.extend(decode(data, count) for data, count in memory)
+        merged: Counter[tuple[int, int, int, int, int]] = Counter()
+        for points in sources:
+            merged |= Counter(points)
+        if not merged:
+            return None
+        ordered = sorted(merged.elements())
+        return {"asset": asset, "window_ts": window_ts, "points": len(ordered), **_columns(ordered)}
+
+    async def windows(self, asset: str) -> list[dict]:
+        """Janelas do ativo com pontos, mais recentes primeiro (memória e disco)."""
+        found: dict[int, dict] = {}
+        if self.directory is not None:
+            index = await asyncio.to_thread(self._index, asset)
+            for window_ts, blocks in list(index.items()):
+                found[window_ts] = {"window_ts": window_ts, "points": sum(b[1] for b in blocks), "in_memory": False}
+        for window_ts, window in self._windows.get(asset, {}).items():
+            found[window_ts] = {"window_ts": window_ts, "points": window.count, "in_memory": True}
+        return [found[ts] for ts in sorted(found, reverse=True)]
+
+    def stats(self) -> dict:
+        windows = [w for per_asset in self._windows.values() for w in per_asset.values()]
+        return {
+            "retention_per_asset": self.retention,
+            "windows_in_memory": len(windows),
+            "points": self.points,
+            "encoded_bytes": sum(len(w.data) for w in windows),
+            "directory": str(self.directory) if self.directory else None,
+            "written_windows": self.written_windows,
+        }
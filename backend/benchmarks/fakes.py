@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.core.markets import WINDOW_LENGTHS
+
+SPOT_BY_COINGECKO_ID = {"bitcoin": 68000.0, "ethereum": 3500.0, "solana": 150.0}
+SPOT_BY_BINANCE_SYMBOL = {"BTCUSDT": 68000.0, "ETHUSDT": 3500.0, "SOLUSDT": 150.0}
+
+_WINDOW_SLUG = re.compile(r"^(?P<asset>[a-z0-9]+)-updown-(?P<window>\d+[mh])-(?P<ts>\d+)$")
+
+
+@dataclass
+class FaultProfile:
+    """Falhas injetadas por host upstream (latência em ms, taxas entre 0 e 1)."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+
+@dataclass
+class FakeUpstreams:
+    """Fakes de Gamma, CLOB, CoinGecko, Binance e Coinbase para `httpx.MockTransport`."""
+
+    default_fault: FaultProfile = field(default_factory=FaultProfile)
+    faults_by_host: dict[str, FaultProfile] = field(default_factory=dict)
+    yes_odds: float = 0.9
+    seed: int = 7
+    requests_by_host: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport(), timeout=10)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests_by_host[host] = self.requests_by_host.get(host, 0) + 1
+        fault = self.faults_by_host.get(host, self.default_fault)
+
+        delay = fault.latency_ms + (self._rng.uniform(-fault.jitter_ms, fault.jitter_ms) if fault.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if fault.rate_limit_rate and self._rng.random() < fault.rate_limit_rate:
+            return httpx.Response(429, json={"error": "rate limited"})
+        if fault.error_rate and self._rng.random() < fault.error_rate:
+            return httpx.Response(500, json={"error": "injected"})
+
+        if host == "api.coingecko.com":
+            return self._coingecko(request)
+        if host == "api.binance.com":
+            return self._binance(request)
+        if host == "api.exchange.coinbase.com":
+            return self._coinbase(request)
+        if host == "gamma-api.polymarket.com":
+            return self._gamma(request)
+        if host == "clob.polymarket.com":
+            return httpx.Response(200, json={"success": True, "orderID": f"fake-{int(time.time() * 1000)}"})
+        return httpx.Response(404)
+
+    def _coingecko(self, request: httpx.Request) -> httpx.Response:
+        ids = request.url.params.get("ids", "").split(",")
+        return httpx.Response(
+            200,
+            json={coin: {"usd": SPOT_BY_COINGECKO_ID.get(coin, 100.0), "usd_24h_change": 1.5} for coin in ids if coin},
+        )
+
+    def _binance(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/v3/klines":
+            return self._klines(request)
+        symbols = json.loads(request.url.params.get("symbols", "[]"))
+        return httpx.Response(200, json=[{"symbol": s, "price": str(SPOT_BY_BINANCE_SYMBOL.get(s, 100.0))} for s in symbols])
+
+    def _klines(self, request: httpx.Request) -> httpx.Response:
+        symbol = request.url.params.get("symbol", "")
+        start_ms = -(-int(request.url.params.get("startTime", 0)) // 60_000) * 60_000
+        limit = int(request.url.params.get("limit", 500))
+        base = SPOT_BY_BINANCE_SYMBOL.get(symbol, 100.0)
+        now_ms = int(time.time() * 1000)
+        rows = []
+        for i in range(limit):
+            open_ms = start_ms + i * 60_000
+            if open_ms > now_ms:
+                break
+            # closes determinísticos por minuto, para o cache poder ser comparado entre requests
+            close = base * (1 + 0.001 * (((open_ms // 60_000) % 17) - 8) / 8)
+            rows.append([open_ms, str(close), str(close), str(close), str(close), "1", open_ms + 59_999])
+        return httpx.Response(200, json=rows)
+
+    def _coinbase(self, request: httpx.Request) -> httpx.Response:
+        product = request.url.path.split("/")[2]
+        symbol = product.replace("-USD", "USDT")
+        return httpx.Response(200, json={"price": str(SPOT_BY_BINANCE_SYMBOL.get(symbol, 1.0))})
+
+    def _gamma(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        slugs = request.url.params.get_list("slug")
+        if path == "/events" and slugs:
+            market = self.market_for_slug(slugs[0])
+            return httpx.Response(200, json=[{"slug": slugs[0], "markets": [market]}] if market else [])
+        if path == "/markets" and slugs:
+            return httpx.Response(200, json=[market for market in map(self.market_for_slug, slugs) if market])
+        if path == "/markets":
+            return httpx.Response(200, json=[])
+        if path.startswith("/markets/"):
+            market = self.market_for_slug(path.rsplit("/", 1)[1])
+            return httpx.Response(200, json=market) if market else httpx.Response(404)
+        return httpx.Response(404)
+
+    def market_for_slug(self, slug: str) -> dict | None:
+        match = _WINDOW_SLUG.match(slug)
+        if not match or match.group("window") not in WINDOW_LENGTHS:
+            return None
+        window_ts = int(match.group("ts"))
+        end_ts = window_ts + WINDOW_LENGTHS[match.group("window")]
+        closed = end_ts <= time.time()
+        return {
+            "id": slug,
+            "slug": slug,
+            "question": f"{match.group('asset')} up or down 15m",
+            "outcomePrices": json.dumps([str(self.yes_odds), str(round(1 - self.yes_odds, 4))]),
+            "clobTokenIds": json.dumps([f"{slug}-yes", f"{slug}-no"]),
+            "endDate": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(end_ts)),
+            "priceToBeat": 100.0,
+            "finalPrice": 101.0 if closed else None,
+        }
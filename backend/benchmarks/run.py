@@ -0,0 +1,510 @@
+"""Suite de benchmarks do pipeline de tick.
+
+Uso (a partir de `backend/`):
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output bench.json --compare baseline.json --threshold 0.15
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.markets import DEFAULT_MARKETS, MarketRegistry, MarketSpec
+from app.models.entities import ApiMode, Asset, Direction, Indicator, ShadowStrategyConfig, StrategyConfig, Trade
+from app.models.records import SignalRecord, SnapshotRecord, TradeRecord
+from app.services import engine_snapshot
+from app.services.bot_engine import BotEngine
+from app.services.decision_log import DecisionLog, Outcome
+from app.services.gamma_parser import JSON_BACKEND, GammaParser
+from app.services.indicator_service import MAX_HISTORY, IndicatorService, build_indicator_service
+from app.services.order_client import ClobOrderClient, build_template
+from app.services.polymarket_service import MarketData, PolymarketService
+from app.services.price_service import PriceService
+from app.services.rate_limiter import RateLimitScheduler
+from app.services.streaming_indicators import STREAMING_INDICATORS
+from app.services.trade_executor import TradeExecutor
+from benchmarks.fakes import FakeUpstreams, FaultProfile
+
+# métricas em que valor maior é melhor; todas as outras são "menor é melhor"
+HIGHER_IS_BETTER = {"ticks_per_second"}
+
+
+class ScaledRetryPolymarketService(PolymarketService):
+    """Encurta o backoff de retry da Gamma para o benchmark não dormir segundos reais."""
+
+    def __init__(self, *args, retry_delay_scale: float = 0.001, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._retry_delay_scale = retry_delay_scale
+
+    async def _sleep(self, seconds: int) -> None:
+        await asyncio.sleep(seconds * self._retry_delay_scale)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary_ms(samples: list[float]) -> dict:
+    return {
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p50_ms": round(_percentile(samples, 50), 4),
+        "p95_ms": round(_percentile(samples, 95), 4),
+        "p99_ms": round(_percentile(samples, 99), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def _time_call(fn: Callable[[], object], number: int, repeat: int = 5) -> dict:
+    """Melhor e mediana de `repeat` rodadas, em µs por chamada."""
+    per_call: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_call.append((time.perf_counter() - start) / number * 1e6)
+    return {"best_us": round(min(per_call), 3), "median_us": round(statistics.median(per_call), 3), "number": number}
+
+
+def build_registry(asset_count: int) -> MarketRegistry:
+    """Registry com BTC/ETH/SOL + ativos sintéticos, alternando janelas 5m/15m/1h."""
+    entries = list(DEFAULT_MARKETS)[:asset_count]
+    windows = ("15m", "5m", "1h")
+    for i in range(len(entries), asset_count):
+        entries.append({"symbol": f"SYN{i:04d}", "window": windows[i % len(windows)]})
+    return MarketRegistry([MarketSpec.from_dict(entry) for entry in entries])
+
+
+def build_engine(
+    upstreams: FakeUpstreams,
+    workdir: Path,
+    retry_delay_scale: float = 0.001,
+    asset_count: int = 3,
+    rate_limits: bool = False,
+    shadow_strategies: int = 0,
+) -> BotEngine:
+    registry = build_registry(asset_count)
+    # ticks back-to-back estourariam os limites reais; por padrão o benchmark mede o pipeline sem eles
+    limiter = RateLimitScheduler.from_settings(settings) if rate_limits else RateLimitScheduler()
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client(), registry=registry, limiter=limiter),
+        poly_service=ScaledRetryPolymarketService(
+            client=upstreams.client(), registry=registry, limiter=limiter, retry_delay_scale=retry_delay_scale
+        ),
+        action_log_path=workdir / "window_actions.log",
+        registry=registry,
+    )
+    engine.strategy_config = StrategyConfig(enabled_assets=registry.symbols, late_entry_seconds=900, entry_probability_threshold=0.85)
+    indicator_sets = ([], [Indicator.MACD], [Indicator.TREND], [Indicator.MACD, Indicator.TREND, Indicator.POLY_PRICE])
+    engine.update_shadow_strategies(
+        [
+            ShadowStrategyConfig(
+                name=f"shadow{i}",
+                enabled_indicators=indicator_sets[i % len(indicator_sets)],
+                late_entry_seconds=900,
+                entry_probability_threshold=0.8 + 0.01 * (i % 10),
+            )
+            for i in range(shadow_strategies)
+        ]
+    )
+    return engine
+
+
+async def bench_tick_pipeline(args: argparse.Namespace) -> dict:
+    fault = FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    upstreams = FakeUpstreams(default_fault=fault, seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(
+            upstreams, Path(tmp), asset_count=args.assets, rate_limits=args.rate_limits, shadow_strategies=args.shadow_strategies
+        )
+        samples: list[float] = []
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            tick_start = time.perf_counter()
+            await engine.tick()
+            samples.append((time.perf_counter() - tick_start) * 1000)
+        elapsed = time.perf_counter() - started
+        gamma = engine.poly_service.gamma.stats()
+        allocations = await _tick_allocations(engine, ticks=min(args.ticks, 20))
+        await engine.shutdown()
+
+    return {
+        **_summary_ms(samples),
+        "ticks": args.ticks,
+        "assets": args.assets,
+        "shadow_strategies": args.shadow_strategies,
+        "ticks_per_second": round(args.ticks / elapsed, 3) if elapsed else 0.0,
+        "requests_per_tick": round(sum(upstreams.requests_by_host.values()) / args.ticks, 3),
+        "rate_limited": {
+            host: {p: s["dropped"] for p, s in info["by_priority"].items() if s["dropped"]}
+            for host, info in engine.rate_limiter.snapshot()["hosts"].items()
+            if any(s["dropped"] for s in info["by_priority"].values())
+        },
+        "fault": fault.__dict__,
+        "gamma_parse": {
+            "json_backend": gamma["json_backend"],
+            "decode_us_per_tick": round(gamma["decode_us"] / args.ticks, 3),
+            "parse_us_per_tick": round(gamma["parse_us"] / args.ticks, 3),
+        },
+        "allocations": allocations,
+    }
+
+
+async def _tick_allocations(engine: BotEngine, ticks: int) -> dict:
+    """Pico de memória alocada e blocos retidos por tick, medidos fora da amostra de latência."""
+    peaks: list[int] = []
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            await engine.tick()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kb_per_tick": round(statistics.fmean(peaks) / 1024, 3) if peaks else 0.0,
+        "retained_blocks_per_tick": round((sys.getallocatedblocks() - blocks_before) / max(ticks, 1), 1),
+    }
+
+
+def bench_indicators() -> dict:
+    service = IndicatorService()
+    for i in range(300):
+        service.push_price("BTC", 100 + (i % 17) - (i % 5) * 0.3)
+    streaming = IndicatorService()
+    streaming.require(STREAMING_INDICATORS)
+    for i in range(300):
+        streaming.push_price("BTC", 100 + (i % 17) - (i % 5) * 0.3)
+    return {
+        "macd_bias": _time_call(lambda: service.macd_bias("BTC"), number=20),
+        "trend_bias": _time_call(lambda: service.trend_bias("BTC"), number=2000),
+        # push com todos os indicadores streaming ligados (grafo completo) e leitura de um viés
+        "streaming_push_all": _time_call(lambda: streaming.push_price("BTC", 101.0), number=2000),
+        "streaming_bias": _time_call(lambda: streaming.stream_bias("BTC", Indicator.RSI), number=2000),
+    }
+
+
+def bench_indicator_backends(sizes: list[int]) -> dict:
+    """Custo por tick (push de um preço por ativo + MACD/TREND de todos) no caminho escalar e no lote NumPy."""
+    try:
+        batch_factory = lambda: build_indicator_service("numpy")  # noqa: E731
+        batch_factory()
+    except ImportError:
+        batch_factory = None
+    result: dict = {"numpy_available": batch_factory is not None}
+    for size in sizes:
+        assets = [f"A{i:04d}" for i in range(size)]
+        history = [100 + (i % 17) - (i % 5) * 0.3 for i in range(MAX_HISTORY)]
+        entry: dict = {}
+        for name, factory in (("python", IndicatorService), ("numpy", batch_factory)):
+            if factory is None:
+                continue
+            service = factory()
+            for asset in assets:
+                service.seed(asset, history)
+            step = iter(range(10**9))
+
+            def tick() -> None:
+                i = next(step)
+                service.push_prices({asset: 100 + (i % 13) * 0.1 for asset in assets})
+                for asset in assets:
+                    service.macd_bias(asset)
+                    service.trend_bias(asset)
+
+            # o caminho escalar é O(n²) por ativo: com muitos ativos, uma rodada basta
+            slow = name == "python" and size > 50
+            entry[name] = _time_call(tick, number=1 if slow else 5, repeat=1 if slow else 5)
+        result[f"assets_{size}"] = entry
+    return result
+
+
+def bench_gamma_parse(markets: int = 3) -> dict:
+    """Decodificação do corpo de `/markets?slug=...` e extração dos campos: caminho genérico vs parser por formato."""
+    upstreams = FakeUpstreams()
+    payload = [upstreams.market_for_slug(f"a{i}-updown-15m-{1700000100 + i * 900}") for i in range(markets)]
+    body = json.dumps(payload).encode()
+    parser = GammaParser()
+    market = payload[0]
+
+    def generic() -> None:
+        PolymarketService._extract_yes_from_gamma_payload(market)
+        PolymarketService._extract_market_end_ts(market)
+        PolymarketService._extract_float(market, ["priceToBeat", "strikePrice", "targetPrice"])
+        PolymarketService._extract_float(market, ["finalPrice", "outcomePrice", "settlementPrice"])
+        PolymarketService._extract_yes_no_tokens(market)
+
+    return {
+        "json_backend": JSON_BACKEND,
+        "decode_json": _time_call(lambda: json.loads(body), number=2000),
+        "decode": _time_call(lambda: parser.decode(body), number=2000),
+        "extract_generic": _time_call(generic, number=5000),
+        "extract_compiled": _time_call(lambda: parser.parse(market), number=5000),
+    }
+
+
+def bench_decision_log() -> dict:
+    """Custo de registrar uma decisão (toda decisão de todo ativo em todo tick passa por aqui) e de consultar."""
+    log = DecisionLog(capacity=512)
+    for i in range(1024):
+        log.record("BTC", 1000.0 + i, i, Outcome.WAIT_WINDOW_OR_PROB, window_ts=i // 90, remaining_seconds=60, probability=0.8)
+
+    def record() -> None:
+        log.record("BTC", 2000.0, 1, Outcome.WAIT_WINDOW_OR_PROB, window_ts=1, remaining_seconds=60, probability=0.8, direction=Direction.UP)
+
+    return {
+        "record": _time_call(record, number=5000),
+        "query_window": _time_call(lambda: log.query("BTC", window_ts=5), number=50),
+    }
+
+
+async def bench_order_path(orders: int = 200) -> dict:
+    """Decisão→ack no caminho REAL contra o CLOB fake: template pronto vs montado na hora."""
+
+    def market(i: int) -> MarketData:
+        return MarketData(
+            asset="BTC", window_ts=900 * i, market_id=f"m{i}", market_slug=f"s{i}", yes_odds=0.91, no_odds=0.09,
+            odds_source="GAMMA_API", odds_live=True, resolver_source="DIRECT", yes_token_id=f"y{i}", no_token_id=f"n{i}",
+        )
+
+    result: dict = {}
+    for mode in ("prepared", "cold"):
+        # sem rate limit: mede o caminho da ordem, não a cadência do bucket do CLOB
+        client = ClobOrderClient(client=FakeUpstreams().client(), limiter=RateLimitScheduler())
+        samples = []
+        for i in range(orders):
+            data = market(i)
+            if mode == "prepared":
+                client.prepare(data)
+            ack = await client.fire(data, Direction.UP, 20.0, time.perf_counter())
+            samples.append(ack.latency_ms)
+        await client.close()
+        result[mode] = _summary_ms(samples)
+    template = build_template(market(1), Direction.UP, 0.0)
+    result["body_from_template"] = _time_call(lambda: template.body(0.91, 20.0), number=5000)
+    result["body_from_scratch"] = _time_call(lambda: build_template(market(1), Direction.UP, 0.0).body(0.91, 20.0), number=5000)
+    return result
+
+
+def _open_book(size: int, closes_at: datetime) -> TradeExecutor:
+    executor = TradeExecutor()
+    for i in range(size):
+        asset = (Asset.BTC, Asset.ETH, Asset.SOL)[i % 3]
+        snapshot = SnapshotRecord(asset=asset, spot_price=100.0, price_to_beat=100.0)
+        signal = SignalRecord(asset=asset, direction=Direction.UP if i % 2 else Direction.DOWN, confidence=0.9, reason="bench")
+        executor.open_trade(snapshot, signal, ApiMode.CLOB, closes_at=closes_at, stop_loss_pct=0.2)
+    return executor
+
+
+def bench_settlement(sizes: list[int]) -> dict:
+    latest = {asset: SnapshotRecord(asset=asset, spot_price=100.5, price_to_beat=100.0, final_price=101.0) for asset in Asset}
+    result: dict = {}
+    for size in sizes:
+        pending = _open_book(size, datetime.utcnow() + timedelta(hours=1))
+        scan = _time_call(lambda: pending.settle_due_trades(latest), number=5)
+
+        due_samples: list[float] = []
+        for _ in range(3):
+            due = _open_book(size, datetime.utcnow() - timedelta(seconds=1))
+            start = time.perf_counter()
+            due.settle_due_trades(latest)
+            due_samples.append((time.perf_counter() - start) * 1000)
+        result[f"open_{size}"] = {"scan_pending": scan, "settle_all_due_ms": round(min(due_samples), 4)}
+    return result
+
+
+def _trade_kwargs(i: int, closes_at: datetime) -> dict:
+    return {
+        "id": f"trade-{i}",
+        "asset": "BTC",
+        "direction": Direction.UP,
+        "entry_price": 0.9,
+        "confidence": 0.9,
+        "api_mode": ApiMode.CLOB,
+        "closes_at": closes_at,
+        "market_id": "bench",
+        "window_ts": 1_700_000_000,
+        "price_to_beat": 100.0,
+    }
+
+
+def bench_trade_memory(count: int = 2000) -> dict:
+    """Bytes e tempo por trade: dataclass com slots (caminho quente) vs modelo pydantic (fronteira HTTP)."""
+    closes_at = datetime.utcnow()
+    kwargs = [_trade_kwargs(i, closes_at) for i in range(count)]
+    result: dict = {}
+    for name, factory in (("record", TradeRecord), ("pydantic", Trade)):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        trades = [factory(**kw) for kw in kwargs]
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result[name] = {
+            "bytes_per_trade": round((after - before) / count, 1),
+            "create": _time_call(lambda: [factory(**kw) for kw in kwargs[:200]], number=5),
+        }
+        del trades
+    record = TradeRecord(**kwargs[0])
+    result["record_as_dict"] = _time_call(record.as_dict, number=2000)
+    result["record_to_model"] = _time_call(record.to_model, number=2000)
+    return result
+
+
+def _populated_engine(workdir: Path) -> BotEngine:
+    engine = BotEngine(action_log_path=workdir / "window_actions.log")
+    now = datetime.utcnow()
+    for asset in Asset:
+        engine.latest_snapshots[asset] = SnapshotRecord(asset=asset, spot_price=100.0, yes_odds=0.8, no_odds=0.2)
+        for i in range(300):
+            engine.indicator_service.push_price(asset, 100 + (i % 17) * 0.1)
+    settled = _open_book(200, now - timedelta(seconds=1))
+    settled.settle_due_trades(engine.latest_snapshots)
+    engine.trade_executor.closed_trades = settled.closed_trades
+    engine.trade_executor.open_trades = _open_book(50, now + timedelta(hours=1)).open_trades
+    return engine
+
+
+def bench_state_serialization() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _populated_engine(Path(tmp))
+
+        def serialize() -> bytes:
+            return json.dumps(jsonable_encoder(engine.state_payload())).encode()
+
+        timing = _time_call(serialize, number=20)
+        timing["payload_bytes"] = len(serialize())
+        asyncio.run(engine.shutdown())
+    return timing
+
+
+def bench_snapshot() -> dict:
+    """Custo do snapshot de estado: captura (no event loop), encode+compressão e escrita atômica (em thread)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _populated_engine(Path(tmp))
+        state = engine_snapshot.capture(engine)
+        data = engine_snapshot.encode(state)
+        path = Path(tmp) / "engine_state.bin"
+        result = {
+            "capture": _time_call(lambda: engine_snapshot.capture(engine), number=20),
+            "encode": _time_call(lambda: engine_snapshot.encode(state), number=10),
+            "write_atomic": _time_call(lambda: engine_snapshot.write_atomic(path, data), number=5),
+            "restore": _time_call(lambda: engine_snapshot.apply(engine, engine_snapshot.decode(data)), number=10),
+            "snapshot_bytes": len(data),
+        }
+        asyncio.run(engine.shutdown())
+    return result
+
+
+def run_all(args: argparse.Namespace) -> dict:
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {
+            "tick_pipeline": asyncio.run(bench_tick_pipeline(args)),
+            "indicators": bench_indicators(),
+            "indicator_backends": bench_indicator_backends(args.indicator_assets),
+            "settlement": bench_settlement(args.book_sizes),
+            "state_serialization": bench_state_serialization(),
+            "snapshot": bench_snapshot(),
+            "trade_memory": bench_trade_memory(),
+            "decision_log": bench_decision_log(),
+            "gamma_parse": bench_gamma_parse(),
+            "order_path": asyncio.run(bench_order_path()),
+        },
+    }
+
+
+def _flatten(prefix: str, value: object, out: dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, inner, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Compara métricas de tempo/throughput; retorna as que regrediram além do threshold."""
+    cur: dict[str, float] = {}
+    base: dict[str, float] = {}
+    _flatten("", current["results"], cur)
+    _flatten("", baseline["results"], base)
+    regressions: list[dict] = []
+    for key, value in cur.items():
+        metric = key.rsplit(".", 1)[-1]
+        if key not in base or base[key] <= 0:
+            continue
+        if not (metric.endswith("_ms") or metric.endswith("_us") or metric in HIGHER_IS_BETTER):
+            continue
+        ratio = value / base[key]
+        regressed = ratio < 1 - threshold if metric in HIGHER_IS_BETTER else ratio > 1 + threshold
+        if regressed:
+            regressions.append({"metric": key, "baseline": base[key], "current": value, "ratio": round(ratio, 3)})
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="arquivo JSON de saída (default: stdout)")
+    parser.add_argument("--compare", type=Path, help="JSON de baseline para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=0.15, help="tolerância relativa de regressão")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--assets", type=int, default=3, help="ativos no registry do benchmark de tick")
+    parser.add_argument("--shadow-strategies", type=int, default=0, help="estratégias sombra avaliadas em cada tick")
+    parser.add_argument("--rate-limits", action="store_true", help="aplica os RATE_LIMITS da config no benchmark de tick")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--indicator-assets", type=int, nargs="+", default=[3, 50, 500], help="ativos no benchmark dos backends de indicador")
+    parser.add_argument("--book-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    report = run_all(args)
+    exit_code = 0
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": str(args.compare), "threshold": args.threshold, "regressions": regressions}
+        exit_code = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if exit_code:
+        print(f"{len(report['comparison']['regressions'])} regressão(ões) acima de {args.threshold:.0%}", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
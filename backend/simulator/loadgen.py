@@ -0,0 +1,211 @@
+"""Gerador de carga para soak test: bot + simulador + N clientes de dashboard.
+
+Sobe o simulador e o backend como subprocessos (uvicorn), aponta o backend para o simulador
+via *_BASE_URL, liga o bot e dispara clientes que fazem polling de `/api/state`.
+Mede latência da API (p50/p95/p99), latência de tick (via `/api/debug/ticks`) e RSS do backend.
+
+Uso (a partir de `backend/`):
+    python -m simulator.loadgen --duration 3600 --clients 300 --output soak.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _latency_summary(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3) if samples else 0.0,
+    }
+
+
+def _rss_kb(pid: int) -> int | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _spawn(app: str, port: int, env: dict[str, str], cwd: str, workers: int = 1) -> subprocess.Popen:
+    extra = ["--workers", str(workers)] if workers > 1 else []
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--app-dir", str(BACKEND_DIR), "--port", str(port), "--log-level", "warning", *extra],
+        cwd=cwd,
+        env={**os.environ, **env},
+    )
+
+
+def _spawn_engine_worker(env: dict[str, str], cwd: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.engine_worker"],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR), **env},
+    )
+
+
+async def _wait_ready(client: httpx.AsyncClient, url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(url)).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"serviço não respondeu em {timeout}s: {url}")
+
+
+async def _dashboard_client(client: httpx.AsyncClient, url: str, interval: float, stop_at: float, samples: list[float], errors: list[int]) -> None:
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def _monitor(client: httpx.AsyncClient, api: str, pid: int, interval: float, stop_at: float, report: dict) -> None:
+    seen_ticks: dict[int, float] = {}
+    while time.monotonic() < stop_at:
+        rss = _rss_kb(pid)
+        if rss is not None:
+            report["rss_kb"].append({"t": round(time.monotonic() - report["_started"], 1), "rss_kb": rss})
+        try:
+            payload = (await client.get(f"{api}/api/debug/ticks")).json()
+            for trace in payload.get("ticks", []):
+                if trace.get("duration_ms") is not None:
+                    seen_ticks.setdefault(trace["tick"], trace["duration_ms"])
+        except (httpx.HTTPError, ValueError):
+            pass
+        report["tick_ms"] = list(seen_ticks.values())
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    sim_url = f"http://127.0.0.1:{args.sim_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    workdir = tempfile.mkdtemp(prefix="soak-")
+    sim_env = {"SIM_SEED": str(args.seed)}
+    if args.scenario:
+        sim_env["SIM_SCENARIO"] = str(Path(args.scenario).resolve())
+    api_env = {
+        "GAMMA_BASE_URL": f"{sim_url}/gamma",
+        "CLOB_BASE_URL": f"{sim_url}/clob",
+        "COINGECKO_BASE_URL": f"{sim_url}/coingecko",
+        "BINANCE_BASE_URL": f"{sim_url}/binance",
+        "COINBASE_BASE_URL": f"{sim_url}/coinbase",
+        "POLL_INTERVAL_SECONDS": str(args.poll_interval),
+        "TRACE_BUFFER_SIZE": "200",
+    }
+
+    simulator = _spawn("simulator.server:app", args.sim_port, sim_env, workdir)
+    engine_worker = None
+    if args.api_workers:
+        # engine em processo próprio e N workers de API stateless falando com ele pelo socket
+        api_env.update({"ENGINE_MODE": "remote", "ENGINE_SOCKET_PATH": str(Path(workdir) / "engine.sock")})
+        engine_worker = _spawn_engine_worker(api_env, workdir)
+    backend = _spawn("app.main:app", args.api_port, api_env, workdir, workers=args.api_workers or 1)
+    engine_pid = engine_worker.pid if engine_worker else backend.pid
+    report: dict = {"rss_kb": [], "tick_ms": [], "_started": time.monotonic()}
+    try:
+        limits = httpx.Limits(max_connections=args.clients + 10)
+        async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+            await _wait_ready(client, f"{sim_url}/__sim/state")
+            await _wait_ready(client, f"{api_url}/api/health")
+            await client.post(f"{api_url}/api/bot/start")
+
+            stop_at = time.monotonic() + args.duration
+            samples: list[float] = []
+            errors: list[int] = []
+            clients = [
+                _dashboard_client(client, f"{api_url}/api/state", args.client_interval, stop_at, samples, errors)
+                for _ in range(args.clients)
+            ]
+            await asyncio.gather(_monitor(client, api_url, engine_pid, args.sample_interval, stop_at, report), *clients)
+
+            sim_state = (await client.get(f"{sim_url}/__sim/state")).json()
+            await client.post(f"{api_url}/api/bot/stop")
+    finally:
+        for proc in (backend, engine_worker, simulator):
+            if proc is None:
+                continue
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    rss = [point["rss_kb"] for point in report["rss_kb"]]
+    return {
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items() if k != "output"},
+        "api_state": {**_latency_summary(samples), "errors": len(errors), "requests_per_second": round(len(samples) / args.duration, 2)},
+        "tick": _latency_summary(report["tick_ms"]),
+        "memory": {
+            "rss_start_kb": rss[0] if rss else None,
+            "rss_end_kb": rss[-1] if rss else None,
+            "rss_max_kb": max(rss) if rss else None,
+            "rss_growth_kb": (rss[-1] - rss[0]) if rss else None,
+            "samples": report["rss_kb"],
+        },
+        "simulator": sim_state,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=60.0, help="segundos de soak")
+    parser.add_argument("--clients", type=int, default=200, help="clientes de dashboard simulados")
+    parser.add_argument("--client-interval", type=float, default=1.0, help="intervalo de polling de cada cliente")
+    parser.add_argument("--poll-interval", type=int, default=3, help="POLL_INTERVAL_SECONDS do bot")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="intervalo de amostragem de RSS/ticks")
+    parser.add_argument("--scenario", type=Path, help="cenário JSON de latência/outage do simulador")
+    parser.add_argument("--api-workers", type=int, default=0, help="N>0: engine worker separado + N workers de API (ENGINE_MODE=remote)")
+    parser.add_argument("--sim-port", type=int, default=9000)
+    parser.add_argument("--api-port", type=int, default=8010)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.core import clock
+from app.core.markets import WINDOW_LENGTHS
+
+# todas as janelas (5m/15m/1h) são múltiplas deste grid; o spot é registrado em cada fronteira
+GRID_SECONDS = min(WINDOW_LENGTHS.values())
+WINDOW_SECONDS = WINDOW_LENGTHS["15m"]
+
+_WINDOW_SLUG = re.compile(r"^(?P<asset>[a-z0-9]+)-updown-(?P<window>\d+[mh])-(?P<ts>\d+)$")
+
+DEFAULT_ASSETS = {
+    # símbolo: (coingecko id, binance symbol, coinbase product, spot inicial, vol por segundo)
+    "BTC": ("bitcoin", "BTCUSDT", "BTC-USD", 68000.0, 0.00012),
+    "ETH": ("ethereum", "ETHUSDT", "ETH-USD", 3500.0, 0.00016),
+    "SOL": ("solana", "SOLUSDT", "SOL-USD", 150.0, 0.00025),
+}
+
+
+@dataclass
+class AssetState:
+    symbol: str
+    coingecko_id: str
+    binance_symbol: str
+    coinbase_product: str
+    spot: float
+    vol_per_second: float
+    updated_at: float
+    boundary_spot: "OrderedDict[int, float]" = field(default_factory=OrderedDict)
+
+
+class SyntheticMarkets:
+    """Mercados UP/DOWN sintéticos: spot em random walk, janelas 5m/15m/1h com odds e liquidação."""
+
+    def __init__(self, assets: dict[str, tuple] | None = None, seed: int = 42, keep_boundaries: int = 2000) -> None:
+        self._rng = random.Random(seed)
+        self._keep_boundaries = keep_boundaries
+        now = self.now()
+        self.assets: dict[str, AssetState] = {
+            symbol: AssetState(symbol, cg, bn, cb, spot, vol, now)
+            for symbol, (cg, bn, cb, spot, vol) in (assets or DEFAULT_ASSETS).items()
+        }
+        for state in self.assets.values():
+            state.boundary_spot[self.window_ts(now, GRID_SECONDS)] = state.spot
+        self._by_coingecko_id = {s.coingecko_id: s for s in self.assets.values()}
+        self._by_binance_symbol = {s.binance_symbol: s for s in self.assets.values()}
+        self._by_coinbase_product = {s.coinbase_product: s for s in self.assets.values()}
+
+    def now(self) -> float:
+        return clock.now()
+
+    @staticmethod
+    def window_ts(ts: float, window_seconds: int = WINDOW_SECONDS) -> int:
+        return int(ts // window_seconds) * window_seconds
+
+    def advance(self) -> None:
+        """Avança o random walk até agora, registrando o spot em cada fronteira do grid."""
+        now = self.now()
+        for state in self.assets.values():
+            while state.updated_at < now:
+                boundary = self.window_ts(state.updated_at, GRID_SECONDS) + GRID_SECONDS
+                step_to = min(now, boundary)
+                dt = step_to - state.updated_at
+                if dt > 0:
+                    state.spot *= math.exp(self._rng.gauss(0.0, state.vol_per_second * math.sqrt(dt)))
+                state.updated_at = step_to
+                if step_to == boundary:
+                    state.boundary_spot[boundary] = state.spot
+                    while len(state.boundary_spot) > self._keep_boundaries:
+                        state.boundary_spot.popitem(last=False)
+
+    def by_coingecko_id(self, coin: str) -> AssetState | None:
+        return self._by_coingecko_id.get(coin)
+
+    def by_binance_symbol(self, symbol: str) -> AssetState | None:
+        return self._by_binance_symbol.get(symbol)
+
+    def by_coinbase_product(self, product: str) -> AssetState | None:
+        return self._by_coinbase_product.get(product)
+
+    def yes_odds(self, state: AssetState, window_ts: int, window_seconds: int = WINDOW_SECONDS) -> float:
+        """Probabilidade de UP: distância até o price_to_beat normalizada pela vol restante."""
+        now = self.now()
+        price_to_beat = state.boundary_spot.get(window_ts)
+        final_price = state.boundary_spot.get(window_ts + window_seconds)
+        if price_to_beat is not None and final_price is not None:
+            return 0.99 if final_price > price_to_beat else 0.01
+        if price_to_beat is None or now < window_ts:
+            return 0.5
+        remaining = max(1.0, window_ts + window_seconds - now)
+        z = math.log(state.spot / price_to_beat) / (state.vol_per_second * math.sqrt(remaining))
+        prob = 0.5 * (1 + math.erf(z / math.sqrt(2)))
+        return round(min(max(prob, 0.01), 0.99), 3)
+
+    def market_for_slug(self, slug: str) -> dict | None:
+        match = _WINDOW_SLUG.match(slug)
+        if not match or match.group("window") not in WINDOW_LENGTHS:
+            return None
+        window_seconds = WINDOW_LENGTHS[match.group("window")]
+        state = self.assets.get(match.group("asset").upper())
+        window_ts = int(match.group("ts"))
+        if state is None or window_ts % window_seconds or window_ts > self.window_ts(self.now(), window_seconds) + window_seconds:
+            return None
+        self.advance()
+        yes = self.yes_odds(state, window_ts, window_seconds)
+        end_ts = window_ts + window_seconds
+        final_price = state.boundary_spot.get(end_ts)
+        return {
+            "id": slug,
+            "slug": slug,
+            "question": f"{state.symbol} Up or Down {match.group('window')} {window_ts}",
+            "outcomePrices": json.dumps([f"{yes:.3f}", f"{1 - yes:.3f}"]),
+            "clobTokenIds": json.dumps([f"{slug}-yes", f"{slug}-no"]),
+            "endDate": datetime.fromtimestamp(end_ts, tz=timezone.utc).isoformat().replace("+00:00", "Z"),
+            "priceToBeat": state.boundary_spot.get(window_ts),
+            "finalPrice": final_price,
+            "closed": final_price is not None,
+        }
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        terms = query.lower().split()
+        window = next((t for t in terms if t in WINDOW_LENGTHS), "15m")
+        window_ts = next((int(t) for t in terms if t.isdigit()), self.window_ts(self.now(), WINDOW_LENGTHS[window]))
+        found = []
+        for state in self.assets.values():
+            if state.symbol.lower() in terms:
+                market = self.market_for_slug(f"{state.symbol.lower()}-updown-{window}-{window_ts}")
+                if market:
+                    found.append(market)
+        return found[:limit]
+
+    def klines(self, state: AssetState, start_ms: int, limit: int, interval_seconds: int = 60) -> list[list]:
+        """Candles sintéticos determinísticos (por ativo e minuto) que terminam no spot atual."""
+        self.advance()
+        now_ms = int(self.now() * 1000)
+        step_ms = interval_seconds * 1000
+        first_ms = -(-start_ms // step_ms) * step_ms  # como a Binance: primeiro candle com open_time >= startTime
+        rows: list[list] = []
+        for i in range(limit):
+            open_ms = first_ms + i * step_ms
+            if open_ms > now_ms:
+                break
+            rng = random.Random(f"{state.symbol}:{open_ms // step_ms}")
+            close = state.spot * math.exp(rng.gauss(0.0, state.vol_per_second * math.sqrt(interval_seconds)))
+            rows.append([open_ms, f"{close:.4f}", f"{close:.4f}", f"{close:.4f}", f"{close:.4f}", "0", open_ms + step_ms - 1])
+        return rows
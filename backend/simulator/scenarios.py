@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.core import clock
+
+UPSTREAMS = ("gamma", "clob", "coingecko", "binance", "coinbase")
+
+
+@dataclass
+class Phase:
+    """Trecho do cenário: a partir de `start_s` (relativo ao início) por `duration_s` segundos."""
+
+    start_s: float
+    duration_s: float
+    upstreams: list[str] = field(default_factory=lambda: list(UPSTREAMS))
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    outage: bool = False
+
+    def active(self, elapsed: float, upstream: str) -> bool:
+        return upstream in self.upstreams and self.start_s <= elapsed < self.start_s + self.duration_s
+
+
+@dataclass
+class Scenario:
+    name: str = "steady"
+    base_latency_ms: float = 0.0
+    phases: list[Phase] = field(default_factory=list)
+    loop_seconds: float | None = None
+    started_at: float = field(default_factory=clock.now)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "Scenario":
+        unknown = {u for p in payload.get("phases", []) for u in p.get("upstreams", [])} - set(UPSTREAMS)
+        if unknown:
+            raise ValueError(f"upstreams desconhecidos no cenário: {', '.join(sorted(unknown))}")
+        return cls(
+            name=str(payload.get("name", "custom")),
+            base_latency_ms=float(payload.get("base_latency_ms", 0.0)),
+            phases=[Phase(**phase) for phase in payload.get("phases", [])],
+            loop_seconds=payload.get("loop_seconds"),
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Scenario":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "base_latency_ms": self.base_latency_ms,
+            "loop_seconds": self.loop_seconds,
+            "elapsed_s": round(self.elapsed(), 3),
+            "phases": [phase.__dict__ for phase in self.phases],
+        }
+
+    def elapsed(self) -> float:
+        elapsed = clock.now() - self.started_at
+        if self.loop_seconds:
+            elapsed %= self.loop_seconds
+        return elapsed
+
+    def effective(self, upstream: str) -> Phase:
+        """Combina as fases ativas para o upstream (latências somam, taxas pegam o máximo)."""
+        elapsed = self.elapsed()
+        result = Phase(start_s=0, duration_s=0, upstreams=[upstream], latency_ms=self.base_latency_ms)
+        for phase in self.phases:
+            if not phase.active(elapsed, upstream):
+                continue
+            result.latency_ms += phase.latency_ms
+            result.error_rate = max(result.error_rate, phase.error_rate)
+            result.rate_limit_rate = max(result.rate_limit_rate, phase.rate_limit_rate)
+            result.outage = result.outage or phase.outage
+        return result
@@ -0,0 +1,164 @@
+"""Simulador local dos upstreams (Gamma, CLOB, CoinGecko, Binance, Coinbase).
+
+Cada upstream fica sob um prefixo; aponte o backend com:
+    GAMMA_BASE_URL=http://127.0.0.1:9000/gamma
+    CLOB_BASE_URL=http://127.0.0.1:9000/clob
+    COINGECKO_BASE_URL=http://127.0.0.1:9000/coingecko
+    BINANCE_BASE_URL=http://127.0.0.1:9000/binance
+    COINBASE_BASE_URL=http://127.0.0.1:9000/coinbase
+
+Rodar: uvicorn simulator.server:app --port 9000  (cenário via SIM_SCENARIO=arquivo.json)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+from typing import Any
+
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+
+from app.core import clock
+from simulator.market import SyntheticMarkets
+from simulator.scenarios import UPSTREAMS, Scenario
+
+
+class SimulatorState:
+    def __init__(self, scenario: Scenario | None = None, seed: int = 42) -> None:
+        self.markets = SyntheticMarkets(seed=seed)
+        self.scenario = scenario or Scenario()
+        self.requests_by_upstream: dict[str, int] = {u: 0 for u in UPSTREAMS}
+        self.faults_by_upstream: dict[str, int] = {u: 0 for u in UPSTREAMS}
+        self.orders: list[dict] = []
+        self._rng = random.Random(seed)
+
+
+def create_app(scenario: Scenario | None = None, seed: int = 42) -> FastAPI:
+    sim = SimulatorState(scenario, seed)
+    app = FastAPI(title="Polymarket Sniper - Upstream Simulator")
+    app.state.sim = sim
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        upstream = request.url.path.strip("/").split("/", 1)[0]
+        if upstream not in sim.requests_by_upstream:
+            return await call_next(request)
+        sim.requests_by_upstream[upstream] += 1
+        fault = sim.scenario.effective(upstream)
+        if fault.latency_ms > 0:
+            await asyncio.sleep(fault.latency_ms / 1000)
+        if fault.outage:
+            sim.faults_by_upstream[upstream] += 1
+            return JSONResponse({"error": "simulated outage"}, status_code=503)
+        if fault.rate_limit_rate and sim._rng.random() < fault.rate_limit_rate:
+            sim.faults_by_upstream[upstream] += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429)
+        if fault.error_rate and sim._rng.random() < fault.error_rate:
+            sim.faults_by_upstream[upstream] += 1
+            return JSONResponse({"error": "simulated error"}, status_code=500)
+        return await call_next(request)
+
+    gamma = APIRouter(prefix="/gamma")
+
+    @gamma.get("/events")
+    async def gamma_events(slug: str) -> list[dict]:
+        market = sim.markets.market_for_slug(slug)
+        return [{"slug": slug, "title": market["question"], "markets": [market]}] if market else []
+
+    @gamma.get("/markets")
+    async def gamma_markets(slug: list[str] = Query(default=[]), search: str | None = None, limit: int = 20) -> list[dict]:
+        if slug:
+            return [market for market in map(sim.markets.market_for_slug, slug) if market]
+        if search:
+            return sim.markets.search(search, limit)
+        return []
+
+    @gamma.get("/markets/{market_id}")
+    async def gamma_market(market_id: str) -> dict:
+        market = sim.markets.market_for_slug(market_id)
+        if market is None:
+            raise HTTPException(status_code=404, detail="market not found")
+        return market
+
+    clob = APIRouter(prefix="/clob")
+
+    @clob.get("/time")
+    async def clob_time() -> int:
+        return int(clock.now())
+
+    @clob.post("/order")
+    async def clob_order(payload: dict[str, Any]) -> dict:
+        if not payload.get("token_id"):
+            raise HTTPException(status_code=400, detail="token_id required")
+        order = {"orderID": f"sim-{len(sim.orders) + 1}", "received_at": clock.now(), **payload}
+        sim.orders.append(order)
+        del sim.orders[:-1000]
+        return {"success": True, "orderID": order["orderID"], "status": "matched"}
+
+    @app.get("/coingecko/api/v3/simple/price")
+    async def coingecko_price(ids: str, vs_currencies: str = "usd", include_24hr_change: bool = False) -> dict:
+        sim.markets.advance()
+        result: dict[str, dict] = {}
+        for coin in ids.split(","):
+            state = sim.markets.by_coingecko_id(coin)
+            if state is not None:
+                result[coin] = {"usd": round(state.spot, 4), "usd_24h_change": 0.0}
+        return result
+
+    @app.get("/binance/api/v3/ticker/price")
+    async def binance_price(symbols: str) -> list[dict]:
+        sim.markets.advance()
+        rows = []
+        for symbol in json.loads(symbols):
+            state = sim.markets.by_binance_symbol(symbol)
+            if state is not None:
+                rows.append({"symbol": symbol, "price": f"{state.spot:.4f}"})
+        return rows
+
+    @app.get("/binance/api/v3/klines")
+    async def binance_klines(symbol: str, interval: str = "1m", startTime: int = 0, limit: int = 500) -> list[list]:
+        state = sim.markets.by_binance_symbol(symbol)
+        if state is None or interval != "1m":
+            raise HTTPException(status_code=400, detail="invalid symbol or interval")
+        return sim.markets.klines(state, startTime, min(limit, 1000))
+
+    @app.get("/coinbase/products/{product}/ticker")
+    async def coinbase_ticker(product: str) -> dict:
+        sim.markets.advance()
+        state = sim.markets.by_coinbase_product(product)
+        if state is None:
+            raise HTTPException(status_code=404, detail="product not found")
+        return {"price": f"{state.spot:.4f}"}
+
+    @app.get("/__sim/state")
+    async def sim_state() -> dict:
+        sim.markets.advance()
+        return {
+            "scenario": sim.scenario.to_dict(),
+            "requests_by_upstream": sim.requests_by_upstream,
+            "faults_by_upstream": sim.faults_by_upstream,
+            "orders": len(sim.orders),
+            "spots": {s.symbol: s.spot for s in sim.markets.assets.values()},
+        }
+
+    @app.post("/__sim/scenario")
+    async def sim_scenario(payload: dict[str, Any]) -> dict:
+        try:
+            sim.scenario = Scenario.from_dict(payload)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"status": "updated", "scenario": sim.scenario.to_dict()}
+
+    app.include_router(gamma)
+    app.include_router(clob)
+    return app
+
+
+def _app_from_env() -> FastAPI:
+    path = os.getenv("SIM_SCENARIO")
+    return create_app(Scenario.load(path) if path else None, seed=int(os.getenv("SIM_SEED", "42")))
+
+
+app = _app_from_env()
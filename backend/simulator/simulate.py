@@ -0,0 +1,182 @@
+"""Simulação acelerada: o `_loop` real do engine contra o simulador, com relógio virtual.
+
+O simulador roda no mesmo processo (via `httpx.ASGITransport`) e o relógio de parede do
+engine e do simulador vira um `VirtualClock`: a espera entre ticks avança o tempo na hora,
+então um dia inteiro (96 janelas de 15m) roda em segundos/minutos, pelo mesmo código de
+decisão, entrada e liquidação. Serve como teste de regressão da lógica de tempo
+(`late_entry_seconds`, `switch_to_gamma_seconds`, virada de janela, liquidação).
+
+Uso (a partir de `backend/`):
+    python -m simulator.simulate --windows 96 --output day.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+from app.core import clock
+from app.core.clock import VirtualClock, use_clock
+from app.core.config import settings
+from app.core.markets import market_registry
+from app.models.entities import StrategyConfig
+from app.services.bot_engine import BotEngine
+from app.services.polymarket_service import PolymarketService
+from app.services.price_service import PriceService
+from simulator.market import WINDOW_SECONDS
+from simulator.scenarios import Scenario
+from simulator.server import create_app
+
+# início padrão: uma fronteira de janela fixa, para a simulação ser reproduzível
+DEFAULT_START_TS = 1_767_225_600
+SIM_BASE_URL = "http://simulator"
+
+
+@contextmanager
+def _override_settings(**values) -> Iterator[None]:
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def _entries(journal: Path) -> list[tuple[str, int, datetime]]:
+    """(ativo, window_ts, horário virtual) de cada ENTRY gravado no journal do engine."""
+    if not journal.exists():
+        return []
+    entries = []
+    for line in journal.read_text().splitlines():
+        action, asset, window_ts, _source, at = line.split("|")
+        if action == "ENTRY":
+            entries.append((asset, int(window_ts), datetime.fromisoformat(at)))
+    return entries
+
+
+def _timing_report(entries: list[tuple[str, int, datetime]], late_entry_seconds: int) -> dict:
+    remaining = []
+    for asset, window_ts, at in entries:
+        window_seconds = market_registry.get(asset).window_seconds
+        remaining.append(window_ts + window_seconds - (at - datetime(1970, 1, 1)).total_seconds())
+    per_window = Counter((asset, window_ts) for asset, window_ts, _at in entries)
+    return {
+        "entries": len(entries),
+        "windows_with_entry": len(per_window),
+        "duplicate_entries": sum(count - 1 for count in per_window.values()),
+        "entry_remaining_seconds": {
+            "min": round(min(remaining), 3) if remaining else None,
+            "max": round(max(remaining), 3) if remaining else None,
+        },
+        # entradas antes da zona de late entry: devem ser zero
+        "late_entry_violations": sum(1 for left in remaining if left > late_entry_seconds),
+    }
+
+
+async def simulate(
+    windows: int = 96,
+    poll_interval: int = 3,
+    start_ts: int = DEFAULT_START_TS,
+    seed: int = 42,
+    scenario: Scenario | None = None,
+    late_entry_seconds: int = 180,
+    workdir: Path | None = None,
+) -> dict:
+    workdir = workdir or Path(tempfile.mkdtemp(prefix="simulate-"))
+    span_seconds = windows * WINDOW_SECONDS
+    # meia janela a mais para as trades da última janela liquidarem
+    run_seconds = span_seconds + WINDOW_SECONDS // 2
+    virtual = VirtualClock(start_ts)
+    overrides = {
+        "gamma_base_url": f"{SIM_BASE_URL}/gamma",
+        "clob_base_url": f"{SIM_BASE_URL}/clob",
+        "coingecko_base_url": f"{SIM_BASE_URL}/coingecko",
+        "binance_base_url": f"{SIM_BASE_URL}/binance",
+        "coinbase_base_url": f"{SIM_BASE_URL}/coinbase",
+        "poll_interval_seconds": poll_interval,
+        "candle_cache_dir": str(workdir / "candles"),
+        "state_snapshot_interval_seconds": 0,
+        "decision_buffer_size": run_seconds // max(1, poll_interval) + 1,
+        "decision_spill_dir": "",
+    }
+    with use_clock(virtual), _override_settings(**overrides):
+        sim_app = create_app(scenario, seed)
+        transport = httpx.ASGITransport(app=sim_app)
+        engine = BotEngine(
+            price_service=PriceService(client=httpx.AsyncClient(transport=transport, timeout=10)),
+            poly_service=PolymarketService(client=httpx.AsyncClient(transport=transport, timeout=10)),
+            action_log_path=workdir / "window_actions.log",
+        )
+        symbols = [s for s in market_registry.symbols if s in sim_app.state.sim.markets.assets]
+        engine.strategy_config = StrategyConfig(enabled_assets=symbols, late_entry_seconds=late_entry_seconds)
+
+        started = time.perf_counter()
+        await engine.start()
+        await clock.sleep(run_seconds)
+        await engine.stop()
+        wall_seconds = time.perf_counter() - started
+
+        outcomes = Counter(event["outcome"] for event in engine.decision_log.query(limit=engine.decision_log.capacity * len(symbols)))
+        report = {
+            "config": {
+                "windows": windows,
+                "poll_interval_seconds": poll_interval,
+                "start_ts": start_ts,
+                "late_entry_seconds": late_entry_seconds,
+                "switch_to_gamma_seconds": settings.switch_to_gamma_seconds,
+                "assets": symbols,
+                "seed": seed,
+            },
+            "virtual_seconds": round(clock.now() - start_ts, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            "speedup": round((clock.now() - start_ts) / wall_seconds, 1) if wall_seconds else None,
+            "ticks": engine.tick_count,
+            "timing": _timing_report(_entries(workdir / "window_actions.log"), late_entry_seconds),
+            "outcomes": dict(outcomes.most_common()),
+            "open_trades_left": len(engine.trade_executor.open_trades),
+            "analytics": engine.trade_executor.analytics.view()["overall"],
+            "simulator": {"orders": len(sim_app.state.sim.orders)},
+        }
+        await engine.shutdown()
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--windows", type=int, default=96, help="janelas de 15m simuladas (96 = um dia)")
+    parser.add_argument("--poll-interval", type=int, default=3, help="POLL_INTERVAL_SECONDS virtual do bot")
+    parser.add_argument("--start-ts", type=int, default=DEFAULT_START_TS, help="epoch inicial do relógio virtual")
+    parser.add_argument("--late-entry-seconds", type=int, default=180)
+    parser.add_argument("--scenario", type=Path, help="cenário JSON de latência/outage do simulador (fases em tempo virtual)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    scenario = Scenario.load(args.scenario) if args.scenario else None
+    result = asyncio.run(
+        simulate(args.windows, args.poll_interval, args.start_ts, args.seed, scenario, args.late_entry_seconds)
+    )
+    text = json.dumps(result, indent=2, default=str)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.entities import AccountConfig, Asset, ExecutionMode, StrategyConfig
+from app.services.bot_engine import BotEngine
+from app.services.engine_snapshot import EngineSnapshotter
+from app.services.order_client import ClobOrderClient
+from app.services.order_manager import OrderState
+from app.services.polymarket_service import PolymarketService
+from app.services.price_service import PriceService
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def test_accounts_mirror_entries_with_own_books_and_no_extra_requests(tmp_path):
+    baseline = FakeUpstreams(yes_odds=0.9)
+    plain = _engine(baseline, tmp_path / "plain")
+    asyncio.run(plain.tick())
+    asyncio.run(plain.shutdown())
+
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.update_accounts(
+        [
+            AccountConfig(name="small", amount_usd=5, starting_balance=100),
+            AccountConfig(name="large", amount_usd=500, starting_balance=10_000),
+            AccountConfig(name="off", enabled=False),
+            # REAL sem carteira não abre trade nem manda ordem
+            AccountConfig(name="live", mode=ExecutionMode.REAL),
+        ]
+    )
+
+    asyncio.run(engine.tick())
+
+    assert upstreams.requests_by_host == baseline.requests_by_host
+    small, large, off, live = engine.accounts.accounts
+    assert len(small.executor.open_trades) == len(large.executor.open_trades) == 2
+    assert not off.executor.open_trades and not live.executor.open_trades
+    assert live.last_decision_by_asset[Asset.BTC] == "REAL_MODE_NEEDS_WALLET"
+    assert small.last_decision_by_asset[Asset.BTC].startswith("PAPER_ORDER::UP")
+    # books isolados: trades distintas do book principal e entre contas
+    assert not set(small.executor.open_trades) & set(large.executor.open_trades)
+    assert len(engine.trade_executor.open_trades) == 2
+
+    assert {t.amount_usd for t in large.executor.open_trades.values()} == {500}
+
+    # o book sobrevive ao restart pelo snapshot, pelo nome da conta
+    snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+    asyncio.run(snapshotter.write(engine))
+    restarted = _engine(upstreams, tmp_path / "restarted")
+    restarted.update_accounts([AccountConfig(name="large", amount_usd=500)])
+    snapshotter.restore(restarted)
+    assert set(restarted.accounts.accounts[0].executor.open_trades) == set(large.executor.open_trades)
+    assert set(restarted.accounts.dormant["small"].executor.open_trades) == set(small.executor.open_trades)
+    asyncio.run(restarted.shutdown())
+
+    for trade in [*small.executor.open_trades.values(), *large.executor.open_trades.values()]:
+        trade.closes_at = datetime.utcnow() - timedelta(seconds=1)
+    # mesma variação do spot nas duas contas: o PnL escala com o stake de cada uma
+    moved = {asset: replace(s, spot_price=s.spot_price * 1.01) for asset, s in engine.latest_snapshots.items()}
+    engine.accounts.settle(moved, {}, set())
+    view = {a["name"]: a for a in engine.accounts.view()["accounts"]}
+    assert view["small"]["stats"]["trades"] == view["large"]["stats"]["trades"] == 2
+    assert view["small"]["stats"]["all_time_pnl"] == pytest.approx(2 * 5 * 0.01)
+    assert view["large"]["stats"]["all_time_pnl"] == pytest.approx(100 * view["small"]["stats"]["all_time_pnl"])
+    assert view["large"]["stats"]["balance"] == pytest.approx(10_000 + 2 * 500 * 0.01)
+    assert view["small"]["latency_ms"]["p50"] is not None
+    assert "wallet_secret" not in view["live"]["config"]
+    asyncio.run(engine.shutdown())
+
+
+def test_real_accounts_send_own_orders_in_parallel(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client()),
+        poly_service=PolymarketService(client=upstreams.client(), order_client=ClobOrderClient(client=upstreams.client())),
+        action_log_path=tmp_path / "window_actions.log",
+    )
+    engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC], late_entry_seconds=900)
+    engine.update_accounts(
+        [
+            AccountConfig(name="a", mode=ExecutionMode.REAL, wallet_secret="0xaaaaaaaaaaaaaaaa", amount_usd=10),
+            AccountConfig(name="b", mode=ExecutionMode.REAL, wallet_secret="0xbbbbbbbbbbbbbbbb", amount_usd=30),
+        ]
+    )
+
+    async def run():
+        await engine.tick()
+        await engine.order_manager.drain()
+
+    asyncio.run(run())
+
+    orders = engine.order_manager.view()["orders"]
+    assert {(o["account"], o["amount_usd"]) for o in orders} == {("a", 10), ("b", 30)}
+    assert len({o["client_order_id"] for o in orders}) == 2
+    assert engine.order_manager.view()["by_state"] == {"ACKED": 2}
+    # templates por conta preparados na zona de entrada: nenhuma ordem fria
+    assert engine.poly_service.orders.stats()["cold_orders"] == 0
+    for account in engine.accounts.accounts:
+        assert account.orders == {"ACKED": 1}
+        assert account.last_decision_by_asset[Asset.BTC].startswith("ORDER::CLOB_ORDER_ACCEPTED")
+    # o modo da conta principal continua TEST: a entrada dela é paper
+    assert engine.last_decision_by_asset[Asset.BTC].startswith("PAPER_ORDER::UP")
+
+    # conta removida com a ordem em voo: a rejeição ainda chega ao book dormente
+    b = engine.accounts.accounts[1]
+    [record] = [o for o in engine.order_manager.records.values() if o.account == "b"]
+    engine.update_accounts([engine.accounts.accounts[0].config])
+    engine.accounts.order_done(replace(record, state=OrderState.REJECTED, message="CLOB_ORDER_REJECTED"))
+    assert engine.accounts.dormant["b"] is b
+    assert b.executor.open_trades[record.trade_id].status == "ORDER_REJECTED"
+    assert b.orders["REJECTED"] == 1
+    asyncio.run(engine.shutdown())
@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.bar_builder import BarBuilder, parse_timeframe
+from app.services.indicator_service import IndicatorService
+
+
+def test_parse_timeframe_requires_divisor_of_window():
+    assert parse_timeframe("15s") == 15
+    assert parse_timeframe("5m") == 300
+    with pytest.raises(ValueError):
+        parse_timeframe("7m")
+    with pytest.raises(ValueError):
+        parse_timeframe("1x")
+
+
+def test_aggregates_ohlcv_aligned_to_grid():
+    builder = BarBuilder(["15s", "1m"], "1m")
+    # 900 é início de janela; spots a cada 5s
+    for i, price in enumerate([10.0, 12.0, 9.0, 11.0]):
+        assert builder.update({"BTC": price}, 905 + 5 * i) == {}
+    closed = builder.update({"BTC": 20.0}, 960.5)
+
+    assert closed == {"BTC": [(10.0, 12.0, 9.0, 11.0, 4.0)]}
+    quarter = builder.bars("BTC", "15s")
+    assert [b["start"] for b in quarter["bars"]] == [900, 915, 930, 945]
+    assert [(b["open"], b["close"], b["volume"]) for b in quarter["bars"]] == [
+        (10.0, 12.0, 2.0), (9.0, 11.0, 2.0), (11.0, 11.0, 0.0), (11.0, 11.0, 0.0)
+    ]
+    assert quarter["current"]["start"] == 960
+
+
+def test_gap_is_filled_with_flat_bars_and_ring_is_bounded():
+    builder = BarBuilder(["1m"], "1m", capacity=3)
+    builder.update({"ETH": 100.0}, 0)
+    closed = builder.update({"ETH": 105.0}, 4 * 60 + 1)
+
+    assert closed["ETH"] == [(100.0, 100.0, 100.0, 100.0, 1.0)] + [(100.0,) * 4 + (0.0,)] * 3
+    view = builder.bars("ETH", "1m", limit=10)
+    assert [b["start"] for b in view["bars"]] == [60, 120, 180]
+    builder.update({"ETH": 0.0}, 400)
+    assert builder.bars("ETH", "1m")["current"]["close"] == 105.0
+    with pytest.raises(KeyError):
+        builder.bars("ETH", "5m")
+
+
+def test_indicators_follow_closed_bars_not_poll_rate():
+    slow, fast = IndicatorService(), IndicatorService()
+    for service, step in ((slow, 30), (fast, 2)):
+        builder = BarBuilder(["1m"], "1m")
+        for ts in range(0, 40 * 60, step):
+            for asset, bars in builder.update({"SOL": 100.0 + (ts // 60) % 7}, ts).items():
+                for bar in bars:
+                    service.push_bar(asset, bar)
+
+    assert slow.history("SOL") == fast.history("SOL")
+    assert slow.history_len("SOL") == 39
+    assert slow.macd_bias("SOL") == fast.macd_bias("SOL")
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from app.services.indicator_service import IndicatorService, build_indicator_service
+
+
+def test_python_backend_and_invalid_backend():
+    assert type(build_indicator_service("python")) is IndicatorService
+    with pytest.raises(ValueError):
+        build_indicator_service("gpu")
+
+
+def test_batch_biases_match_scalar_path():
+    pytest.importorskip("numpy")
+    from app.services.batch_indicators import BatchIndicatorService
+
+    rng = random.Random(3)
+    scalar = IndicatorService()
+    batch = BatchIndicatorService()
+    lengths = {f"A{i}": n for i, n in enumerate([10, 29, 30, 31, 80, 299, 300, 301, 420])}
+    prices = {asset: 100.0 + i for i, asset in enumerate(lengths)}
+    batch.seed("SEEDED", [100 + (i % 7) * 0.5 for i in range(350)])
+    scalar.seed("SEEDED", [100 + (i % 7) * 0.5 for i in range(350)])
+
+    for step in range(max(lengths.values())):
+        tick = {}
+        for asset, n in lengths.items():
+            if step < n:
+                prices[asset] *= 1 + rng.uniform(-0.002, 0.002)
+                tick[asset] = prices[asset]
+        scalar.push_prices(tick)
+        batch.push_prices(tick)
+        if step % 50 == 0 or step in (298, 299, 300, 419):
+            for asset in [*lengths, "SEEDED"]:
+                assert batch.macd_bias(asset) == scalar.macd_bias(asset), (asset, step)
+                assert batch.trend_bias(asset) == scalar.trend_bias(asset), (asset, step)
+
+    assert batch.snapshot() == scalar.snapshot()
+    assert batch.history_len("A8") == scalar.history_len("A8") == 300
+    assert batch.history_len("missing") == 0
@@ -0,0 +1,188 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.markets import MarketRegistry, MarketSpec
+from app.models.entities import Asset, StrategyConfig
+from app.services.bot_engine import BotEngine
+from app.services.polymarket_service import PolymarketService
+from app.services.price_service import PriceService
+from benchmarks.fakes import FakeUpstreams
+
+
+def _engine(upstreams, tmp_path):
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client()),
+        poly_service=PolymarketService(client=upstreams.client()),
+        action_log_path=tmp_path / "window_actions.log",
+    )
+    engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC, Asset.ETH], late_entry_seconds=900)
+    return engine
+
+
+def test_tick_end_to_end_through_fake_upstreams(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+
+    asyncio.run(engine.tick())
+
+    assert engine.tick_count == 1
+    assert engine.latest_snapshots[Asset.BTC].spot_price == 68000.0
+    assert engine.latest_snapshots[Asset.BTC].odds_live is True
+    assert engine.last_decision_by_asset[Asset.BTC].startswith("PAPER_ORDER::UP")
+    assert len(engine.trade_executor.open_trades) == 2
+    assert upstreams.requests_by_host["api.coingecko.com"] == 1
+    # BTC e ETH compartilham a janela de 15m: uma única request Gamma resolve os dois
+    assert upstreams.requests_by_host["gamma-api.polymarket.com"] == 1
+
+    [trace] = engine.tracer.recent()
+    names = {s["name"] for s in trace["spans"]}
+    assert {"tick", "fetch_spots", "refresh_markets", "fetch_window_group", "process_asset"} <= names
+    asyncio.run(engine.shutdown())
+
+
+def test_registry_batches_per_window_length(tmp_path):
+    registry = MarketRegistry(
+        [
+            MarketSpec.from_dict({"symbol": "BTC", "window": "15m"}),
+            MarketSpec.from_dict({"symbol": "ETH", "window": "15m"}),
+            MarketSpec.from_dict({"symbol": "DOGE", "window": "5m"}),
+            MarketSpec.from_dict({"symbol": "XRP", "window": "1h"}),
+        ]
+    )
+    upstreams = FakeUpstreams(yes_odds=0.6)
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client(), registry=registry),
+        poly_service=PolymarketService(client=upstreams.client(), registry=registry),
+        action_log_path=tmp_path / "window_actions.log",
+        registry=registry,
+    )
+
+    asyncio.run(engine.tick())
+
+    assert upstreams.requests_by_host["gamma-api.polymarket.com"] == 3
+    assert engine.latest_snapshots["XRP"].market_slug.startswith("xrp-updown-1h-")
+    assert engine.latest_snapshots["DOGE"].window_ts % 300 == 0
+
+    # segundo tick dentro do TTL e fora da zona de entrada não reconsulta a Gamma
+    engine.market_resolver.due_assets = lambda assets, now_ts: []
+    asyncio.run(engine.tick())
+    assert upstreams.requests_by_host["gamma-api.polymarket.com"] == 3
+    asyncio.run(engine.shutdown())
+
+
+def test_update_config_rejects_asset_outside_registry(tmp_path):
+    engine = BotEngine(action_log_path=tmp_path / "window_actions.log")
+    try:
+        engine.update_strategy_config(StrategyConfig(enabled_assets=["BTC", "NOPE"]))
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "NOPE" in str(exc)
+
+
+def test_late_entry_limit_follows_the_shortest_enabled_window(tmp_path):
+    from app.models.entities import ShadowStrategyConfig
+
+    registry = MarketRegistry(
+        [MarketSpec.from_dict({"symbol": "DOGE", "window": "5m"}), MarketSpec.from_dict({"symbol": "XRP", "window": "1h"})]
+    )
+    engine = BotEngine(action_log_path=tmp_path / "window_actions.log", registry=registry)
+
+    # 1h comporta zona de entrada maior que 15 minutos
+    engine.update_strategy_config(StrategyConfig(enabled_assets=["XRP"], late_entry_seconds=1800))
+    engine.update_shadow_strategies([ShadowStrategyConfig(name="wide", late_entry_seconds=1800)])
+    # com um 5m habilitado, nada acima de 300s
+    for late_entry in (301, 900):
+        with pytest.raises(ValueError, match="entre 30 e 300"):
+            engine.update_strategy_config(StrategyConfig(enabled_assets=["XRP", "DOGE"], late_entry_seconds=late_entry))
+    assert engine.strategy_config.enabled_assets == ["XRP"]
+
+
+def test_tick_deadline_falls_back_to_last_known_market(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from benchmarks.fakes import FaultProfile
+
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC], late_entry_seconds=900, entry_probability_threshold=0.95)
+    monkeypatch.setattr(settings, "tick_deadline_seconds", 0.2)
+
+    async def run():
+        await engine.tick()
+        assert engine.latest_snapshots[Asset.BTC].stale is False
+
+        upstreams.faults_by_host["gamma-api.polymarket.com"] = FaultProfile(latency_ms=2000)
+        engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC], late_entry_seconds=900, entry_probability_threshold=0.85)
+        started = time.perf_counter()
+        await engine.tick()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+
+    assert elapsed < 0.5
+    snapshot = engine.latest_snapshots[Asset.BTC]
+    assert snapshot.stale is True
+    assert snapshot.odds_live is True  # último mercado resolvido, não o fallback
+    assert engine.last_decision_by_asset[Asset.BTC].startswith("DEADLINE_EXCEEDED::ENTRY_BLOCKED_STALE_DATA")
+    assert engine.trade_executor.open_trades == {}
+    asyncio.run(engine.shutdown())
+
+
+def test_background_resolver_keeps_gamma_off_the_tick_path(tmp_path):
+    from benchmarks.fakes import FaultProfile
+
+    upstreams = FakeUpstreams(yes_odds=0.9, faults_by_host={"gamma-api.polymarket.com": FaultProfile(latency_ms=300)})
+    engine = _engine(upstreams, tmp_path)
+
+    async def run():
+        engine.market_resolver.start()
+        started = time.perf_counter()
+        await engine.tick()
+        first_tick = time.perf_counter() - started
+        # o primeiro refresh já está agendado: esperar por ele não é prazo estourado
+        assert engine.last_decision_by_asset[Asset.BTC] == "WAIT_MARKET_RESOLUTION"
+
+        while Asset.BTC not in engine.market_resolver.latest:
+            await asyncio.sleep(0.05)
+        gamma_before = upstreams.requests_by_host["gamma-api.polymarket.com"]
+        await engine.tick()
+        assert upstreams.requests_by_host["gamma-api.polymarket.com"] == gamma_before
+        await engine.market_resolver.stop()
+        return first_tick
+
+    assert asyncio.run(run()) < 0.2
+    assert engine.last_decision_by_asset[Asset.BTC].startswith("PAPER_ORDER::UP")
+    asyncio.run(engine.shutdown())
+
+
+def test_window_rollover_waits_for_refresh_without_marking_stale(tmp_path, monkeypatch):
+    from app.core.clock import VirtualClock, use_clock
+    from app.services.decision_log import Outcome
+    from app.services.market_resolver import MarketResolver
+
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC], late_entry_seconds=60)
+    window = 1_800_000_000 // 900 * 900
+
+    with use_clock(VirtualClock(window + 100)) as clock:
+        asyncio.run(engine.tick())
+        assert engine.latest_snapshots[Asset.BTC].window_ts == window
+
+        # resolver em background "rodando", mas o refresh da janela nova ainda não chegou
+        monkeypatch.setattr(MarketResolver, "running", property(lambda self: True))
+        clock.advance(802)
+        asyncio.run(engine.tick())
+        assert engine.last_decision_by_asset[Asset.BTC] == f"MARKET_PENDING::ROLLOVER(window={window})"
+        assert engine.latest_snapshots[Asset.BTC].stale is False
+        [event] = engine.decision_log.query(Asset.BTC, limit=1)
+        assert event["outcome"] == Outcome.MARKET_PENDING.name
+        assert event["stale"] is False
+
+        # passado o prazo de dois intervalos, o mercado da janela anterior é stale de verdade
+        clock.advance(2 * 30)
+        asyncio.run(engine.tick())
+        assert engine.latest_snapshots[Asset.BTC].stale is True
+        assert engine.last_decision_by_asset[Asset.BTC].startswith("DEADLINE_EXCEEDED::")
+    asyncio.run(engine.shutdown())
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.models.entities import Asset
+from app.services.candle_history import CandleCache, CandleHistory
+from app.services.indicator_service import IndicatorService
+from app.services.price_service import PriceService
+from benchmarks.fakes import FakeUpstreams
+
+
+def test_bootstrap_fetches_bulk_then_only_missing_tail(tmp_path):
+    upstreams = FakeUpstreams()
+    price_service = PriceService(client=upstreams.client())
+    cache = CandleCache(tmp_path / "candles")
+    requested: list[int] = []
+    fetch_klines = price_service.fetch_klines
+
+    async def recording_fetch(asset, start_ms, limit, interval="1m"):
+        requested.append(limit)
+        return await fetch_klines(asset, start_ms, limit, interval)
+
+    price_service.fetch_klines = recording_fetch
+    history = CandleHistory(price_service, cache, size=120)
+
+    closes = asyncio.run(history.load([Asset.BTC]))[Asset.BTC]
+    assert len(closes) >= 119
+    assert requested == [120]
+    assert cache.path(Asset.BTC).stat().st_size == len(closes) * 16
+
+    # restart com os 5 candles mais recentes faltando: só a cauda é buscada
+    cache.save(Asset.BTC, cache.load(Asset.BTC)[:-5])
+    again = asyncio.run(CandleHistory(price_service, cache, size=120).load([Asset.BTC]))[Asset.BTC]
+    assert requested[1] <= 6
+    assert len(again) >= len(closes) - 1
+
+    indicators = IndicatorService()
+    indicators.seed(Asset.BTC, again)
+    assert indicators.macd_bias(Asset.BTC) is not None
+    asyncio.run(price_service.close())
@@ -0,0 +1,23 @@
+import pytest
+
+from app.core import deadline
+from app.core.deadline import DeadlineExceeded, deadline_scope
+
+
+def test_nested_scope_never_extends_outer_deadline():
+    assert deadline.remaining() is None
+    with deadline_scope(0.5):
+        with deadline_scope(10):
+            assert deadline.remaining() <= 0.5
+        with deadline_scope(None):
+            assert deadline.remaining() is None
+            assert deadline.timeout(10) == 10
+        assert deadline.timeout(10) <= 0.5
+    assert deadline.remaining() is None
+
+
+def test_timeout_raises_once_deadline_passed():
+    with deadline_scope(0):
+        assert deadline.expired()
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout(10)
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.models.entities import Asset, Direction
+from app.services.decision_log import DecisionLog, Outcome
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def test_ring_wraps_spills_and_filters(tmp_path):
+    log = DecisionLog(capacity=3, spill_dir=tmp_path)
+    for i in range(5):
+        outcome = Outcome.PAPER_ORDER if i == 4 else Outcome.WAIT_WINDOW_OR_PROB
+        log.record("BTC", 1000.0 + i, i, outcome, window_ts=900 * (i // 2), remaining_seconds=60 - i, probability=0.8, direction=Direction.UP)
+
+    assert [e["tick"] for e in log.query()] == [4, 3, 2]
+    assert [e["tick"] for e in log.query(outcomes={Outcome.PAPER_ORDER})] == [4]
+
+    # antes do spill: o que saiu do ring ainda está pendente e a consulta não tem buraco
+    assert [e["tick"] for e in asyncio.run(log.query_spilled(window_ts=0))] == [1, 0]
+
+    async def spill() -> None:
+        log.maybe_spill()
+        await log.flush()
+
+    asyncio.run(spill())
+    assert log.spilled == 2
+    assert [e["tick"] for e in asyncio.run(log.query_spilled(window_ts=0))] == [1, 0]
+    assert [e["tick"] for e in asyncio.run(log.query_spilled(limit=4))] == [4, 3, 2, 1]
+    assert log.query(window_ts=0) == []
+
+
+def test_tick_records_structured_decision_per_asset(tmp_path):
+    engine = _engine(FakeUpstreams(yes_odds=0.9), tmp_path)
+
+    asyncio.run(engine.tick())
+
+    [event] = engine.decision_log.query(asset=Asset.BTC)
+    assert event["outcome"] == "PAPER_ORDER"
+    assert event["direction"] == "UP"
+    assert event["probability"] == 0.9
+    assert event["window_ts"] is not None and event["remaining_seconds"] is not None
+    assert event["tick"] == 1 and event["latency_ms"] > 0
+    asyncio.run(engine.shutdown())
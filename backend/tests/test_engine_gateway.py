@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.entities import Asset
+from app.services.engine_gateway import EngineCommandError, EngineCommands, LocalEngineGateway, RemoteEngineGateway, serve
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def test_remote_gateway_drives_engine_over_unix_socket(tmp_path):
+    engine = _engine(FakeUpstreams(yes_odds=0.9), tmp_path)
+    socket_path = tmp_path / "engine.sock"
+
+    async def run():
+        server = await serve(EngineCommands(engine), socket_path)
+        gateway = RemoteEngineGateway(socket_path)
+        try:
+            assert (await gateway.call("tick"))["tick_count"] == 1
+            state = await gateway.state()
+            assert state["tick_count"] == 1
+            assert state["last_decision_by_asset"][Asset.BTC].startswith("PAPER_ORDER::UP")
+
+            # sem tick novo a versão não muda e o engine não reenvia o payload
+            reply = await gateway.call("state", since=gateway.state_version)
+            assert reply == {"version": gateway.state_version, "unchanged": True}
+
+            with pytest.raises(EngineCommandError) as exc:
+                await gateway.call("update_config", config={"enabled_assets": ["NOPE"]})
+            assert exc.value.status_code == 400
+        finally:
+            await gateway.shutdown()
+            server.close()
+            await server.wait_closed()
+            await engine.shutdown()
+
+    asyncio.run(run())
+
+
+def test_state_version_does_not_repeat_across_engine_restarts(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    socket_path = tmp_path / "engine.sock"
+
+    async def run():
+        engine = _engine(upstreams, tmp_path / "first")
+        server = await serve(EngineCommands(engine), socket_path)
+        gateway = RemoteEngineGateway(socket_path)
+        await gateway.call("tick")
+        assert (await gateway.state())["tick_count"] == 1
+        await gateway.shutdown()
+        server.close()
+        await server.wait_closed()
+        await engine.shutdown()
+
+        # processo novo: o contador volta a 0 e alcança o mesmo número que a API já viu
+        restarted = _engine(upstreams, tmp_path / "second")
+        restarted.state_version = engine.state_version
+        server = await serve(EngineCommands(restarted), socket_path)
+        try:
+            assert (await gateway.state())["tick_count"] == 0
+        finally:
+            await gateway.shutdown()
+            server.close()
+            await server.wait_closed()
+            await restarted.shutdown()
+
+    asyncio.run(run())
+
+
+def test_routes_go_through_the_gateway(tmp_path):
+    engine = _engine(FakeUpstreams(), tmp_path)
+    app.state.engine = LocalEngineGateway(engine)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            missing = await client.get("/api/debug/ticks/99")
+            health = await client.get("/api/health")
+            return missing, health
+
+    missing, health = asyncio.run(run())
+    assert missing.status_code == 404
+    assert health.json()["tick_count"] == 0
+    asyncio.run(engine.shutdown())
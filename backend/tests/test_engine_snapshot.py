@@ -0,0 +1,90 @@
+import asyncio
+
+from app.models.entities import Asset
+from app.services.engine_snapshot import EngineSnapshotter, capture, decode, encode, write_atomic
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def test_snapshot_restores_trading_state_without_refetching_markets(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+
+    async def first_run():
+        await engine.tick()
+        await engine.snapshotter.write(engine)
+
+    asyncio.run(first_run())
+    assert engine.snapshotter.stats.last_bytes > 0
+    open_ids = set(engine.trade_executor.open_trades)
+
+    restarted = _engine(upstreams, tmp_path)
+    restarted.snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+    assert restarted.restore_snapshot() is True
+    assert set(restarted.trade_executor.open_trades) == open_ids
+    assert restarted.indicator_service.history_len(Asset.BTC) == engine.indicator_service.history_len(Asset.BTC)
+    assert restarted.market_resolver.latest[Asset.BTC].odds_live is True
+
+    gamma_before = upstreams.requests_by_host["gamma-api.polymarket.com"]
+    restarted.market_resolver.in_entry_zone = lambda window_seconds, now_ts: False
+    asyncio.run(restarted.tick())
+    assert upstreams.requests_by_host["gamma-api.polymarket.com"] == gamma_before
+    # janela já tem ENTRY no action journal: nada de entrada duplicada após o restart
+    assert restarted.last_decision_by_asset[Asset.BTC].startswith("SKIP_DUPLICATE_WINDOW")
+    asyncio.run(engine.shutdown())
+    asyncio.run(restarted.shutdown())
+
+
+def test_corrupted_snapshot_is_rejected():
+    data = bytearray(encode({"tick_count": 1}))
+    assert decode(bytes(data)) == {"tick_count": 1}
+    data[-1] ^= 0xFF
+    try:
+        decode(bytes(data))
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "crc" in str(exc)
+
+
+def test_failed_background_write_is_logged_and_counted(tmp_path, caplog):
+    engine = _engine(FakeUpstreams(yes_odds=0.9), tmp_path)
+    # o diretório do snapshot é um arquivo: a escrita falha na thread
+    (tmp_path / "blocked").write_text("")
+    snapshotter = EngineSnapshotter(tmp_path / "blocked" / "engine_state.bin", interval_seconds=15)
+
+    async def run():
+        snapshotter.maybe_write(engine)
+        await asyncio.gather(snapshotter._task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert snapshotter.stats.failures == 1
+    assert snapshotter.stats.writes == 0
+    assert snapshotter.stats.last_error.startswith(("FileExistsError", "NotADirectoryError"))
+    assert "falha ao gravar o snapshot" in caplog.text
+    asyncio.run(engine.shutdown())
+
+
+def test_invalid_snapshot_leaves_engine_untouched(tmp_path, caplog):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+    asyncio.run(engine.tick())
+    state = capture(engine)
+    # campo do fim do snapshot inválido: nada do começo pode ter sido aplicado
+    state["strategy_config"] = {"confidence_threshold": "not a number"}
+
+    restarted = _engine(upstreams, tmp_path / "restarted")
+    restarted.snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+    write_atomic(restarted.snapshotter.path, encode(state))
+    assert restarted.restore_snapshot() is False
+    assert restarted.trade_executor.open_trades == {}
+    # o snapshot ilegível sai do caminho antes de ser sobrescrito, e o erro fica registrado
+    assert not restarted.snapshotter.path.exists()
+    assert (tmp_path / "engine_state.bin.corrupt").exists()
+    assert restarted.snapshotter.stats.last_error.startswith("restore: ValidationError")
+    assert restarted.tick_count == 0
+    assert restarted.market_resolver.latest == {}
+    assert "não foi restaurado" in caplog.text
+    asyncio.run(engine.shutdown())
+    asyncio.run(restarted.shutdown())
@@ -0,0 +1,67 @@
+from app.services.gamma_parser import (
+    FINAL_PRICE_KEYS,
+    PRICE_TO_BEAT_KEYS,
+    GammaFields,
+    GammaParser,
+    extract_float,
+    extract_market_end_ts,
+    extract_yes,
+    extract_yes_no_tokens,
+)
+
+
+def _generic(market: dict) -> GammaFields:
+    yes_token, no_token = extract_yes_no_tokens(market)
+    return GammaFields(
+        yes=extract_yes(market),
+        end_ts=extract_market_end_ts(market),
+        price_to_beat=extract_float(market, PRICE_TO_BEAT_KEYS),
+        final_price=extract_float(market, FINAL_PRICE_KEYS),
+        yes_token_id=yes_token,
+        no_token_id=no_token,
+    )
+
+
+def _market(**overrides) -> dict:
+    market = {
+        "id": "1",
+        "slug": "btc-updown-15m-1700000100",
+        "outcomePrices": '["0.61", "0.39"]',
+        "clobTokenIds": '["yes-token", "no-token"]',
+        "endDate": "2023-11-14T22:30:00Z",
+        "priceToBeat": 100.0,
+        "finalPrice": None,
+        "settlementPrice": "101.5",
+    }
+    market.update(overrides)
+    return market
+
+
+def test_compiled_extractor_matches_generic_path_for_every_variant():
+    parser = GammaParser()
+    variants = [
+        _market(),
+        _market(outcomePrices='["0.7", "0.3"]', finalPrice=99.0),
+        # mesmo formato, valores fora do compilado: cada campo cai no caminho genérico
+        _market(outcomePrices=["0.55", "0.45"], clobTokenIds=["a", "b"], endDate=1700001000),
+        _market(outcomePrices="0.8,0.2", clobTokenIds="only-yes", endDate="invalid"),
+        _market(priceToBeat="n/a", finalPrice="bad"),
+        {"slug": "s", "outcomes": [{"lastPrice": "0.42"}], "endTime": 1700001000, "clob_token_ids": ["x", "y"]},
+        {"slug": "s"},
+    ]
+    for market in variants:
+        assert parser.parse(market) == _generic(market), market
+
+    assert parser.parse(_market()) == GammaFields(0.61, 1700001000, 100.0, 101.5, "yes-token", "no-token")
+
+
+def test_one_extractor_per_shape_and_stable_fields_are_memoized():
+    parser = GammaParser()
+    for i in range(50):
+        parser.parse(_market(outcomePrices=f'["0.{i + 10}", "0.5"]'))
+    parser.parse({"slug": "s", "outcomePrices": ["0.5", "0.5"]})
+
+    stats = parser.stats()
+    assert stats["shapes"] == 2 and stats["parsed"] == 51
+    assert list(parser._end_ts_memo.values) == ["2023-11-14T22:30:00Z"]
+    assert parser.decode(b'[{"slug": "s"}]') == [{"slug": "s"}]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+
+from app.models.entities import Asset, Direction, ExecutionConfigUpdate, ExecutionMode, StrategyConfig
+from app.services.bot_engine import BotEngine
+from app.services.order_client import ClobOrderClient
+from app.services.polymarket_service import MarketData, PolymarketService
+from app.services.price_service import PriceService
+from benchmarks.fakes import FakeUpstreams
+
+
+def _market() -> MarketData:
+    return MarketData(
+        asset="BTC",
+        window_ts=1700000100,
+        market_id="id",
+        market_slug="slug",
+        yes_odds=0.91234,
+        no_odds=0.08766,
+        odds_source="GAMMA_API",
+        odds_live=True,
+        resolver_source="DIRECT",
+        yes_token_id="yes-token",
+        no_token_id="no-token",
+    )
+
+
+def test_prepared_template_fires_single_send_and_retries_5xx():
+    bodies: list[dict] = []
+    statuses = iter([503, 200])
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/time":
+            return httpx.Response(200, json=0)
+        body = json.loads(request.content)
+        if body["token_id"] == "no-token":
+            return httpx.Response(400, json={"error": "invalid price"})
+        bodies.append(body)
+        return httpx.Response(next(statuses), json={})
+
+    async def run():
+        orders = ClobOrderClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+        assert orders.prepare(_market())
+        ack = await orders.fire(_market(), Direction.UP, 20.0)
+        rejected = await orders.fire(_market(), Direction.DOWN, 0.5)
+        await orders.close()
+        return orders, ack, rejected
+
+    orders, ack, rejected = asyncio.run(run())
+
+    assert ack.ok and ack.prepared and ack.attempts == 2 and ack.latency_ms > 0
+    assert bodies[0] == bodies[1] == {
+        "token_id": "yes-token",
+        "side": "BUY",
+        "client_order_id": "bot-BTC-1700000100-UP",
+        "order_type": "market",
+        "price": 0.9123,
+        "size": 20.0,
+    }
+    # 4xx não melhora com retry
+    assert rejected.message == "CLOB_REJECTED_400" and rejected.attempts == 1
+    stats = orders.stats()
+    assert stats["orders"] == 2 and stats["accepted"] == 1 and stats["cold_orders"] == 0
+    assert stats["decision_to_ack_ms"]["max"] is not None
+
+
+def test_real_mode_prepares_templates_before_entry(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client()),
+        poly_service=PolymarketService(client=upstreams.client(), order_client=ClobOrderClient(client=upstreams.client())),
+        action_log_path=tmp_path / "window_actions.log",
+    )
+    engine.strategy_config = StrategyConfig(enabled_assets=[Asset.BTC], late_entry_seconds=900)
+    engine.update_execution_config(ExecutionConfigUpdate(mode=ExecutionMode.REAL, wallet_secret="0xabcdef1234567890"))
+
+    async def run():
+        await engine.tick()
+        # o tick só enfileira a ordem; o ack chega pela fila
+        await engine.order_manager.drain()
+
+    asyncio.run(run())
+
+    assert engine.last_decision_by_asset[Asset.BTC].startswith("ORDER::CLOB_ORDER_ACCEPTED")
+    assert engine.order_manager.view()["by_state"] == {"ACKED": 1}
+    stats = engine.poly_service.orders.stats()
+    assert stats["accepted"] == 1 and stats["cold_orders"] == 0
+    assert stats["recent"][0]["prepared"] is True
+    assert upstreams.requests_by_host["clob.polymarket.com"] >= 1
+    asyncio.run(engine.shutdown())
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import httpx
+
+from app.core.config import settings
+from app.models.entities import Direction
+from app.services.order_client import ClobOrderClient
+from app.services.order_manager import OrderManager, OrderState
+from app.services.polymarket_service import MarketData
+from app.services.rate_limiter import RateLimitScheduler
+
+
+def _market(asset: str, market_id: str | None = None) -> MarketData:
+    return MarketData(
+        asset=asset,
+        window_ts=1700000100,
+        market_id=market_id or f"id-{asset}",
+        market_slug="slug",
+        yes_odds=0.9,
+        no_odds=0.1,
+        odds_source="GAMMA_API",
+        odds_live=True,
+        resolver_source="DIRECT",
+        yes_token_id=f"{asset}-yes",
+        no_token_id=f"{asset}-no",
+    )
+
+
+def _client(handle) -> ClobOrderClient:
+    return ClobOrderClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handle)), limiter=RateLimitScheduler())
+
+
+def test_orders_of_different_markets_fly_in_parallel_and_same_market_is_serialized():
+    sent: list[str] = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content)["client_order_id"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={})
+
+    async def run():
+        done = []
+        manager = OrderManager(_client(handle), max_in_flight=8, per_market_limit=1, on_done=done.append)
+        for asset in ("BTC", "ETH", "SOL"):
+            manager.submit(_market(asset), Direction.UP, 20.0, f"t-{asset}", 0.0)
+        await manager.drain()
+
+        same_market = OrderManager(_client(handle), max_in_flight=8, per_market_limit=1)
+        same_market.submit(_market("BTC", "shared"), Direction.UP, 20.0, "t-up", 0.0)
+        same_market.submit(_market("BTC", "shared"), Direction.DOWN, 20.0, "t-down", 0.0)
+        await same_market.drain()
+        return manager, done, same_market
+
+    manager, done, same_market = asyncio.run(run())
+
+    assert manager.peak_in_flight == 3
+    assert same_market.peak_in_flight == 1
+    assert {r.asset for r in done} == {"BTC", "ETH", "SOL"}
+    view = manager.view()
+    assert view["by_state"] == {"ACKED": 3} and view["in_flight"] == 0
+    assert [t[0] for t in view["orders"][0]["transitions"]] == ["QUEUED", "SENDING", "ACKED"]
+
+
+def test_submit_is_idempotent_and_only_failed_orders_are_requeued(monkeypatch):
+    # sem retry no cliente: a falha de transporte fica FAILED na fila
+    monkeypatch.setattr(settings, "order_max_retries", 0)
+    responses = iter([httpx.ConnectError("down"), 200, 400])
+    posts = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        posts.append(json.loads(request.content)["client_order_id"])
+        reply = next(responses)
+        if isinstance(reply, Exception):
+            raise reply
+        return httpx.Response(reply, json={})
+
+    async def run():
+        manager = OrderManager(_client(handle))
+        first = manager.submit(_market("BTC"), Direction.UP, 20.0, "t-1", 0.0)
+        await manager.drain()
+        failed_state = first.state
+        again = manager.submit(_market("BTC"), Direction.UP, 20.0, "t-1", 0.0)
+        await manager.drain()
+        # já tem ack: não reenvia
+        manager.submit(_market("BTC"), Direction.UP, 20.0, "t-1", 0.0)
+        await manager.drain()
+        rejected = manager.submit(_market("ETH"), Direction.DOWN, 20.0, "t-2", 0.0)
+        await manager.drain()
+        return manager, first, again, failed_state, rejected
+
+    manager, first, again, failed_state, rejected = asyncio.run(run())
+
+    assert failed_state is OrderState.FAILED
+    assert again is first and first.attempts == 2 and first.state is OrderState.ACKED
+    assert posts == ["bot-BTC-1700000100-UP", "bot-BTC-1700000100-UP", "bot-ETH-1700000100-DOWN"]
+    assert rejected.state is OrderState.REJECTED and rejected.message == "CLOB_REJECTED_400"
+    assert manager.view(state="acked")["orders"][0]["client_order_id"] == "bot-BTC-1700000100-UP"
+    assert manager.view(asset="ETH")["orders"][0]["state"] == "REJECTED"
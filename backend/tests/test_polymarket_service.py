@@ -1,17 +1,15 @@
 import asyncio
 
+from app.core.markets import MarketRegistry, MarketSpec
 from app.models.entities import Direction
 from app.services.polymarket_service import MarketData, PolymarketService
 
 
-def test_window_helpers_are_deterministic():
-    assert PolymarketService.get_current_window_ts(1700000123) == 1700000100
-    assert PolymarketService.get_next_window_ts(1700000123) == 1700001000
-
-
-def test_build_window_slug_uses_15m_timestamp():
-    slug = PolymarketService.build_window_slug("BTC", 1700000100)
-    assert slug == "btc-updown-15m-1700000100"
+def test_build_window_slug_uses_the_market_spec():
+    assert PolymarketService.build_window_slug("BTC", 1700000100) == "btc-updown-15m-1700000100"
+    registry = MarketRegistry([MarketSpec.from_dict({"symbol": "DOGE", "window": "5m"}), MarketSpec.from_dict({"symbol": "XRP", "window": "1h"})])
+    assert PolymarketService.build_window_slug("DOGE", 1700000100, registry) == "doge-updown-5m-1700000100"
+    assert PolymarketService(registry=registry).window_slug("XRP", 1699999200) == "xrp-updown-1h-1699999200"
 
 
 def test_extract_yes_from_gamma_payload_parses_stringified_outcome_prices():
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import Priority, RateLimitDropped, RateLimitScheduler, priority_scope
+
+
+def test_burst_is_served_immediately_and_unknown_hosts_are_unlimited():
+    limiter = RateLimitScheduler({"gamma": (1.0, 3.0)})
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire("gamma")
+        for _ in range(50):
+            await limiter.acquire("other-host")
+
+    asyncio.run(run())
+    assert limiter.stats["gamma"]["MARKET_DATA"].granted == 3
+
+
+def test_request_that_cannot_fit_in_deadline_is_dropped_not_queued():
+    limiter = RateLimitScheduler({"gamma": (1.0, 1.0)})
+
+    async def run():
+        await limiter.acquire("gamma")
+        with pytest.raises(RateLimitDropped):
+            await limiter.acquire("gamma", Priority.SEARCH)
+
+    asyncio.run(run())
+    assert limiter.stats["gamma"]["SEARCH"].dropped == 1
+    assert limiter.snapshot()["hosts"]["gamma"]["queued_now"] == 0
+
+
+def test_higher_priority_waiters_are_served_first():
+    limiter = RateLimitScheduler({"gamma": (50.0, 1.0)}, {Priority.SETTLEMENT: 1.0, Priority.ORDER: 1.0})
+    order: list[str] = []
+
+    async def take(name, priority):
+        await limiter.acquire("gamma", priority)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire("gamma")
+        settlement = asyncio.create_task(take("settlement", Priority.SETTLEMENT))
+        await asyncio.sleep(0)
+        order_task = asyncio.create_task(take("order", Priority.ORDER))
+        await asyncio.gather(settlement, order_task)
+
+    asyncio.run(run())
+    assert order == ["order", "settlement"]
+
+
+def test_priority_scope_sets_default_priority():
+    limiter = RateLimitScheduler({"gamma": (1.0, 1.0)})
+
+    async def run():
+        with priority_scope(Priority.ENTRY):
+            await limiter.acquire("gamma")
+
+    asyncio.run(run())
+    assert limiter.stats["gamma"]["ENTRY"].granted == 1
+
+
+@pytest.mark.parametrize(("rate", "burst", "message"), [(0.0, 5.0, "rate"), (-1.0, 5.0, "rate"), (2.0, 0.5, "burst")])
+def test_invalid_limits_are_rejected_when_the_limiter_is_built(rate, burst, message):
+    from app.core.config import Settings
+
+    with pytest.raises(ValueError, match=message):
+        RateLimitScheduler({"gamma": (rate, burst)})
+    with pytest.raises(ValueError, match=message):
+        RateLimitScheduler.from_settings(Settings(rate_limits={"gamma": [rate, burst]}))
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.models.entities import ApiMode, Direction, Trade
+from app.models.records import SnapshotRecord, TradeRecord
+
+
+def test_trade_record_round_trip_matches_pydantic_boundary():
+    record = TradeRecord(
+        id="t1",
+        asset="BTC",
+        direction=Direction.UP,
+        entry_price=0.9,
+        confidence=0.9,
+        api_mode=ApiMode.CLOB,
+        closes_at=datetime(2024, 1, 1, 12, 15),
+    )
+
+    assert not hasattr(record, "__dict__")
+    assert record.as_dict() == Trade(**record.as_dict()).model_dump()
+
+    payload = {**record.as_dict(), "closes_at": "2024-01-01T12:15:00", "direction": "UP", "api_mode": "CLOB"}
+    assert TradeRecord.from_dict(payload) == record
+
+
+def test_snapshot_record_timestamp_is_epoch_internally():
+    record = SnapshotRecord(asset="BTC", spot_price=100.0, timestamp=1_704_110_400.0)
+
+    assert record.as_dict()["timestamp"] == datetime(2024, 1, 1, 12, 0)
+    assert SnapshotRecord.from_dict({**record.as_dict(), "timestamp": "2024-01-01T12:00:00"}) == record
+    assert record.to_model().spot_price == 100.0
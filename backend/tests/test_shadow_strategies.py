@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.models.entities import Asset, Indicator, ShadowStrategyConfig
+from app.services.engine_snapshot import EngineSnapshotter
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def test_shadow_strategies_reuse_tick_data_and_keep_own_books(tmp_path):
+    baseline = FakeUpstreams(yes_odds=0.9)
+    plain = _engine(baseline, tmp_path / "plain")
+    asyncio.run(plain.tick())
+    asyncio.run(plain.shutdown())
+
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    engine = _engine(upstreams, tmp_path)
+    engine.update_shadow_strategies(
+        [
+            ShadowStrategyConfig(name="odds_only", late_entry_seconds=900, entry_probability_threshold=0.85),
+            ShadowStrategyConfig(name="strict", late_entry_seconds=900, entry_probability_threshold=0.95),
+            ShadowStrategyConfig(name="macd", late_entry_seconds=900, enabled_indicators=[Indicator.MACD]),
+        ]
+    )
+
+    asyncio.run(engine.tick())
+
+    assert upstreams.requests_by_host == baseline.requests_by_host
+    odds_only, strict, macd = engine.shadow.strategies
+    assert len(odds_only.executor.open_trades) == 2
+    assert not strict.executor.open_trades
+    assert strict.last_decision_by_asset[Asset.BTC].startswith("WAIT_WINDOW_OR_PROB")
+    # MACD calculado sobre o histórico compartilhado (warmup), com a direção do sinal e não das odds
+    assert macd.last_decision_by_asset[Asset.BTC].startswith("PAPER_ORDER::UP")
+    assert next(iter(macd.executor.open_trades.values())).confidence == 1.0
+    # o book principal não é afetado pelas sombras
+    assert len(engine.trade_executor.open_trades) == 2
+
+    # books sombra voltam pelo snapshot, com as janelas já entradas
+    snapshotter = EngineSnapshotter(tmp_path / "engine_state.bin", interval_seconds=15)
+    asyncio.run(snapshotter.write(engine))
+    restarted = _engine(upstreams, tmp_path / "restarted")
+    restarted.update_shadow_strategies([ShadowStrategyConfig(name="odds_only", late_entry_seconds=900, entry_probability_threshold=0.85)])
+    snapshotter.restore(restarted)
+    [restored] = restarted.shadow.strategies
+    assert set(restored.executor.open_trades) == set(odds_only.executor.open_trades)
+    assert restored.entered_windows == odds_only.entered_windows
+    asyncio.run(restarted.shutdown())
+
+    for trade in odds_only.executor.open_trades.values():
+        trade.closes_at = datetime.utcnow() - timedelta(seconds=1)
+    # janela fechada sai de `entered_windows`
+    odds_only.entered_windows = {key: datetime.utcnow() - timedelta(seconds=1) for key in odds_only.entered_windows}
+    engine.shadow.settle(engine.latest_snapshots, {}, set())
+    assert odds_only.entered_windows == {}
+    view = {s["name"]: s for s in engine.shadow.view()["strategies"]}
+    assert view["odds_only"]["overall"]["trades"] == 2
+    assert view["strict"]["overall"]["trades"] == 0
+    asyncio.run(engine.shutdown())
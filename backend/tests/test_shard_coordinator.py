@@ -0,0 +1,66 @@
+import asyncio
+
+from app.core.markets import MarketRegistry, MarketSpec
+from app.models.entities import StrategyConfig
+from app.services.bot_engine import BotEngine
+from app.services.engine_gateway import EngineCommands, RemoteEngineGateway, serve
+from app.services.polymarket_service import PolymarketService
+from app.services.price_service import PriceService
+from app.services.shard_coordinator import ShardCoordinator, shard_registry
+from benchmarks.fakes import FakeUpstreams
+
+REGISTRY = MarketRegistry([MarketSpec.from_dict({"symbol": s}) for s in ("BTC", "ETH", "SOL")])
+
+
+def _shard_engine(registry, upstreams, journal_path):
+    engine = BotEngine(
+        price_service=PriceService(client=upstreams.client(), registry=registry),
+        poly_service=PolymarketService(client=upstreams.client(), registry=registry),
+        action_log_path=journal_path,
+        registry=registry,
+    )
+    engine.strategy_config = StrategyConfig(enabled_assets=registry.symbols, late_entry_seconds=900)
+    return engine
+
+
+def test_coordinator_merges_shards_and_shares_the_action_journal(tmp_path):
+    upstreams = FakeUpstreams(yes_odds=0.9)
+    journal = tmp_path / "window_actions.log"
+    engines = [_shard_engine(shard_registry(REGISTRY, i, 2), upstreams, journal) for i in range(2)]
+    # processo que ainda tem BTC no registry (ex.: rebalanceamento) e leu o journal antes das entradas
+    straggler = _shard_engine(REGISTRY, upstreams, journal)
+
+    async def run():
+        servers = [await serve(EngineCommands(e), tmp_path / f"shard{i}.sock") for i, e in enumerate(engines)]
+        gateways = [RemoteEngineGateway(tmp_path / f"shard{i}.sock") for i in range(2)]
+        coordinator = ShardCoordinator(REGISTRY, gateways)
+        try:
+            await coordinator.dispatch("tick", {})
+            reply = await coordinator.dispatch("state", {})
+            state = reply["state"]
+            # versões que mudam e somam o mesmo total (um shard reiniciado) não podem dar `unchanged`
+            engines[0].state_version += 1
+            engines[1].state_version -= 1
+            again = await coordinator.dispatch("state", {"since": reply["version"]})
+            assert not again.get("unchanged")
+            assert again["version"] != reply["version"]
+            updated = await coordinator.dispatch("update_config", {"config": {"enabled_assets": ["ETH"], "late_entry_seconds": 900}})
+            return state, updated
+        finally:
+            for gateway in gateways:
+                await gateway.shutdown()
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+
+    state, updated = asyncio.run(run())
+    assert set(state["markets"]) == {"BTC", "ETH", "SOL"}
+    assert len(state["open_trades"]) == 3
+    assert updated["config"]["enabled_assets"] == ["ETH"]
+    assert len(journal.read_text().splitlines()) == 3
+
+    asyncio.run(straggler.tick())
+    assert straggler.last_decision_by_asset["BTC"].startswith("SKIP_DUPLICATE_WINDOW")
+    assert straggler.trade_executor.open_trades == {}
+    for engine in (*engines, straggler):
+        asyncio.run(engine.shutdown())
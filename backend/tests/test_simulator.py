@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core.clock import VirtualClock, now
+from simulator.market import WINDOW_SECONDS, SyntheticMarkets
+from simulator.scenarios import Scenario
+from simulator.server import create_app
+from simulator.simulate import simulate
+
+
+class ManualClockMarkets(SyntheticMarkets):
+    current = 1_700_000_100.0
+
+    def now(self):
+        return ManualClockMarkets.current
+
+
+def test_windows_roll_and_settle():
+    markets = ManualClockMarkets(seed=1)
+    window_ts = markets.window_ts(markets.now())
+    slug = f"btc-updown-15m-{window_ts}"
+
+    open_market = markets.market_for_slug(slug)
+    assert open_market["finalPrice"] is None
+    assert open_market["priceToBeat"] is not None
+
+    ManualClockMarkets.current += WINDOW_SECONDS + 5
+    closed_market = markets.market_for_slug(slug)
+    assert closed_market["closed"] is True
+    assert closed_market["finalPrice"] is not None
+    assert closed_market["outcomePrices"] in ('["0.990", "0.010"]', '["0.010", "0.990"]')
+
+
+def test_scenario_outage_returns_503_for_selected_upstream():
+    scenario = Scenario.from_dict({"phases": [{"start_s": 0, "duration_s": 60, "upstreams": ["gamma"], "outage": True}]})
+    app = create_app(scenario)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://sim") as client:
+            gamma = await client.get("/gamma/markets", params={"slug": "btc-updown-15m-1700000100"})
+            binance = await client.get("/binance/api/v3/ticker/price", params={"symbols": '["BTCUSDT"]'})
+            return gamma.status_code, binance.status_code, binance.json()
+
+    gamma_status, binance_status, binance_payload = asyncio.run(run())
+    assert gamma_status == 503
+    assert binance_status == 200
+    assert binance_payload[0]["symbol"] == "BTCUSDT"
+
+
+def test_virtual_clock_wakes_sleepers_only_when_loop_idles():
+    clock = VirtualClock(1_000.0)
+    woke: list[float] = []
+
+    async def sleeper() -> None:
+        await clock.sleep(10)
+        woke.append(clock.time())
+
+    async def run() -> None:
+        task = asyncio.create_task(sleeper())
+        await asyncio.sleep(0)
+        await clock.idle(6)
+        assert woke == []
+        await clock.idle(6)
+        await task
+
+    asyncio.run(run())
+    assert woke == [1_012.0]
+
+
+def test_simulated_windows_run_through_real_engine_loop(tmp_path):
+    report = asyncio.run(simulate(windows=2, poll_interval=10, workdir=tmp_path))
+
+    assert report["virtual_seconds"] >= 2 * WINDOW_SECONDS
+    assert report["ticks"] >= 2 * WINDOW_SECONDS // 10
+    assert report["timing"]["entries"] > 0
+    assert report["timing"]["duplicate_entries"] == 0
+    assert report["timing"]["late_entry_violations"] == 0
+    assert report["open_trades_left"] == 0
+    assert report["analytics"]["trades"] == report["timing"]["entries"]
+    # o relógio virtual não vaza para o resto do processo
+    assert abs(now() - time.time()) < 5
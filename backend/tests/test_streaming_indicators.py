@@ -0,0 +1,101 @@
+import random
+import statistics
+
+from app.models.entities import Direction, Indicator
+from app.services.indicator_service import IndicatorService
+from app.services.strategy_service import StrategyService
+
+
+def test_shared_nodes_are_built_once_per_asset():
+    service = IndicatorService(htf_factor=5)
+    service.require([Indicator.BOLLINGER])
+    service.push_price("BTC", 100.0)
+    alone = service.streaming.node_count("BTC")
+
+    service.require([Indicator.BOLLINGER, Indicator.ATR, Indicator.RSI_HTF, Indicator.TREND_HTF])
+    service.push_price("BTC", 101.0)
+    # ATR reaproveita a SMA20 do Bollinger (+ true range + RMA); RSI_HTF e TREND_HTF dividem a reamostragem
+    assert alone == 1
+    assert service.streaming.node_count("BTC") == 1 + 2 + (1 + 5) + 2
+
+
+def test_streaming_values_match_recomputation_and_replay():
+    rng = random.Random(5)
+    prices = [100.0]
+    for _ in range(200):
+        prices.append(prices[-1] * (1 + rng.uniform(-0.003, 0.003)))
+
+    live = IndicatorService()
+    live.require([Indicator.BOLLINGER, Indicator.RSI])
+    for price in prices:
+        live.push_price("ETH", price)
+    # indicador pedido depois dos pushes: o grafo é reconstruído a partir do histórico
+    late = IndicatorService()
+    for price in prices:
+        late.push_price("ETH", price)
+
+    graph = live.streaming._graphs["ETH"]
+    middle = graph._nodes[("rolling", ("source",), 20)]
+    assert abs(middle.value - statistics.fmean(prices[-20:])) < 1e-9
+    assert abs(middle.variance - statistics.pvariance(prices[-20:])) < 1e-6
+    for indicator in (Indicator.BOLLINGER, Indicator.RSI):
+        assert late.stream_bias("ETH", indicator) == live.stream_bias("ETH", indicator)
+
+
+def test_strategy_votes_with_streaming_indicators_and_abstentions():
+    service = IndicatorService()
+    strategy = StrategyService(service, 0.9)
+    for _ in range(39):
+        service.push_price("SOL", 100.0)
+    # rompimento acima da banda superior (SMA20 + 2 desvios)
+    service.push_price("SOL", 110.0)
+
+    signal, debug = strategy.generate_signal("SOL", [Indicator.RSI, Indicator.BOLLINGER, Indicator.VWAP], None)
+    assert signal is not None and signal.direction == Direction.UP
+    assert debug == "SIGNAL(1.00)::RSI=UP + BOLLINGER=UP + VWAP=UP"
+
+    # subida regular: o preço fica dentro das bandas e o Bollinger se abstém
+    ramp = IndicatorService()
+    for i in range(40):
+        ramp.push_price("SOL", 100.0 + i)
+    assert ramp.stream_bias("SOL", Indicator.BOLLINGER) == (True, None)
+
+    flat = IndicatorService()
+    for _ in range(40):
+        flat.push_price("SOL", 100.0)
+    signal, debug = StrategyService(flat, 0.9).generate_signal("SOL", [Indicator.ATR], None)
+    assert signal is None and debug == "NO_DIRECTIONAL_VOTES::ATR=FLAT"
+
+    signal, debug = StrategyService(IndicatorService(), 0.9).generate_signal("SOL", [Indicator.RSI_HTF], None)
+    assert debug == "WAITING_RSI_HTF_HISTORY"
+
+
+def test_rebuild_replays_real_bars_and_vwap_ignores_poll_count():
+    rng = random.Random(9)
+    bars = []
+    close = 100.0
+    for _ in range(120):
+        open_, close = close, close * (1 + rng.uniform(-0.004, 0.004))
+        high, low = max(open_, close) * 1.002, min(open_, close) * 0.998
+        bars.append((open_, high, low, close, float(rng.randint(1, 6))))
+
+    live = IndicatorService()
+    live.require([Indicator.ATR, Indicator.VWAP])
+    late = IndicatorService()
+    for bar in bars:
+        live.push_bar("BTC", bar)
+        late.push_bar("BTC", bar)
+    # indicador pedido depois (troca de config): o grafo é refeito das barras guardadas, não só dos closes
+    late.require([Indicator.ATR, Indicator.VWAP])
+    for indicator in (Indicator.ATR, Indicator.VWAP):
+        assert late.stream_bias("BTC", indicator) == live.stream_bias("BTC", indicator)
+    atr_key = ("rma", ("true_range",), 14)
+    assert late.streaming._graphs["BTC"]._nodes[atr_key].value == live.streaming._graphs["BTC"]._nodes[atr_key].value
+
+    # mesmo preço com outra contagem de polls por barra: mesmo VWAP
+    other = IndicatorService()
+    other.require([Indicator.VWAP])
+    for bar in bars:
+        other.push_bar("BTC", (*bar[:4], 1.0))
+    vwap_key = ("vwap", 30)
+    assert other.streaming._graphs["BTC"]._nodes[vwap_key].value == live.streaming._graphs["BTC"]._nodes[vwap_key].value
@@ -0,0 +1,86 @@
+import asyncio
+
+from app.services.tracing import TickTracer, annotate, span
+
+
+def test_tick_trace_records_nested_spans_in_waterfall_shape():
+    tracer = TickTracer(capacity=5)
+
+    async def run():
+        with tracer.trace_tick(1):
+            with span("fetch_spots", assets=3):
+                await asyncio.sleep(0)
+            with span("process_asset", asset="BTC"):
+                with span("gamma_attempt", attempt=1):
+                    annotate(strategy="EVENT_SLUG")
+
+    asyncio.run(run())
+
+    [trace] = tracer.recent()
+    names = [s["name"] for s in trace["spans"]]
+    assert names == ["tick", "fetch_spots", "process_asset", "gamma_attempt"]
+    by_name = {s["name"]: s for s in trace["spans"]}
+    assert by_name["gamma_attempt"]["parent_id"] == by_name["process_asset"]["id"]
+    assert by_name["gamma_attempt"]["attrs"] == {"attempt": 1, "strategy": "EVENT_SLUG"}
+    assert by_name["fetch_spots"]["start_ms"] >= 0
+    assert trace["duration_ms"] is not None
+
+
+def test_ring_buffer_keeps_only_last_ticks():
+    tracer = TickTracer(capacity=3)
+    for tick in range(1, 6):
+        with tracer.trace_tick(tick):
+            pass
+    assert [t["tick"] for t in tracer.recent()] == [5, 4, 3]
+    assert tracer.get(1) is None
+
+
+def test_span_outside_tick_is_noop():
+    with span("orphan") as current:
+        assert current is None
+
+
+def test_profile_request_is_consumed_by_chosen_tick():
+    tracer = TickTracer()
+    tracer.request_profile("cprofile", tick=2)
+    with tracer.trace_tick(1):
+        pass
+    with tracer.trace_tick(2):
+        sum(range(1000))
+    assert tracer.get(1)["profile"] is None
+    assert tracer.get(2)["profile"]["mode"] == "cprofile"
+    assert tracer.pending_profiles() == {}
+
+
+def test_profile_requests_for_past_ticks_are_rejected_or_dropped():
+    tracer = TickTracer()
+    tracer.request_profile("cprofile", tick=3)
+    with tracer.trace_tick(2):
+        pass
+    try:
+        tracer.request_profile("cprofile", tick=2)
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "já rodou" in str(exc)
+    # o contador pulou o tick pedido: o pedido sai da fila em vez de ficar pendente para sempre
+    with tracer.trace_tick(7):
+        pass
+    assert tracer.get(7)["profile"] is None
+    assert tracer.pending_profiles() == {}
+
+
+def test_overlapping_ticks_start_one_profiler_at_a_time():
+    tracer = TickTracer()
+    tracer.request_profile("cprofile", tick=1)
+    tracer.request_profile("tracemalloc")
+    # tick manual rodando junto com o do loop, com o mesmo número
+    with tracer.trace_tick(1):
+        with tracer.trace_tick(1):
+            pass
+    loop_tick, manual_tick = tracer.traces()[1], tracer.traces()[0]
+    assert loop_tick.profile["mode"] == "cprofile"
+    assert manual_tick.profile is None
+    assert tracer.pending_profiles() == {"next": "tracemalloc"}
+    with tracer.trace_tick(2):
+        pass
+    assert tracer.get(2)["profile"]["mode"] == "tracemalloc"
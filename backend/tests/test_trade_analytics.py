@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from app.models.entities import ApiMode, Direction
+from app.models.records import SnapshotRecord, TradeRecord
+from app.services.trade_analytics import TradeAnalytics, merge_views
+from app.services.trade_executor import TradeExecutor
+
+
+def _closed(asset: str, direction: Direction, pnl: float, closed_at: datetime) -> TradeRecord:
+    return TradeRecord(
+        id=f"{asset}-{closed_at.timestamp()}",
+        asset=asset,
+        direction=direction,
+        entry_price=100.0,
+        confidence=0.9,
+        api_mode=ApiMode.CLOB,
+        closes_at=closed_at,
+        closed_at=closed_at,
+        pnl=pnl,
+        status="WIN" if pnl > 0 else "LOSS",
+    )
+
+
+def test_buckets_track_drawdown_streaks_and_day_retention():
+    analytics = TradeAnalytics(day_retention=2, equity_points=3)
+    start = datetime(2024, 1, 1, 10)
+    for i, pnl in enumerate([2.0, 1.0, -1.5, -2.0, 1.0]):
+        analytics.record(_closed("BTC" if i % 2 else "ETH", Direction.UP, pnl, start + timedelta(days=i // 2)))
+
+    view = analytics.view()
+    assert view["overall"]["trades"] == 5
+    assert view["overall"]["pnl"] == 0.5
+    assert view["overall"]["max_drawdown"] == 3.5
+    assert view["overall"]["max_win_streak"] == 2
+    assert view["overall"]["max_loss_streak"] == 2
+    assert view["by_asset"]["BTC"]["trades"] == 2
+    assert list(view["by_hour"]) == ["10"]
+    assert list(view["by_day"]) == ["2024-01-02", "2024-01-03"]
+    assert [equity for _, equity in view["equity_curve"]] == [1.5, -0.5, 0.5]
+
+    restored = TradeAnalytics(day_retention=2, equity_points=3)
+    restored.load_state(analytics.to_state())
+    assert restored.view() == view
+
+    merged = merge_views([view, view])
+    assert merged["overall"]["trades"] == 10
+    assert merged["by_day"]["2024-01-03"]["pnl"] == 2.0
+
+
+def test_today_pnl_resets_at_day_boundary():
+    executor = TradeExecutor()
+    executor.analytics.record(_closed("BTC", Direction.UP, 5.0, datetime.utcnow() - timedelta(days=1)))
+    executor.stats.today_pnl = 5.0
+
+    executor.settle_due_trades({"BTC": SnapshotRecord(asset="BTC", spot_price=100.0)})
+
+    assert executor.stats.today_pnl == 0.0
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.models.records import SnapshotRecord
+from app.services.engine_gateway import LocalEngineGateway
+from app.services.window_series import WindowSeriesStore
+from benchmarks.fakes import FakeUpstreams
+from tests.test_bot_engine_tick import _engine
+
+
+def _snapshot(window_ts: int, i: int, asset: str = "BTC") -> SnapshotRecord:
+    return SnapshotRecord(
+        asset=asset,
+        spot_price=68000.0 + i * 1.25,
+        change_24h=0.0,
+        yes_odds=0.5 + i * 0.001,
+        no_odds=0.5 - i * 0.001,
+        odds_source="test",
+        price_age_seconds=i % 3 or None,
+        window_ts=window_ts,
+    )
+
+
+def test_windows_round_trip_compactly_and_survive_disk(tmp_path):
+    store = WindowSeriesStore(retention=1, directory=tmp_path)
+
+    async def run():
+        for i in range(300):
+            store.record(_snapshot(900, i), 1_700_000_000.0 + i)
+        encoded = store.stats()["encoded_bytes"]
+        # a janela seguinte fecha a 900 e, com retenção 1, a tira da memória: ela continua legível pelo lote pendente
+        store.record(_snapshot(1800, 0), 1_700_000_900.0)
+        # mesmo instante e mesmos valores: dois ticks, dois pontos
+        store.record(_snapshot(1800, 0), 1_700_000_900.0)
+        pending = await store.series("BTC", 900)
+        store.maybe_flush()
+        await store.flush(include_open=True)
+        # outro processo (restart) só tem o disco e monta o índice pelos cabeçalhos
+        reopened = WindowSeriesStore(retention=1, directory=tmp_path)
+        return encoded, pending, await reopened.series("BTC", 900), await reopened.windows("BTC"), await reopened.series("BTC", 42)
+
+    encoded, pending, from_disk, windows, missing = asyncio.run(run())
+    # 5 floats por ponto seriam 40 bytes
+    assert encoded < 300 * 12
+    assert pending == from_disk
+    assert from_disk["points"] == 300
+    assert from_disk["t"][0] == 1_700_000_000.0 and from_disk["t"][-1] == 1_700_000_299.0
+    assert from_disk["yes"][123] == 0.623 and from_disk["no"][123] == 0.377
+    assert from_disk["spot"][123] == 68000.0 + 123 * 1.25
+    assert from_disk["price_age_seconds"][:4] == [None, 1.0, 2.0, None]
+    assert [w["window_ts"] for w in windows] == [1800, 900]
+    assert windows[0]["points"] == 2
+    assert missing is None
+
+
+def test_engine_records_window_trajectory_for_the_api(tmp_path):
+    engine = _engine(FakeUpstreams(yes_odds=0.9), tmp_path)
+    app.state.engine = LocalEngineGateway(engine)
+
+    async def run():
+        for _ in range(3):
+            await engine.tick()
+        window_ts = engine.latest_snapshots["BTC"].window_ts
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            listing = await client.get("/api/windows/BTC")
+            series = await client.get(f"/api/windows/BTC/{window_ts}")
+            missing = await client.get("/api/windows/BTC/1")
+            unknown = await client.get("/api/windows/NOPE/1")
+        return listing, series, missing, unknown
+
+    listing, series, missing, unknown = asyncio.run(run())
+    assert listing.json()["windows"][0]["points"] == 3
+    body = series.json()
+    assert body["points"] == 3 and body["yes"] == [0.9, 0.9, 0.9]
+    assert body["spot"][0] == engine.latest_snapshots["BTC"].spot_price
+    assert missing.status_code == 404 and unknown.status_code == 404
+    asyncio.run(engine.shutdown())
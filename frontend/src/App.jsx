@@ -3,12 +3,12 @@ import MarketCard from './components/MarketCard'
 import StatCard from './components/StatCard'
 import TradeTable from './components/TradeTable'
 
-const allAssets = ['BTC', 'ETH', 'SOL']
+const defaultAssets = ['BTC', 'ETH', 'SOL']
 
 const emptyState = {
   stats: { balance: 0, today_pnl: 0, all_time_pnl: 0, trades: 0, win_rate: 0, avg_pnl: 0 },
   config: {
-    enabled_assets: allAssets,
+    enabled_assets: defaultAssets,
     enabled_indicators: ['POLY_PRICE'],
     confidence_threshold: 0.85,
     entry_probability_threshold: 0.85,
@@ -46,11 +46,12 @@ export default function App() {
   const [configDirty, setConfigDirty] = useState(false)
   const [saveMsg, setSaveMsg] = useState('')
 
+  const allAssets = state.available_assets?.length ? state.available_assets : defaultAssets
+
   const markets = useMemo(() => {
     const list = Object.values(state.markets || {})
-    const order = ['BTC', 'ETH', 'SOL']
-    return list.sort((a, b) => order.indexOf(a.asset) - order.indexOf(b.asset))
-  }, [state.markets])
+    return list.sort((a, b) => allAssets.indexOf(a.asset) - allAssets.indexOf(b.asset))
+  }, [state.markets, allAssets])
 
   const refresh = async () => {
     const response = await fetch('/api/state')